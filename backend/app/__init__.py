@@ -16,6 +16,10 @@ socketio = SocketIO()
 def create_app():
     app = Flask(__name__)
 
+    # orjson-backed jsonify/get_json; model views are registered in app.serializers
+    from app.serializers import OrjsonProvider, socket_json
+    app.json = OrjsonProvider(app)
+
     # Configuration
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     
@@ -30,17 +34,42 @@ def create_app():
     app.logger.info(f"FLASK_ENV: {os.getenv('FLASK_ENV')}")
     app.logger.info(f"PORT: {os.getenv('PORT')}")
 
+    # A misconfigured message queue would silently break cross-worker emits,
+    # so it fails startup instead of falling into the best-effort block below
+    from app.message_queue import message_queue_options
+    try:
+        queue_options = message_queue_options(database_url)
+    except ValueError as e:
+        app.logger.error(f"Invalid SOCKETIO_MESSAGE_QUEUE configuration: {e}")
+        raise
+
     try:
         # Initialize extensions
         db.init_app(app)
         migrate.init_app(app, db)
         
-        # Initialize SocketIO with CORS support
+        # Version stamps used by caches to invalidate on committed writes
+        from sqlalchemy.orm import Session
+        from app.services.cache import table_versions
+        table_versions.register_session_events(Session)
+        
+        # Per-request query counts and route budgets (catches N+1 regressions)
+        from app.query_budget import init_query_counter
+        init_query_counter(app)
+        
+        # Negotiated gzip/brotli response compression
+        from app.compression import init_compression
+        init_compression(app)
+        
+        # Initialize SocketIO with CORS support, sharing emits across
+        # workers when SOCKETIO_MESSAGE_QUEUE is set
         socketio.init_app(app, 
                          cors_allowed_origins="*",
                          async_mode='eventlet',
+                         json=socket_json,
                          logger=True,
-                         engineio_logger=True)
+                         engineio_logger=True,
+                         **queue_options)
         
         app.logger.info("Database, migrate, and SocketIO initialized successfully")
     except Exception as e:
@@ -69,7 +98,7 @@ def create_app():
              resources={r"/api/*": {"origins": origins}},
              methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
              allow_headers=["Content-Type", "Authorization", "Accept", "Origin", "X-Requested-With"],
-             expose_headers=["Content-Type", "Authorization"],
+             expose_headers=["Content-Type", "Authorization", "X-Next-Cursor"],
              supports_credentials=False,
              send_wildcard=False,
              vary_header=True
@@ -118,6 +147,7 @@ def create_app():
                 "resume": "/api/resume",
                 "projects": "/api/projects",
                 "skills": "/api/skills",
+                "images": "/api/images",
                 "analytics": "/api/analytics"
             },
             "websockets": {
@@ -171,12 +201,18 @@ def create_app():
         from app.routes.projects import projects_bp
         from app.routes.skills import skills_bp
         from app.routes.analytics import analytics_bp
+        from app.routes.images import images_bp
 
         app.register_blueprint(resume_bp, url_prefix='/api/resume')
         app.register_blueprint(projects_bp, url_prefix='/api/projects')
         app.register_blueprint(skills_bp, url_prefix='/api/skills')
+        app.register_blueprint(images_bp, url_prefix='/api/images')
         app.register_blueprint(analytics_bp)  # Analytics blueprint has its own url_prefix
         app.logger.info("All blueprints registered successfully")
+        
+        # flask analytics ... maintenance commands
+        from app.cli import init_cli
+        init_cli(app)
     except Exception as e:
         app.logger.error(f"Error registering blueprints: {e}")
         # Don't raise - create a basic error response blueprint instead
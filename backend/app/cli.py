@@ -0,0 +1,138 @@
+"""
+Flask CLI commands for analytics and GitHub maintenance.
+
+    flask analytics retention [--dry-run]
+    flask analytics partitions
+    flask analytics backfill {sessions|events} FILE [--name NAME] [--restart]
+    flask github refresh-languages
+    flask skills rebuild-index
+"""
+
+import click
+from flask.cli import AppGroup
+
+analytics_cli = AppGroup('analytics', help='Analytics maintenance commands.')
+github_cli = AppGroup('github', help='GitHub data maintenance commands.')
+skills_cli = AppGroup('skills', help='Skill and technology index maintenance commands.')
+
+
+@analytics_cli.command('retention')
+@click.option('--dry-run', is_flag=True, help='Report what would be removed without changing anything.')
+def retention_command(dry_run):
+    """Roll up, archive and prune raw analytics data per the retention policy."""
+    from app.services.retention import RetentionService
+
+    report = RetentionService(dry_run=dry_run, log=click.echo).run()
+    for step, count in report.items():
+        click.echo(f'{step}: {count}')
+
+
+@analytics_cli.command('partitions')
+def partitions_command():
+    """Create upcoming monthly analytics_events partitions and list them (Postgres only)."""
+    from app import db
+    from app.models import AnalyticsEvent
+    from app.partitions import MonthlyPartitions
+
+    connection = db.session.connection()
+    table = AnalyticsEvent.__tablename__
+    if not MonthlyPartitions.is_partitioned(connection, table):
+        click.echo(f'{table} is not partitioned on this database')
+        return
+    partitions = MonthlyPartitions(table)
+    created = partitions.ensure(connection)
+    db.session.commit()
+    for month in partitions.months(connection):
+        name = partitions.partition_name(month)
+        click.echo(f'{name}{" (created)" if name in created else ""}')
+
+
+@analytics_cli.command('backfill')
+@click.argument('table', type=click.Choice(['sessions', 'events']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--name', help='Checkpoint to resume from and record progress under (default: table and file name).')
+@click.option('--restart', is_flag=True, help='Ignore the saved checkpoint and load from the first row.')
+@click.option('--keep-ids', is_flag=True, help='Insert the rows\' own event ids instead of new ones (the id sequence is moved past them).')
+@click.option('--chunk-size', type=int, help='Rows per transaction (default BULK_LOAD_CHUNK).')
+def backfill_command(table, path, name, restart, keep_ids, chunk_size):
+    """Bulk load JSON-lines rows (e.g. a retention archive) into analytics_sessions or analytics_events.
+
+    Load sessions before the events that reference them.
+    """
+    import os
+    from app.models import AnalyticsEvent, AnalyticsSession
+    from app.services.bulk_loader import BulkLoader, read_jsonl
+
+    model = AnalyticsSession if table == 'sessions' else AnalyticsEvent
+    loader = BulkLoader(model, chunk_size=chunk_size, keep_ids=keep_ids, log=click.echo)
+    name = name or f'{model.__tablename__}:{os.path.basename(path)}'
+    offset = 0 if restart else loader.checkpoint(name)
+    if offset:
+        click.echo(f'Resuming {name} at row {offset}')
+
+    result = loader.load(read_jsonl(path, skip=offset), name=name, offset=offset)
+    click.echo(f"Loaded {result['rows']} rows into {result['table']} "
+               f"in {result['seconds']}s ({result['rows_per_second']} rows/s)")
+
+
+@github_cli.command('refresh-languages')
+def refresh_languages_command():
+    """Refresh each project's GitHub language stats and recalculate the affected skills.
+
+    Runs at background priority, so it leaves the GitHub quota reserve to
+    interactive imports and stops early if the quota runs out.
+    """
+    import os
+    from app import db
+    from app.models import Project
+    from app.services.github_rate_limiter import GitHubRateLimitError, PRIORITY_BACKGROUND
+    from app.services.github_service import GitHubService
+    from app.services.skill_calculator import SkillCalculator
+    from app.services.technology_index import TechnologyIndex
+
+    github_service = GitHubService(os.getenv('GITHUB_TOKEN'), priority=PRIORITY_BACKGROUND)
+    changed_technologies = set()
+    refreshed = 0
+    for project in Project.query.filter(Project.github_url.isnot(None), Project.github_url != '').all():
+        try:
+            languages = github_service.fetch_languages(project.github_url)
+        except ValueError:
+            continue
+        except GitHubRateLimitError as e:
+            click.echo(f'GitHub quota exhausted, stopping (retry in {e.retry_after}s)')
+            break
+        # An empty answer is a failed call as often as an empty repository; keep the old stats
+        if languages and languages != project.github_languages:
+            project.github_languages = languages
+            changed_technologies |= TechnologyIndex.project_keys(project.id)
+            refreshed += 1
+
+    SkillCalculator.recalculate_technologies(changed_technologies)
+    db.session.commit()
+    click.echo(f'Refreshed languages for {refreshed} projects, '
+               f'recalculated {len(changed_technologies)} technologies')
+
+
+@skills_cli.command('rebuild-index')
+def rebuild_index_command():
+    """Re-link every project and experience entry from its technologies string, then sync skills.
+
+    Project writes keep the index current; this repairs it after rows were
+    written outside the API (seed scripts, manual SQL).
+    """
+    from app import db
+    from app.services.skill_calculator import SkillCalculator
+    from app.services.technology_index import TechnologyIndex
+
+    links = TechnologyIndex.rebuild()
+    db.session.commit()
+    click.echo(f'Rebuilt {links} technology links')
+    result = SkillCalculator.sync_skills_with_projects()
+    click.echo(f"Skills: {result.get('status')} "
+               f"({result.get('added', 0)} added, {result.get('updated', 0)} updated)")
+
+
+def init_cli(app):
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(github_cli)
+    app.cli.add_command(skills_cli)
@@ -0,0 +1,137 @@
+"""
+Negotiated gzip/brotli compression for API responses.
+
+Text responses above COMPRESSION_MIN_SIZE bytes are compressed with the best
+encoding the client accepts (brotli, then gzip). Compressed bodies are cached
+by content version: the response's ETag when it has one (e.g. the version
+stamped skill insights), otherwise a digest of the body. Repeated responses
+therefore pay the compression CPU once per version, not once per request.
+
+Brotli is used when the Brotli package is installed; gzip always works.
+
+Configuration (environment):
+    COMPRESSION_ENABLED          true/false (default true)
+    COMPRESSION_MIN_SIZE         smallest body to compress, in bytes (default 1024)
+    COMPRESSION_GZIP_LEVEL       1-9 (default 6)
+    COMPRESSION_BROTLI_QUALITY   0-11 (default 5)
+    COMPRESSION_CACHE_ENTRIES    compressed variants kept in memory (default 256)
+"""
+
+import gzip
+import hashlib
+import os
+
+from flask import request
+
+from app.services.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'application/xml',
+    'image/svg+xml', 'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript'
+}
+MAX_CACHED_BYTES = 512 * 1024
+
+
+class ResponseCompressor:
+    """after_request hook that compresses eligible responses."""
+
+    def __init__(self, min_size: int = None, gzip_level: int = None, brotli_quality: int = None,
+                 cache_entries: int = None):
+        self.min_size = min_size if min_size is not None else int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+        self.gzip_level = gzip_level if gzip_level is not None else int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+        self.brotli_quality = brotli_quality if brotli_quality is not None else int(
+            os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+        self.cache = TTLCache(
+            maxsize=cache_entries if cache_entries is not None else int(os.getenv('COMPRESSION_CACHE_ENTRIES', '256')),
+            ttl=3600
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def encodings(self):
+        """Supported encodings, preferred first."""
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def negotiate(self, accept_encodings) -> str:
+        """Pick the encoding for a request's Accept-Encoding, or None."""
+        best, best_quality = None, 0
+        for encoding in self.encodings():
+            quality = accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def __call__(self, response):
+        if not self._eligible(response):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        version = etag or hashlib.blake2b(data, digest_size=16).hexdigest()
+        key = (version, encoding)
+
+        compressed = self.cache.get(key)
+        if compressed is None:
+            self.misses += 1
+            compressed = self.compress(data, encoding)
+            if len(compressed) >= len(data):
+                return response
+            if len(compressed) <= MAX_CACHED_BYTES:
+                self.cache.set(key, compressed)
+        else:
+            self.hits += 1
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag and not weak:
+            # The compressed bytes differ from the identity representation
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _eligible(self, response) -> bool:
+        return (
+            200 <= response.status_code < 300
+            and response.status_code != 206
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and 'Content-Encoding' not in response.headers
+            and response.mimetype in COMPRESSIBLE_MIMETYPES
+            and request.method != 'HEAD'
+        )
+
+    def get_stats(self):
+        return {
+            'encodings': list(self.encodings()),
+            'min_size': self.min_size,
+            'cached_variants': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+compressor = ResponseCompressor()
+
+
+def init_compression(app):
+    """Compress app responses unless COMPRESSION_ENABLED is false."""
+    if os.getenv('COMPRESSION_ENABLED', 'true').lower() != 'true':
+        return
+    app.after_request(compressor)
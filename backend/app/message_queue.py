@@ -0,0 +1,164 @@
+"""
+Cross-process pub/sub for Socket.IO, so emits reach every worker's clients.
+
+Without a message queue each gunicorn worker (or instance) only delivers
+emits to the sockets connected to it. SOCKETIO_MESSAGE_QUEUE selects a
+backend:
+
+    redis://host:6379/0      Redis pub/sub (multi-node; needs the redis package)
+    postgres                 Postgres LISTEN/NOTIFY on DATABASE_URL
+    postgresql://...         Postgres LISTEN/NOTIFY on a specific database
+
+Postgres needs no extra service on hosts that already run the app database,
+which makes it the in-tree option for single-host deployments.
+SOCKETIO_CHANNEL names the channel (default flask-socketio); clusters that
+share a broker need distinct channels.
+
+Multiple workers also need sticky sessions for the polling transport, and an
+eventlet-patched process so the listener thread doesn't block.
+"""
+
+import base64
+import os
+import select
+import threading
+import time
+import uuid
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+import socketio
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7900
+_CHUNK_PREFIX = '~'
+
+
+def encode_notify_payloads(message: str, limit: int = NOTIFY_PAYLOAD_LIMIT) -> List[str]:
+    """
+    Split a message into NOTIFY payloads.
+
+    Messages under the limit are sent as-is. Larger ones are zlib-compressed,
+    base64-encoded and split into chunks of the form '~<id>:<index>:<total>:<data>'.
+    """
+    if len(message.encode('utf-8')) < limit and not message.startswith(_CHUNK_PREFIX):
+        return [message]
+    data = base64.b64encode(zlib.compress(message.encode('utf-8'))).decode('ascii')
+    message_id = uuid.uuid4().hex[:12]
+    size = limit - 64
+    chunks = [data[i:i + size] for i in range(0, len(data), size)]
+    return [f'{_CHUNK_PREFIX}{message_id}:{i}:{len(chunks)}:{chunk}' for i, chunk in enumerate(chunks)]
+
+
+class NotifyAssembler:
+    """Reassembles chunked NOTIFY payloads on the listening side."""
+
+    def __init__(self, max_pending: int = 64, max_age: float = 60.0):
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self._pending: Dict[str, dict] = {}
+
+    def feed(self, payload: str) -> Optional[str]:
+        """Return the complete message once all of its chunks have arrived."""
+        if not payload.startswith(_CHUNK_PREFIX):
+            return payload
+
+        message_id, index, total, data = payload[1:].split(':', 3)
+        entry = self._pending.setdefault(message_id, {'chunks': {}, 'total': int(total), 'at': time.monotonic()})
+        entry['chunks'][int(index)] = data
+        if len(entry['chunks']) < entry['total']:
+            self._expire()
+            return None
+
+        del self._pending[message_id]
+        joined = ''.join(entry['chunks'][i] for i in range(entry['total']))
+        return zlib.decompress(base64.b64decode(joined)).decode('utf-8')
+
+    def _expire(self):
+        """Drop partial messages whose remaining chunks were lost."""
+        now = time.monotonic()
+        for message_id in [k for k, v in self._pending.items() if now - v['at'] > self.max_age]:
+            del self._pending[message_id]
+        while len(self._pending) > self.max_pending:
+            self._pending.pop(next(iter(self._pending)))
+
+
+class PostgresNotifyManager(socketio.PubSubManager):
+    """Socket.IO client manager that uses Postgres LISTEN/NOTIFY as the message queue."""
+
+    name = 'postgres'
+
+    def __init__(self, url: str, channel: str = 'flask-socketio', write_only: bool = False, logger=None, json=None):
+        import psycopg2  # already required for the app database
+        self._psycopg2 = psycopg2
+        self.url = url
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+
+    def _connect(self):
+        conn = self._psycopg2.connect(self.url)
+        conn.autocommit = True
+        return conn
+
+    def _publish(self, data):
+        message = self.json.dumps(data)
+        for retries_left in (1, 0):
+            try:
+                with self._publish_lock:
+                    if self._publish_conn is None or self._publish_conn.closed:
+                        self._publish_conn = self._connect()
+                    with self._publish_conn.cursor() as cursor:
+                        for payload in encode_notify_payloads(message):
+                            cursor.execute('SELECT pg_notify(%s, %s)', (self.channel, payload))
+                return
+            except self._psycopg2.Error as e:
+                self._publish_conn = None
+                if not retries_left:
+                    self._get_logger().error(f'Cannot publish to postgres... giving up: {e}')
+
+    def _listen(self) -> Iterator[str]:
+        from psycopg2 import sql
+        assembler = NotifyAssembler()
+        retry_sleep = 1
+        while True:
+            try:
+                conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+                retry_sleep = 1
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        if notify.channel != self.channel:
+                            continue
+                        message = assembler.feed(notify.payload)
+                        if message is not None:
+                            yield message
+            except self._psycopg2.Error as e:
+                self._get_logger().error(f'Cannot receive from postgres... retrying in {retry_sleep} secs: {e}')
+                time.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+
+
+def message_queue_options(database_url: str) -> dict:
+    """
+    socketio.init_app keyword arguments for the SOCKETIO_MESSAGE_QUEUE backend.
+
+    Args:
+        database_url: App database URL, used by the 'postgres' shorthand
+    """
+    url = os.getenv('SOCKETIO_MESSAGE_QUEUE', '').strip()
+    channel = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+    if not url:
+        return {}
+    if url == 'postgres':
+        if not database_url.startswith(('postgres://', 'postgresql://')):
+            raise ValueError('SOCKETIO_MESSAGE_QUEUE=postgres requires a Postgres DATABASE_URL')
+        url = database_url
+    if url.startswith(('postgres://', 'postgresql://')):
+        return {'client_manager': PostgresNotifyManager(url, channel=channel)}
+    return {'message_queue': url, 'channel': channel}
@@ -1,4 +1,5 @@
 from app import db
+from app.partitions import partition_by_month
 from datetime import datetime
 
 class PersonalInfo(db.Model):
@@ -47,8 +48,49 @@ class Project(db.Model):
     live_url = db.Column(db.String(200))
     image_url = db.Column(db.String(200))
     featured = db.Column(db.Boolean, default=False)
-    order = db.Column(db.Integer, default=0)
+    order = db.Column(db.Integer, nullable=False, default=0)
+    github_languages = db.Column(db.JSON)  # language -> bytes, from the GitHub languages API
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Keyset pagination order for listings
+    __table_args__ = (db.Index('ix_project_order_id', 'order', 'id'),)
+
+class Technology(db.Model):
+    """Canonical technology referenced by projects and experience"""
+    __tablename__ = 'technology'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(100), nullable=False, unique=True)  # canonical lower-cased name
+    name = db.Column(db.String(100), nullable=False)  # display name
+    category = db.Column(db.String(50), nullable=False, default='tools')
+    
+    aliases = db.relationship('TechnologyAlias', backref='technology', lazy='dynamic', cascade='all, delete-orphan')
+
+class TechnologyAlias(db.Model):
+    """Alternative spellings that resolve to a canonical technology (e.g. "reactjs" -> "react")"""
+    __tablename__ = 'technology_alias'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String(100), nullable=False, unique=True)  # lower-cased
+    technology_id = db.Column(db.Integer, db.ForeignKey('technology.id', ondelete='CASCADE'), nullable=False, index=True)
+
+class ProjectTechnology(db.Model):
+    """Project <-> technology link, kept in sync by the project handlers"""
+    __tablename__ = 'project_technology'
+    __table_args__ = (db.UniqueConstraint('project_id', 'technology_id', name='uq_project_technology'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False, index=True)
+    technology_id = db.Column(db.Integer, db.ForeignKey('technology.id', ondelete='CASCADE'), nullable=False, index=True)
+
+class ExperienceTechnology(db.Model):
+    """Experience <-> technology link"""
+    __tablename__ = 'experience_technology'
+    __table_args__ = (db.UniqueConstraint('experience_id', 'technology_id', name='uq_experience_technology'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    experience_id = db.Column(db.Integer, db.ForeignKey('experience.id', ondelete='CASCADE'), nullable=False, index=True)
+    technology_id = db.Column(db.Integer, db.ForeignKey('technology.id', ondelete='CASCADE'), nullable=False, index=True)
 
 class Skill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -61,6 +103,9 @@ class Skill(db.Model):
     project_count = db.Column(db.Integer, default=0)  # Number of projects using this skill
     last_calculated = db.Column(db.DateTime)  # When it was last auto-calculated
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Skills are identified by case-insensitive name; backs the bulk upsert in SkillCalculator
+    __table_args__ = (db.Index('uq_skill_name_lower', db.func.lower(name), unique=True),)
 
 class Certificate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -92,13 +137,16 @@ class AnalyticsSession(db.Model):
     os = db.Column(db.String(50))
     screen_resolution = db.Column(db.String(20))  # e.g., "1920x1080"
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
-    last_activity = db.Column(db.DateTime, default=datetime.utcnow)
+    last_activity = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     total_time_seconds = db.Column(db.Integer, default=0)
     page_views = db.Column(db.Integer, default=0)
     is_active = db.Column(db.Boolean, default=True)
     
     # Relationships
     events = db.relationship('AnalyticsEvent', backref='session', lazy='dynamic', cascade='all, delete-orphan')
+    
+    # Keyset pagination order for the active sessions listing
+    __table_args__ = (db.Index('ix_analytics_sessions_last_activity_id', 'last_activity', 'id'),)
 
 class AnalyticsEvent(db.Model):
     """Track specific user interactions"""
@@ -112,11 +160,18 @@ class AnalyticsEvent(db.Model):
     page_path = db.Column(db.String(200))
     element_id = db.Column(db.String(100))  # DOM element ID if applicable
     event_metadata = db.Column(db.JSON)  # Flexible JSON field for additional data
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     # Performance metrics
     page_load_time = db.Column(db.Integer)  # milliseconds
     time_on_page = db.Column(db.Integer)  # seconds
+    
+    # Keyset pagination order for the recent events feed
+    __table_args__ = (db.Index('ix_analytics_events_timestamp_id', 'timestamp', 'id'),)
+
+
+# Monthly range partitions on Postgres; SQLite keeps a plain table
+partition_by_month(AnalyticsEvent.__table__, 'timestamp')
 
 class AnalyticsMetrics(db.Model):
     """Daily aggregated metrics for efficient reporting"""
@@ -149,6 +204,41 @@ class AnalyticsMetrics(db.Model):
     
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class AnalyticsHourlyRollup(db.Model):
+    """Hourly traffic totals plus mergeable sketches (see app.services.sketches)"""
+    __tablename__ = 'analytics_hourly_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False, unique=True)  # start of the hour, UTC
+    
+    sessions = db.Column(db.Integer, default=0)  # sessions started in the hour
+    page_views = db.Column(db.Integer, default=0)
+    events = db.Column(db.Integer, default=0)
+    event_counts = db.Column(db.JSON)  # {"project_click": 12, ...}
+    
+    visitors_sketch = db.Column(db.LargeBinary)  # HyperLogLog of visitor IPs
+    top_projects_sketch = db.Column(db.JSON)  # Space-Saving of project_click labels
+    top_skills_sketch = db.Column(db.JSON)  # Space-Saving of skill_* labels
+    top_pages_sketch = db.Column(db.JSON)  # Space-Saving of page_view paths
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class AnalyticsLoadCheckpoint(db.Model):
+    """Progress of a named bulk load, for resuming it (see app.services.bulk_loader)"""
+    __tablename__ = 'analytics_load_checkpoints'
+    
+    name = db.Column(db.String(200), primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    offset = db.Column(db.BigInteger, nullable=False, default=0)  # input rows committed
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TableVersion(db.Model):
+    """Write counter per table, bumped by the transaction that wrote it (see app.services.cache)"""
+    __tablename__ = 'table_versions'
+    
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
 class SystemHealth(db.Model):
     """Track system performance and health metrics"""
     __tablename__ = 'system_health'
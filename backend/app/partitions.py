@@ -0,0 +1,186 @@
+"""
+Monthly range partitioning of analytics tables on Postgres.
+
+On Postgres, analytics_events is declared PARTITION BY RANGE (timestamp). It
+has one child table per calendar month (analytics_events_p202610 covers
+October 2026) and a DEFAULT partition that catches rows outside every month.
+Queries that filter on the partition column with plain range predicates
+(timestamp >= x AND timestamp < y, see day_range) only scan the months they
+touch. Retention drops whole expired months instead of deleting row by row.
+
+Postgres requires the partition column in every unique constraint, so the
+primary key of a partitioned table becomes (id, timestamp). The models keep
+a single-column primary key for the ORM and for SQLite, which stays
+unpartitioned. The key is widened only in the Postgres CREATE TABLE.
+
+Partitions are created ANALYTICS_PARTITION_MONTHS_AHEAD months (3) ahead:
+when the table is created, when the migration converts an existing table,
+and on every retention run (`flask analytics partitions` does it on demand).
+If rows ever land in the DEFAULT partition, they are moved into their month
+when that month's partition is created.
+"""
+
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateTable
+
+MONTHS_AHEAD = int(os.getenv('ANALYTICS_PARTITION_MONTHS_AHEAD', '3'))
+
+# Partitioned table name -> partition column
+PARTITIONED_TABLES: Dict[str, str] = {}
+
+
+def month_start(moment) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def day_range(first: date, last: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """
+    Half-open datetime bounds [first 00:00, day after last 00:00).
+
+    Filter timestamps against these instead of func.date(column): a function
+    of the column defeats both indexes and partition pruning.
+    """
+    start = datetime.combine(first, datetime.min.time())
+    end = datetime.combine(last or first, datetime.min.time()) + timedelta(days=1)
+    return start, end
+
+
+def partition_by_month(table, column: str):
+    """Declare table as range-partitioned by month on column (Postgres only)."""
+    PARTITIONED_TABLES[table.name] = column
+    table.dialect_kwargs['postgresql_partition_by'] = f'RANGE ({column})'
+    event.listen(table, 'after_create', _create_initial_partitions)
+
+
+@compiles(CreateTable, 'postgresql')
+def _create_partitioned_table(create, compiler, **kw):
+    ddl = compiler.visit_create_table(create, **kw)
+    table = create.element
+    column = PARTITIONED_TABLES.get(table.name)
+    partitioned = table.dialect_options['postgresql']['partition_by']
+    if column and partitioned and column not in table.primary_key.columns:
+        quote = compiler.preparer.quote
+        key = ', '.join(quote(col.name) for col in table.primary_key.columns)
+        ddl = ddl.replace(f'PRIMARY KEY ({key})', f'PRIMARY KEY ({key}, {quote(column)})', 1)
+    return ddl
+
+
+def _create_initial_partitions(table, connection, **kw):
+    if connection.dialect.name == 'postgresql':
+        MonthlyPartitions(table.name).ensure(connection)
+
+
+class MonthlyPartitions:
+    """Creates, lists and drops the monthly partitions of one table."""
+
+    NAME_PATTERN = re.compile(r'_p(\d{4})(\d{2})$')
+
+    def __init__(self, table: str):
+        self.table = table
+        self.column = PARTITIONED_TABLES[table]
+
+    def partition_name(self, month: date) -> str:
+        return f'{self.table}_p{month:%Y%m}'
+
+    @property
+    def default_name(self) -> str:
+        return f'{self.table}_default'
+
+    @staticmethod
+    def is_partitioned(connection: Connection, table: str) -> bool:
+        if connection.dialect.name != 'postgresql':
+            return False
+        relkind = connection.execute(
+            text('SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)'), {'table': table}
+        ).scalar()
+        return relkind == 'p'
+
+    def months(self, connection: Connection) -> List[date]:
+        """Months that have a partition, oldest first."""
+        names = connection.execute(text(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(:table)'
+        ), {'table': self.table}).scalars()
+        months = []
+        for name in names:
+            match = self.NAME_PATTERN.search(name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def ensure(self, connection: Connection, start: Optional[date] = None,
+               months_ahead: int = MONTHS_AHEAD) -> List[str]:
+        """
+        Create the DEFAULT partition and every missing month from start (default:
+        the current month) through months_ahead months from now.
+
+        Returns:
+            Names of the partitions created
+        """
+        connection.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {self.default_name} PARTITION OF {self.table} DEFAULT'
+        ))
+        created = []
+        for month in self.missing(connection, start, months_ahead):
+            self._create_month(connection, month)
+            created.append(self.partition_name(month))
+        return created
+
+    def missing(self, connection: Connection, start: Optional[date] = None,
+                months_ahead: int = MONTHS_AHEAD) -> List[date]:
+        """Months from start through months_ahead months from now that have no partition."""
+        current = month_start(datetime.utcnow())
+        month = month_start(start or current)
+        existing = set(self.months(connection))
+        missing = []
+        while month <= add_months(current, months_ahead):
+            if month not in existing:
+                missing.append(month)
+            month = add_months(month, 1)
+        return missing
+
+    def _create_month(self, connection: Connection, month: date):
+        """Create a month's partition, moving any rows the DEFAULT partition holds for it."""
+        name = self.partition_name(month)
+        bounds = {'lower': month, 'upper': add_months(month, 1)}
+        in_month = f'{self.column} >= :lower AND {self.column} < :upper'
+        stray = connection.execute(
+            text(f'SELECT 1 FROM {self.default_name} WHERE {in_month} LIMIT 1'), bounds
+        ).first()
+        values = f"FOR VALUES FROM ('{bounds['lower']}') TO ('{bounds['upper']}')"
+        if stray is None:
+            connection.execute(text(f'CREATE TABLE {name} PARTITION OF {self.table} {values}'))
+            return
+        # A new partition may not overlap rows already in DEFAULT: move them first
+        connection.execute(text(
+            f'CREATE TABLE {name} (LIKE {self.table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        ))
+        connection.execute(text(
+            f'WITH moved AS (DELETE FROM {self.default_name} WHERE {in_month} RETURNING *) '
+            f'INSERT INTO {name} SELECT * FROM moved'
+        ), bounds)
+        connection.execute(text(f'ALTER TABLE {self.table} ATTACH PARTITION {name} {values}'))
+
+    def expired(self, connection: Connection, cutoff: datetime) -> List[Tuple[str, date, date]]:
+        """(name, first day, end) of every partition entirely older than cutoff."""
+        return [
+            (self.partition_name(month), month, add_months(month, 1))
+            for month in self.months(connection)
+            if datetime.combine(add_months(month, 1), datetime.min.time()) <= cutoff
+        ]
+
+    def drop(self, connection: Connection, name: str):
+        connection.execute(text(f'ALTER TABLE {self.table} DETACH PARTITION {name}'))
+        connection.execute(text(f'DROP TABLE {name}'))
@@ -0,0 +1,84 @@
+"""
+Per-request SQL query counting with per-route budgets.
+
+Every statement executed while a request is active is counted on flask.g.
+Routes declare how many statements they should need with @query_budget(n),
+which catches N+1 regressions (one lazy load per row) as soon as they land:
+
+    @analytics_bp.route('/events/recent')
+    @query_budget(1)
+    def get_recent_events(): ...
+
+Going over budget logs a warning. With QUERY_BUDGET_STRICT enabled (e.g. in
+the test config) it raises QueryBudgetExceeded instead, failing the request
+and any test that made it. QUERY_COUNT_HEADER adds an X-Query-Count header
+to every response for profiling.
+"""
+
+import functools
+import os
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a route runs more queries than its budget."""
+
+
+_installed = False
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and 'query_count' in g:
+        g.query_count += 1
+
+
+def init_query_counter(app):
+    """Start counting statements per request for app."""
+    global _installed
+    app.config.setdefault('QUERY_BUDGET_STRICT', os.getenv('QUERY_BUDGET_STRICT', 'false').lower() == 'true')
+    app.config.setdefault('QUERY_COUNT_HEADER', os.getenv('QUERY_COUNT_HEADER', 'false').lower() == 'true')
+
+    if not _installed:
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+        _installed = True
+
+    @app.before_request
+    def reset_query_count():
+        g.query_count = 0
+
+    @app.after_request
+    def report_query_count(response):
+        if current_app.config['QUERY_COUNT_HEADER'] and 'query_count' in g:
+            response.headers['X-Query-Count'] = str(g.query_count)
+        return response
+
+
+def query_count() -> int:
+    """Statements executed so far in the current request."""
+    return g.get('query_count', 0)
+
+
+def query_budget(limit: int):
+    """
+    Declare the most SQL statements a route may execute.
+
+    Args:
+        limit: Statement budget for one call of the view
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            start = query_count()
+            response = view(*args, **kwargs)
+            used = query_count() - start
+            if used > limit:
+                message = f'{view.__name__} ran {used} queries (budget {limit})'
+                if current_app.config.get('QUERY_BUDGET_STRICT'):
+                    raise QueryBudgetExceeded(message)
+                current_app.logger.warning(message)
+            return response
+        return wrapper
+    return decorator
@@ -12,25 +12,40 @@ Provides comprehensive analytics endpoints for:
 import json
 from datetime import datetime, date, timedelta
 from flask import Blueprint, request, jsonify, current_app
-from flask_socketio import emit, join_room, leave_room
-from app import db, socketio
+from flask_socketio import emit, join_room, leave_room, rooms
+from app import socketio
 from app.services.analytics_service import AnalyticsService
+from app.services.analytics_rollups import AnalyticsRollupService
+from app.services.metrics_stream import metrics_stream
+from app.services.metrics_broadcaster import metrics_broadcaster
 from app.models import AnalyticsSession, AnalyticsEvent, AnalyticsMetrics, SystemHealth
+from app.serializers import serialize, serializer_for
+from app.partitions import day_range
+from app.pagination import paginate, parse_fields, parse_limit, PaginationError
+from app.query_budget import query_budget
 
 # Create blueprint
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
 
+DEFAULT_EVENTS_LIMIT = 50
+MAX_EVENTS_LIMIT = 200
+DEFAULT_SESSIONS_LIMIT = 100
+MAX_SESSIONS_LIMIT = 500
+MAX_EVENT_SUBSCRIPTIONS = 20
+MAX_SUMMARY_DAYS = 731
+MAX_BATCH_EVENTS = 500
+
 # REST API Endpoints
 @analytics_bp.route('/session', methods=['POST'])
 def create_session():
     """Create or update analytics session"""
     try:
         data = request.get_json()
-        session = AnalyticsService.create_or_update_session(data)
+        session_id = AnalyticsService.create_or_update_session(data)
         
         return jsonify({
             'success': True,
-            'session_id': session.id,
+            'session_id': session_id,
             'message': 'Session created/updated successfully'
         }), 200
         
@@ -60,7 +75,34 @@ def track_event():
         current_app.logger.error(f"Event tracking error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@analytics_bp.route('/events/batch', methods=['POST'])
+def track_event_batch():
+    """Track a batch of analytics events with one bulk insert"""
+    try:
+        data = request.get_json() or {}
+        events = data.get('events')
+        
+        if not isinstance(events, list) or not events:
+            return jsonify({'success': False, 'error': 'events must be a non-empty list'}), 400
+        if len(events) > MAX_BATCH_EVENTS:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_EVENTS} events per batch'}), 400
+        if not all(isinstance(event, dict) for event in events):
+            return jsonify({'success': False, 'error': 'Each event must be an object'}), 400
+        
+        result = AnalyticsService.track_events(events, data.get('session_id'))
+        
+        return jsonify({
+            'success': True,
+            **result,
+            'message': f"Tracked {result['tracked']} events"
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Batch event tracking error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @analytics_bp.route('/metrics/realtime', methods=['GET'])
+@query_budget(5)
 def get_realtime_metrics():
     """Get real-time analytics metrics"""
     try:
@@ -75,6 +117,7 @@ def get_realtime_metrics():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @analytics_bp.route('/metrics/historical', methods=['GET'])
+@query_budget(1)
 def get_historical_metrics():
     """Get historical analytics data"""
     try:
@@ -90,6 +133,27 @@ def get_historical_metrics():
         current_app.logger.error(f"Historical metrics error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@analytics_bp.route('/metrics/summary', methods=['GET'])
+@query_budget(6)  # 5 to roll up today's unprocessed hours, 1 to merge
+def get_metrics_summary():
+    """Unique visitors and top content over a range, merged from hourly rollups"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        top = request.args.get('top', 10, type=int)
+        if not 1 <= days <= MAX_SUMMARY_DAYS:
+            return jsonify({'success': False, 'error': f'days must be between 1 and {MAX_SUMMARY_DAYS}'}), 400
+        
+        summary = AnalyticsRollupService.summarize_days(days, top=max(1, min(top, 50)))
+        
+        return jsonify({
+            'success': True,
+            'data': summary
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Metrics summary error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @analytics_bp.route('/metrics/calculate', methods=['POST'])
 def calculate_daily_metrics():
     """Manually trigger daily metrics calculation"""
@@ -126,13 +190,7 @@ def get_system_health():
         
         return jsonify({
             'success': True,
-            'data': {
-                'cpu_usage': health.cpu_usage,
-                'memory_usage': health.memory_usage,
-                'disk_usage': health.disk_usage,
-                'status': health.status,
-                'timestamp': health.timestamp.isoformat()
-            }
+            'data': serialize(health)
         }), 200
         
     except Exception as e:
@@ -140,6 +198,7 @@ def get_system_health():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @analytics_bp.route('/export', methods=['POST'])
+@query_budget(3)
 def export_analytics():
     """Export analytics data"""
     try:
@@ -162,72 +221,72 @@ def export_analytics():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @analytics_bp.route('/sessions/active', methods=['GET'])
+@query_budget(2)
 def get_active_sessions():
-    """Get currently active sessions"""
+    """
+    Get currently active sessions, most recently active first (cursor paginated).
+    Activity reaches these rows in the session cache's write-back, so they lag
+    by up to SESSION_FLUSH_INTERVAL seconds.
+    """
     try:
         threshold = datetime.utcnow() - timedelta(minutes=5)
-        sessions = AnalyticsSession.query.filter(
+        query = AnalyticsSession.query.filter(
             AnalyticsSession.last_activity >= threshold,
             AnalyticsSession.is_active == True
-        ).all()
-        
-        session_data = []
-        for session in sessions:
-            session_data.append({
-                'id': session.id,
-                'device_type': session.device_type,
-                'browser': session.browser,
-                'os': session.os,
-                'started_at': session.started_at.isoformat(),
-                'last_activity': session.last_activity.isoformat(),
-                'page_views': session.page_views,
-                'total_time': session.total_time_seconds
-            })
+        )
+        
+        serializer = parse_fields(request.args.get('fields'), serializer_for(AnalyticsSession, 'active'))
+        sessions, next_cursor = paginate(
+            query, [AnalyticsSession.last_activity, AnalyticsSession.id],
+            cursor=request.args.get('cursor'),
+            limit=parse_limit(request.args.get('limit'), DEFAULT_SESSIONS_LIMIT, MAX_SESSIONS_LIMIT),
+            serializer=serializer
+        )
         
         return jsonify({
             'success': True,
             'data': {
-                'active_count': len(sessions),
-                'sessions': session_data
+                'active_count': query.order_by(None).count(),
+                'sessions': serializer.dump_many(sessions),
+                'next_cursor': next_cursor
             }
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Active sessions error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @analytics_bp.route('/events/recent', methods=['GET'])
+@query_budget(1)
 def get_recent_events():
-    """Get recent events for live feed"""
+    """Get recent events for live feed, newest first (cursor paginated)"""
     try:
-        limit = request.args.get('limit', 50, type=int)
         hours = request.args.get('hours', 24, type=int)
         
         threshold = datetime.utcnow() - timedelta(hours=hours)
-        events = AnalyticsEvent.query.filter(
-            AnalyticsEvent.timestamp >= threshold
-        ).order_by(AnalyticsEvent.timestamp.desc()).limit(limit).all()
-        
-        event_data = []
-        for event in events:
-            event_data.append({
-                'id': event.id,
-                'event_type': event.event_type,
-                'event_category': event.event_category,
-                'event_label': event.event_label,
-                'page_path': event.page_path,
-                'timestamp': event.timestamp.isoformat(),
-                'session_device': event.session.device_type if event.session else 'unknown'
-            })
+        query = AnalyticsEvent.query.filter(AnalyticsEvent.timestamp >= threshold)
+        
+        serializer = parse_fields(request.args.get('fields'), serializer_for(AnalyticsEvent, 'recent'))
+        events, next_cursor = paginate(
+            query, [AnalyticsEvent.timestamp, AnalyticsEvent.id],
+            cursor=request.args.get('cursor'),
+            limit=parse_limit(request.args.get('limit'), DEFAULT_EVENTS_LIMIT, MAX_EVENTS_LIMIT),
+            serializer=serializer
+        )
         
         return jsonify({
             'success': True,
             'data': {
                 'count': len(events),
-                'events': event_data
+                'events': serializer.dump_many(events),
+                'next_cursor': next_cursor
             }
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Recent events error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -238,11 +297,12 @@ def analytics_connect():
     """Handle analytics dashboard connection"""
     print(f"Analytics client connected: {request.sid}")
     join_room('analytics_room')
+    join_room(metrics_stream.room)
+    metrics_broadcaster.client_connected(current_app._get_current_object())
     
-    # Send initial data
+    # Send the current snapshot; updates then arrive as metrics_delta frames
     try:
-        metrics = AnalyticsService.get_real_time_metrics()
-        emit('initial_metrics', metrics)
+        emit('metrics_snapshot', metrics_stream.snapshot_frame(AnalyticsService.get_real_time_metrics))
     except Exception as e:
         current_app.logger.error(f"Initial metrics error: {str(e)}")
         emit('error', {'message': 'Failed to load initial metrics'})
@@ -252,57 +312,86 @@ def analytics_disconnect():
     """Handle analytics dashboard disconnection"""
     print(f"Analytics client disconnected: {request.sid}")
     leave_room('analytics_room')
+    leave_room(metrics_stream.room)
+    metrics_broadcaster.client_disconnected()
 
 @socketio.on('subscribe_to_events', namespace='/analytics')
 def subscribe_to_events(data):
-    """Subscribe to specific event types"""
+    """Subscribe to specific event types ('*' for all), replacing any previous subscription"""
     try:
-        event_types = data.get('event_types', [])
-        if event_types:
-            join_room('event_subscribers')
-            emit('subscription_confirmed', {
-                'event_types': event_types,
-                'message': 'Subscribed to real-time events'
-            })
-        else:
+        event_types = (data or {}).get('event_types', [])
+        if not isinstance(event_types, list) or not all(isinstance(t, str) and t for t in event_types):
+            emit('error', {'message': 'event_types must be a list of event type names'})
+            return
+        if len(event_types) > MAX_EVENT_SUBSCRIPTIONS:
+            emit('error', {'message': f'At most {MAX_EVENT_SUBSCRIPTIONS} event types per subscription'})
+            return
+        if not event_types:
             emit('error', {'message': 'No event types specified'})
+            return
+        
+        event_types = sorted({t[:50] for t in event_types})
+        if AnalyticsService.ALL_EVENTS in event_types:
+            event_types = [AnalyticsService.ALL_EVENTS]
+        
+        wanted = {AnalyticsService.event_room(t) for t in event_types}
+        _leave_event_rooms(keep=wanted)
+        for room in wanted:
+            join_room(room)
+        
+        emit('subscription_confirmed', {
+            'event_types': event_types,
+            'message': 'Subscribed to real-time events'
+        })
             
     except Exception as e:
         current_app.logger.error(f"Event subscription error: {str(e)}")
         emit('error', {'message': 'Subscription failed'})
 
+@socketio.on('unsubscribe_from_events', namespace='/analytics')
+def unsubscribe_from_events():
+    """Stop receiving event batches"""
+    _leave_event_rooms()
+    emit('subscription_confirmed', {'event_types': [], 'message': 'Unsubscribed from real-time events'})
+
+def _leave_event_rooms(keep=frozenset()):
+    for room in rooms():
+        if room.startswith(AnalyticsService.EVENT_ROOM_PREFIX) and room not in keep:
+            leave_room(room)
+
 @socketio.on('request_metrics_update', namespace='/analytics')
 def request_metrics_update():
-    """Request immediate metrics update"""
+    """Request immediate metrics update (changes are broadcast as a metrics_delta)"""
     try:
-        metrics = AnalyticsService.get_real_time_metrics()
-        emit('metrics_update', metrics)
+        metrics_stream.publish(AnalyticsService.get_real_time_metrics())
     except Exception as e:
         current_app.logger.error(f"Metrics update error: {str(e)}")
         emit('error', {'message': 'Failed to update metrics'})
 
+@socketio.on('metrics_resync', namespace='/analytics')
+def metrics_resync():
+    """Resend the full snapshot to a client that missed a metrics_delta"""
+    try:
+        emit('metrics_snapshot', metrics_stream.snapshot_frame(AnalyticsService.get_real_time_metrics))
+    except Exception as e:
+        current_app.logger.error(f"Metrics resync error: {str(e)}")
+        emit('error', {'message': 'Failed to resync metrics'})
+
 @socketio.on('request_health_check', namespace='/analytics')
 def request_health_check():
     """Request system health check"""
     try:
         health = AnalyticsService.log_system_health()
-        emit('health_update', {
-            'cpu': health.cpu_usage,
-            'memory': health.memory_usage,
-            'disk': health.disk_usage,
-            'status': health.status,
-            'timestamp': health.timestamp.isoformat()
-        })
+        emit('health_update', serialize(health, 'live'))
     except Exception as e:
         current_app.logger.error(f"Health check error: {str(e)}")
         emit('error', {'message': 'Health check failed'})
 
 # Background Tasks for Real-Time Updates
 def broadcast_metrics_update():
-    """Broadcast real-time metrics to all connected clients"""
+    """Broadcast changes in real-time metrics to all connected clients"""
     try:
-        metrics = AnalyticsService.get_real_time_metrics()
-        socketio.emit('metrics_update', metrics, namespace='/analytics', room='analytics_room')
+        metrics_stream.publish(AnalyticsService.get_real_time_metrics())
     except Exception as e:
         current_app.logger.error(f"Metrics broadcast error: {str(e)}")
 
@@ -310,20 +399,14 @@ def broadcast_health_update():
     """Broadcast system health update"""
     try:
         health = AnalyticsService.log_system_health()
-        socketio.emit('health_update', {
-            'cpu': health.cpu_usage,
-            'memory': health.memory_usage,
-            'disk': health.disk_usage,
-            'status': health.status,
-            'timestamp': health.timestamp.isoformat()
-        }, namespace='/analytics', room='analytics_room')
+        socketio.emit('health_update', serialize(health, 'live'), namespace='/analytics', room='analytics_room')
     except Exception as e:
         current_app.logger.error(f"Health broadcast error: {str(e)}")
 
 def broadcast_event_update(event_data):
-    """Broadcast new event to subscribers"""
+    """Broadcast new event to subscribers of its type"""
     try:
-        socketio.emit('event_update', event_data, namespace='/analytics', room='event_subscribers')
+        AnalyticsService.publish_event(event_data)
     except Exception as e:
         current_app.logger.error(f"Event broadcast error: {str(e)}")
 
@@ -335,11 +418,11 @@ def emit_custom_event(event_type, data):
 def get_analytics_stats():
     """Get basic analytics statistics for admin panel"""
     try:
-        today = date.today()
+        day_start, day_end = day_range(date.today())
         
         # Today's stats
         today_sessions = AnalyticsSession.query.filter(
-            db.func.date(AnalyticsSession.started_at) == today
+            AnalyticsSession.started_at >= day_start, AnalyticsSession.started_at < day_end
         ).count()
         
         # Active sessions (last 30 minutes)
@@ -351,7 +434,7 @@ def get_analytics_stats():
         
         # Total events today
         today_events = AnalyticsEvent.query.join(AnalyticsSession).filter(
-            db.func.date(AnalyticsEvent.timestamp) == today
+            AnalyticsEvent.timestamp >= day_start, AnalyticsEvent.timestamp < day_end
         ).count()
         
         return {
@@ -0,0 +1,87 @@
+from flask import Blueprint, jsonify, request, send_file, redirect
+from app.services.image_service import ImageService, ImageProcessingError
+import re
+
+images_bp = Blueprint('images', __name__)
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+@images_bp.route('/', methods=['POST'])
+def ingest_image():
+    """
+    Fetch (JSON {"url": ...}) or accept (multipart "file") an image once and
+    build its optimized variants.
+    """
+    try:
+        if 'file' in request.files:
+            # Read one byte past the cap so oversized uploads are rejected, not truncated
+            digest = ImageService.ingest_bytes(request.files['file'].read(ImageService.MAX_SOURCE_BYTES + 1))
+        else:
+            data = request.get_json(silent=True) or {}
+            url = (data.get('url') or '').strip()
+            if not ImageService.is_optimizable(url):
+                return jsonify({'error': 'An absolute image URL or file upload is required'}), 400
+            digest = ImageService.ingest_url(url)
+
+        base = ImageService.public_base_url()
+        return jsonify({
+            'digest': digest,
+            'url': f'{base}/api/images/{digest}/{ImageService.DEFAULT_WIDTH}',
+            'srcset': ', '.join(f'{base}/api/images/{digest}/{w} {w}w' for w in ImageService.WIDTHS),
+            'formats': list(ImageService.formats()),
+            'widths': list(ImageService.WIDTHS)
+        }), 201
+
+    except ImageProcessingError as e:
+        return jsonify({'error': str(e)}), 422
+    except Exception as e:
+        return jsonify({'error': f'Failed to process image: {str(e)}'}), 500
+
+@images_bp.route('/<digest>/<int:width>', methods=['GET'])
+@images_bp.route('/<digest>/<int:width>.<fmt>', methods=['GET'])
+def get_image(digest, width, fmt=None):
+    """Serve a content-addressed variant; without an extension the format is negotiated."""
+    if not DIGEST_PATTERN.match(digest):
+        return jsonify({'error': 'Image not found'}), 404
+
+    negotiated = fmt is None
+    fmt = fmt or ImageService.negotiate_format(request.headers.get('Accept'))
+
+    try:
+        path = ImageService.get_variant(digest, width, fmt)
+    except ImageProcessingError as e:
+        return jsonify({'error': str(e)}), 422
+
+    if not path:
+        return jsonify({'error': 'Image not found'}), 404
+
+    response = send_file(path, mimetype=ImageService.MIMETYPES[fmt], conditional=True, etag=True)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE
+    if negotiated:
+        response.headers['Vary'] = 'Accept'
+    return response
+
+@images_bp.route('/source/<key>/<int:width>', methods=['GET'])
+def get_source_image(key, width):
+    """
+    Resolve a source URL registered by an API response, ingesting it on first
+    use, and redirect to its immutable content-addressed variant.
+    """
+    url = ImageService.source_url(key)
+    if not url:
+        return jsonify({'error': 'Image not found'}), 404
+
+    try:
+        digest = ImageService.ingest_url(url)
+    except ImageProcessingError:
+        # Fall back to the original image rather than breaking the page
+        return redirect(url, code=302)
+
+    response = redirect(f'/api/images/{digest}/{width}', code=302)
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
+
+@images_bp.route('/stats', methods=['GET'])
+def get_image_stats():
+    return jsonify(ImageService.get_stats())
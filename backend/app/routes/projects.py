@@ -2,10 +2,18 @@ from flask import Blueprint, jsonify, request
 from app.models import Project
 from app import db
 from app.services.github_service import GitHubService
+from app.services.github_rate_limiter import rate_limiter, GitHubRateLimitError
+from app.services.technology_index import TechnologyIndex
+from app.services.skill_calculator import SkillCalculator
+from app.serializers import serialize, serialize_many, serializer_for
+from app.pagination import paginate, parse_fields, parse_limit, PaginationError
+from app.query_budget import query_budget
 import os
 
 projects_bp = Blueprint('projects', __name__)
 
+MAX_PAGE_SIZE = 100
+
 @projects_bp.route('/', methods=['GET', 'POST'])
 def projects():
     if request.method == 'POST':
@@ -21,6 +29,35 @@ def project(project_id):
     elif request.method == 'DELETE':
         return delete_project(project_id)
 
+def skills_auto_sync_enabled():
+    return os.getenv('SKILLS_AUTO_SYNC', 'true').lower() == 'true'
+
+def sync_skills_for_technologies(technology_keys):
+    """
+    Recalculate the skills affected by a project write. Runs after the project
+    commit so a skills problem never fails the write; POST /api/skills/calculate
+    remains available to repair a full sync.
+    """
+    if not technology_keys or not skills_auto_sync_enabled():
+        return
+    try:
+        SkillCalculator.recalculate_technologies(technology_keys)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Incremental skill sync failed: {str(e)}")
+
+def github_languages_from(data):
+    """Language byte counts from a GitHub import, or None if absent or malformed."""
+    languages = data.get('github_languages')
+    if not isinstance(languages, dict):
+        return None
+    cleaned = {
+        str(language)[:100]: int(byte_count) for language, byte_count in languages.items()
+        if isinstance(byte_count, (int, float)) and byte_count > 0
+    }
+    return cleaned or None
+
 def add_project():
     try:
         data = request.get_json()
@@ -57,7 +94,8 @@ def add_project():
             'live_url': data.get('live_url', ''),
             'image_url': data.get('image_url', ''),
             'featured': data.get('featured', False),
-            'order': data.get('order', 0)
+            'order': data.get('order') or 0,
+            'github_languages': github_languages_from(data)
         }
         
         try:
@@ -69,47 +107,48 @@ def add_project():
         project = Project(**project_data)
         
         db.session.add(project)
+        db.session.flush()
+        changed_technologies = TechnologyIndex.index_project(project)
         db.session.commit()
         
-        response_data = {
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'technologies': project.technologies,
-            'github_url': project.github_url,
-            'live_url': project.live_url,
-            'image_url': project.image_url,
-            'featured': project.featured,
-            'order': project.order
-        }
-        
-        if hasattr(project, 'github_account'):
-            response_data['github_account'] = getattr(project, 'github_account', None)
+        sync_skills_for_technologies(changed_technologies)
         
-        return jsonify(response_data), 201
+        return jsonify(serialize(project)), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@query_budget(2)
 def get_projects():
+    """
+    List projects by display order. Unpaginated unless limit or cursor is given;
+    the next page's cursor is returned in the X-Next-Cursor header so the body
+    stays a plain array.
+    """
     try:
-        projects = Project.query.order_by(Project.order.desc()).all()
-        
-        return jsonify([{
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'technologies': project.technologies,
-            'github_url': project.github_url,
-            'github_account': getattr(project, 'github_account', None),
-            'live_url': project.live_url,
-            'image_url': project.image_url,
-            'featured': project.featured,
-            'order': project.order,
-            'created_at': project.created_at.isoformat() if project.created_at else None
-        } for project in projects])
-        
+        technology = request.args.get('technology', '').strip()
+        if technology:
+            # "Projects using X" through the normalized technology tables
+            query = TechnologyIndex.projects_using(technology)
+        else:
+            query = Project.query
+        
+        serializer = parse_fields(request.args.get('fields'), serializer_for(Project))
+        projects, next_cursor = paginate(
+            query, [Project.order, Project.id],
+            cursor=request.args.get('cursor'),
+            limit=parse_limit(request.args.get('limit'), None, MAX_PAGE_SIZE),
+            serializer=serializer
+        )
+        
+        response = jsonify(serializer.dump_many(projects))
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+        
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -140,27 +179,25 @@ def fetch_github_project():
         
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except GitHubRateLimitError as e:
+        return rate_limited_response(e)
     except Exception as e:
         return jsonify({'error': f'Failed to fetch GitHub data: {str(e)}'}), 500
 
+def rate_limited_response(error):
+    response = jsonify({
+        'error': 'GitHub API rate limit reached. Please try again later.',
+        'retry_after': error.retry_after
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
 def get_project(project_id):
     project = Project.query.get(project_id)
     if not project:
         return jsonify({'error': 'Project not found'}), 404
     
-    return jsonify({
-        'id': project.id,
-        'title': project.title,
-        'description': project.description,
-        'technologies': project.technologies,
-        'github_url': project.github_url,
-        'github_account': getattr(project, 'github_account', None),
-        'live_url': project.live_url,
-        'image_url': project.image_url,
-        'featured': project.featured,
-        'order': project.order,
-        'created_at': project.created_at.isoformat() if project.created_at else None
-    })
+    return jsonify(serialize(project))
 
 def update_project(project_id):
     try:
@@ -169,6 +206,8 @@ def update_project(project_id):
             return jsonify({'error': 'Project not found'}), 404
         
         data = request.get_json()
+        was_featured = project.featured
+        old_languages = project.github_languages
         
         # Update only the fields that are provided in the request
         if 'title' in data:
@@ -188,22 +227,19 @@ def update_project(project_id):
         if 'featured' in data:
             project.featured = data.get('featured', False)
         if 'order' in data:
-            project.order = data.get('order', 0)
-        
+            project.order = data.get('order') or 0
+        if 'github_languages' in data:
+            project.github_languages = github_languages_from(data)
+        
+        changed_technologies = TechnologyIndex.index_project(project)
+        if project.featured != was_featured or project.github_languages != old_languages:
+            # Featured status and language share feed into the level of every technology on the project
+            changed_technologies |= TechnologyIndex.project_keys(project.id)
         db.session.commit()
         
-        return jsonify({
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'technologies': project.technologies,
-            'github_url': project.github_url,
-            'github_account': getattr(project, 'github_account', None),
-            'live_url': project.live_url,
-            'image_url': project.image_url,
-            'featured': project.featured,
-            'order': project.order
-        })
+        sync_skills_for_technologies(changed_technologies)
+        
+        return jsonify(serialize(project))
         
     except Exception as e:
         db.session.rollback()
@@ -215,9 +251,12 @@ def delete_project(project_id):
         if not project:
             return jsonify({'error': 'Project not found'}), 404
         
+        changed_technologies = TechnologyIndex.remove_project(project.id)
         db.session.delete(project)
         db.session.commit()
         
+        sync_skills_for_technologies(changed_technologies)
+        
         return jsonify({'message': 'Project deleted successfully'})
         
     except Exception as e:
@@ -252,6 +291,8 @@ def fetch_github_repositories():
                 # Fetch repositories for this account
                 repos = github_service.fetch_user_repositories(account.strip())
                 all_repos.extend(repos)
+            except GitHubRateLimitError:
+                raise
             except Exception as e:
                 # Log the error but continue with other accounts
                 print(f"Error fetching repos for {account}: {str(e)}")
@@ -262,10 +303,20 @@ def fetch_github_repositories():
             'total_count': len(all_repos)
         }), 200
         
+    except GitHubRateLimitError as e:
+        return rate_limited_response(e)
     except Exception as e:
         return jsonify({'error': f'Failed to fetch GitHub repositories: {str(e)}'}), 500
 
+@projects_bp.route('/github-rate-limit', methods=['GET'])
+def get_github_rate_limit():
+    return jsonify({
+        'authenticated': bool(os.getenv('GITHUB_TOKEN')),
+        'quotas': rate_limiter.get_state()
+    })
+
 @projects_bp.route('/featured', methods=['GET'])
+@query_budget(1)
 def get_featured_projects():
     try:
         projects = Project.query.filter_by(featured=True).order_by(Project.order.desc()).all()
@@ -273,18 +324,7 @@ def get_featured_projects():
         # If query fails, return empty list with error
         return jsonify({'error': str(e), 'projects': []}), 500
 
-    return jsonify([{
-        'id': project.id,
-        'title': project.title,
-        'description': project.description,
-        'technologies': project.technologies,
-        'github_url': project.github_url,
-        'github_account': getattr(project, 'github_account', None),
-        'live_url': project.live_url,
-        'image_url': project.image_url,
-        'featured': project.featured,
-        'order': project.order
-    } for project in projects])
+    return jsonify(serialize_many(projects, Project))
 
 @projects_bp.route('/github-accounts', methods=['GET'])
 def get_github_accounts():
@@ -353,13 +393,21 @@ def populate_sample_projects():
         ]
         
         created_projects = []
+        new_projects = []
         for project_data in sample_projects:
             project = Project(**project_data)
             db.session.add(project)
+            new_projects.append(project)
             created_projects.append(project_data['title'])
         
+        db.session.flush()
+        changed_technologies = set()
+        for project in new_projects:
+            changed_technologies |= TechnologyIndex.index_project(project)
         db.session.commit()
         
+        sync_skills_for_technologies(changed_technologies)
+        
         return jsonify({
             'status': 'success',
             'message': f'Created {len(created_projects)} sample projects',
@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from app.models import PersonalInfo, Experience, Education, Certificate
 from app import db
+from app.serializers import serialize, serialize_many
 from datetime import datetime
 
 resume_bp = Blueprint('resume', __name__)
@@ -57,18 +58,7 @@ def get_personal_info():
                 'summary': 'Full-stack developer who enjoys building web apps with React and Python. I like figuring out complex problems and turning them into simple, working solutions.'
             })
     
-        return jsonify({
-            'id': personal_info.id,
-            'name': personal_info.name,
-            'title': personal_info.title,
-            'email': personal_info.email,
-            'phone': personal_info.phone,
-            'location': personal_info.location,
-            'linkedin': personal_info.linkedin,
-            'github': personal_info.github,
-            'website': personal_info.website,
-            'summary': personal_info.summary
-        })
+        return jsonify(serialize(personal_info))
     except Exception as e:
         print(f"Error in get_personal_info: {str(e)}")
         import traceback
@@ -96,17 +86,7 @@ def get_experience():
                 'achievements': '• Improved application performance by 40%\n• Worked with a team of 3 developers\n• Set up CI/CD pipeline that cut deployment time by 60%'
             }])
     
-        return jsonify([{
-            'id': exp.id,
-            'company': exp.company,
-            'position': exp.position,
-            'start_date': exp.start_date.isoformat() if exp.start_date else None,
-            'end_date': exp.end_date.isoformat() if exp.end_date else None,
-            'current': exp.current,
-            'description': exp.description,
-            'technologies': exp.technologies,
-            'achievements': exp.achievements
-        } for exp in experiences])
+        return jsonify(serialize_many(experiences, Experience))
     except Exception as e:
         print(f"Error in get_experience: {str(e)}")
         import traceback
@@ -132,16 +112,7 @@ def get_education():
             'description': 'Relevant coursework: Data Structures, Algorithms, Web Development, Database Systems'
         }])
     
-    return jsonify([{
-        'id': edu.id,
-        'institution': edu.institution,
-        'degree': edu.degree,
-        'field': edu.field,
-        'start_date': edu.start_date.isoformat() if edu.start_date else None,
-        'end_date': edu.end_date.isoformat() if edu.end_date else None,
-        'gpa': edu.gpa,
-        'description': edu.description
-    } for edu in education])
+    return jsonify(serialize_many(education, Education))
 
 @resume_bp.route('/certificates', methods=['GET', 'POST'])
 def get_certificates():
@@ -169,14 +140,7 @@ def get_certificates():
             db.session.add(new_certificate)
             db.session.commit()
 
-            return jsonify({
-                'id': new_certificate.id,
-                'entity': new_certificate.entity,
-                'course': new_certificate.course,
-                'issue_date': new_certificate.issue_date.isoformat() if new_certificate.issue_date else None,
-                'credential_url': new_certificate.credential_url,
-                'photo_url': new_certificate.photo_url
-            }), 201
+            return jsonify(serialize(new_certificate)), 201
 
         except Exception as e:
             db.session.rollback()
@@ -219,14 +183,7 @@ def get_certificates():
             'photo_url': None
         }])
 
-    return jsonify([{
-        'id': cert.id,
-        'entity': cert.entity,
-        'course': cert.course,
-        'issue_date': cert.issue_date.isoformat() if cert.issue_date else None,
-        'credential_url': cert.credential_url,
-        'photo_url': cert.photo_url
-    } for cert in certificates])
+    return jsonify(serialize_many(certificates, Certificate))
 
 @resume_bp.route('/certificates/<int:certificate_id>', methods=['GET', 'PUT', 'DELETE'])
 def certificate_by_id(certificate_id):
@@ -242,15 +199,7 @@ def certificate_by_id(certificate_id):
         return jsonify({'error': 'Certificate not found'}), 404
     
     if request.method == 'GET':
-        return jsonify({
-            'id': certificate.id,
-            'entity': certificate.entity,
-            'course': certificate.course,
-            'issue_date': certificate.issue_date.isoformat() if certificate.issue_date else None,
-            'credential_url': certificate.credential_url,
-            'photo_url': certificate.photo_url,
-            'order': certificate.order
-        })
+        return jsonify(serialize(certificate, 'detail'))
     
     elif request.method == 'PUT':
         data = request.get_json()
@@ -296,20 +245,7 @@ def certificate_by_id(certificate_id):
             
             db.session.commit()
             
-            return jsonify({
-                'id': certificate.id,
-                'entity': certificate.entity,
-                'course': certificate.course,
-                'topics': certificate.topics,
-                'description': certificate.description,
-                'credit_hrs': certificate.credit_hrs,
-                'issue_date': certificate.issue_date.isoformat() if certificate.issue_date else None,
-                'expiry_date': certificate.expiry_date.isoformat() if certificate.expiry_date else None,
-                'credential_id': certificate.credential_id,
-                'credential_url': certificate.credential_url,
-                'photo_url': certificate.photo_url,
-                'order': certificate.order
-            })
+            return jsonify(serialize(certificate, 'detail'))
         
         except Exception as e:
             db.session.rollback()
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from app.models import Skill
 from app import db
 from app.services.skill_calculator import SkillCalculator
+from app.serializers import serialize, serializer_for
 from datetime import datetime
 import os
 
@@ -57,15 +58,12 @@ def get_skills():
         })
     
     # Group skills by their category for organized frontend display
+    summary = serializer_for(Skill, 'summary')
     skills_by_category = {}
     for skill in skills:
         if skill.category not in skills_by_category:
             skills_by_category[skill.category] = []
-        skills_by_category[skill.category].append({
-            'name': skill.name,
-            'level': skill.level,
-            'category': skill.category
-        })
+        skills_by_category[skill.category].append(summary.dump(skill))
     
     return jsonify(skills_by_category)
 
@@ -119,29 +117,22 @@ def calculate_skills():
 def get_skill_insights():
     """
     Get insights about skills and project alignment.
+    Cached until a project, skill or technology write is committed;
+    pass ?stale_while_revalidate=true to get the previous result while it refreshes.
     """
     try:
-        # Check if we have projects to analyze
-        from app.models import Project
-        project_count = Project.query.count()
-        
-        if project_count == 0:
-            return jsonify({
-                'total_projects': 0,
-                'total_technologies': 0,
-                'total_skills': 0,
-                'missing_skills': [],
-                'unused_skills': [],
-                'project_tech_distribution': {},
-                'message': 'No projects found to analyze'
-            })
+        stale_while_revalidate = request.args.get(
+            'stale_while_revalidate',
+            os.getenv('SKILL_INSIGHTS_STALE_WHILE_REVALIDATE', 'false')
+        ).lower() == 'true'
         
         # Try full insights calculation, fall back if needed
         try:
-            insights = SkillCalculator.get_skill_insights()
-            return jsonify(insights)
+            insights, version, cache_status = SkillCalculator.get_cached_skill_insights(stale_while_revalidate)
         except Exception as insights_error:
             print(f"Full insights calculation failed: {str(insights_error)}")
+            from app.models import Project
+            project_count = Project.query.count()
             # Fallback to basic but realistic insights
             return jsonify({
                 'total_projects': project_count,
@@ -159,6 +150,24 @@ def get_skill_insights():
                 'note': 'Some features may be limited due to database compatibility'
             })
         
+        if insights['total_projects'] == 0:
+            response = jsonify({
+                'total_projects': 0,
+                'total_technologies': 0,
+                'total_skills': 0,
+                'missing_skills': [],
+                'unused_skills': [],
+                'project_tech_distribution': {},
+                'message': 'No projects found to analyze'
+            })
+        else:
+            response = jsonify(insights)
+        
+        response.set_etag('insights-' + '-'.join(str(v) for v in version))
+        response.headers['X-Cache'] = cache_status.upper()
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+        
     except Exception as e:
         print(f"Skills insights error: {str(e)}")
         return jsonify({
@@ -176,25 +185,22 @@ def skill_detail(skill_id):
         return jsonify({'error': 'Skill not found'}), 404
     
     if request.method == 'GET':
-        return jsonify({
-            'id': skill.id,
-            'name': skill.name,
-            'category': skill.category,
-            'level': skill.level,
-            'order': skill.order,
-            'manual_override': skill.manual_override,
-            'auto_calculated_level': skill.auto_calculated_level,
-            'project_count': skill.project_count,
-            'last_calculated': skill.last_calculated.isoformat() if skill.last_calculated else None
-        })
+        return jsonify(serialize(skill))
     
     elif request.method == 'PUT':
         try:
             data = request.get_json()
             
+            if 'name' in data:
+                name = normalize_skill_name(data['name'])
+                if not name:
+                    return jsonify({'error': 'Name is required'}), 400
+                if skill_name_taken(name, exclude_id=skill.id):
+                    return jsonify({'error': 'A skill with this name already exists'}), 409
+            
             # Update skill fields
             if 'name' in data:
-                skill.name = data['name']
+                skill.name = name
             if 'category' in data:
                 skill.category = data['category']
             if 'level' in data:
@@ -205,14 +211,7 @@ def skill_detail(skill_id):
             
             db.session.commit()
             
-            return jsonify({
-                'id': skill.id,
-                'name': skill.name,
-                'category': skill.category,
-                'level': skill.level,
-                'order': skill.order,
-                'manual_override': skill.manual_override
-            })
+            return jsonify(serialize(skill))
             
         except Exception as e:
             db.session.rollback()
@@ -228,6 +227,20 @@ def skill_detail(skill_id):
             db.session.rollback()
             return jsonify({'error': str(e)}), 500
 
+def normalize_skill_name(name):
+    """The form a skill name is stored in: surrounding whitespace stripped."""
+    return (name or '').strip()
+
+def skill_name_taken(name, exclude_id=None):
+    """
+    Skill names are unique case-insensitively (uq_skill_name_lower); name must
+    already be normalized, as it is stored.
+    """
+    query = Skill.query.filter(db.func.lower(Skill.name) == name.lower())
+    if exclude_id is not None:
+        query = query.filter(Skill.id != exclude_id)
+    return db.session.query(query.exists()).scalar()
+
 @skills_bp.route('/add', methods=['POST'])
 def add_skill():
     """
@@ -235,13 +248,17 @@ def add_skill():
     """
     try:
         data = request.get_json()
+        name = normalize_skill_name(data.get('name'))
         
         # Validate required fields
-        if not data.get('name') or not data.get('category'):
+        if not name or not data.get('category'):
             return jsonify({'error': 'Name and category are required'}), 400
         
+        if skill_name_taken(name):
+            return jsonify({'error': 'A skill with this name already exists'}), 409
+        
         new_skill = Skill(
-            name=data['name'],
+            name=name,
             category=data['category'],
             level=data.get('level', 3),
             order=data.get('order', 0),
@@ -251,14 +268,7 @@ def add_skill():
         db.session.add(new_skill)
         db.session.commit()
         
-        return jsonify({
-            'id': new_skill.id,
-            'name': new_skill.name,
-            'category': new_skill.category,
-            'level': new_skill.level,
-            'order': new_skill.order,
-            'manual_override': new_skill.manual_override
-        }), 201
+        return jsonify(serialize(new_skill)), 201
         
     except Exception as e:
         db.session.rollback()
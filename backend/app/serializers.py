@@ -0,0 +1,294 @@
+"""
+Model serializers and the orjson-backed JSON provider.
+
+Each model view is registered once with its field list, and the list is
+compiled into a single operator.attrgetter. Routes and Socket.IO payloads
+share these views instead of building dicts field by field. Values are left
+as native Python types (datetime, date, Decimal) and encoded by orjson, so
+dates come out as ISO 8601 strings without per-field isoformat() calls.
+"""
+
+import decimal
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import orjson
+from flask.json.provider import JSONProvider
+from sqlalchemy import func, inspect as sa_inspect
+from sqlalchemy.orm import selectinload
+
+from app.models import (
+    PersonalInfo, Experience, Education, Project, Skill, Certificate,
+    AnalyticsSession, AnalyticsEvent, AnalyticsMetrics, SystemHealth
+)
+from app.services.image_service import ImageService
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson doesn't encode natively."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that encodes with orjson; used by jsonify and request.get_json."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # Skip the str round trip of the base implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype='application/json')
+
+
+class socket_json:
+    """json module stand-in so Socket.IO packets are encoded the same way as API responses."""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode('utf-8')
+
+    @staticmethod
+    def loads(s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+class ModelSerializer:
+    """One serialized view of a model, with its field list compiled up front."""
+
+    def __init__(self, model: type, fields: Iterable, extra: Optional[Callable[[Any], Dict]] = None,
+                 extra_fields: Iterable[str] = (), extra_requires: Iterable[str] = (),
+                 joined: Optional[Dict[str, tuple]] = None):
+        """
+        Args:
+            model: Model class the view belongs to
+            fields: Attribute names, or (output name, attribute name) pairs to rename
+            extra: Optional callable returning computed fields for an instance
+            extra_fields: Output names produced by extra
+            extra_requires: Attributes extra reads, so sparse selects still load them
+            joined: {output name: (relationship name, SQL expression)} for fields read
+                from a related table; these are only available through load()
+        """
+        self.model = model
+        self._column_pairs = [(field, field) if isinstance(field, str) else tuple(field) for field in fields]
+        self.joined = dict(joined or {})
+        self._pairs = self._column_pairs + [(name, name) for name in self.joined]
+        self.fields = tuple(name for name, _ in self._pairs)
+        getter = operator.attrgetter(*(attr for _, attr in self._pairs)) if self._pairs else (lambda obj: ())
+        # attrgetter returns a bare value rather than a tuple for a single attribute
+        self._getter = getter if len(self._pairs) != 1 else (lambda obj: (getter(obj),))
+        self.extra = extra
+        self.extra_fields = tuple(extra_fields)
+        self.extra_requires = tuple(extra_requires)
+
+    def dump(self, obj: Any) -> Dict[str, Any]:
+        data = dict(zip(self.fields, self._getter(obj)))
+        if self.extra:
+            data.update(self.extra(obj))
+        return data
+
+    def dump_many(self, objs: Iterable[Any]) -> List[Dict[str, Any]]:
+        fields, getter, extra = self.fields, self._getter, self.extra
+        if extra is None:
+            return [dict(zip(fields, getter(obj))) for obj in objs]
+        result = []
+        for obj in objs:
+            data = dict(zip(fields, getter(obj)))
+            data.update(extra(obj))
+            result.append(data)
+        return result
+
+    def only(self, names: Iterable[str]) -> 'ModelSerializer':
+        """
+        Restrict the view to a sparse fieldset (the fields= query parameter).
+
+        Raises:
+            ValueError: If a name isn't part of this view
+        """
+        names = set(names)
+        unknown = names - set(self.fields) - set(self.extra_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        pairs = [pair for pair in self._column_pairs if pair[0] in names]
+        joined = {name: spec for name, spec in self.joined.items() if name in names}
+        wanted_extra = names & set(self.extra_fields)
+        extra = None
+        if wanted_extra:
+            full_extra = self.extra
+            extra = lambda obj: {key: value for key, value in full_extra(obj).items() if key in wanted_extra}
+        return ModelSerializer(
+            self.model, pairs, extra, wanted_extra, self.extra_requires if wanted_extra else (), joined
+        )
+
+    def columns(self) -> Optional[List[Any]]:
+        """
+        Columns this view reads, for selecting only those in SQL.
+
+        Returns None when an extra needs a relationship, in which case callers
+        load full instances.
+        """
+        column_attrs = sa_inspect(self.model).column_attrs
+        attrs = []
+        for attr in [attr for _, attr in self._column_pairs] + list(self.extra_requires):
+            if attr not in column_attrs:
+                return None
+            if attr not in attrs:
+                attrs.append(attr)
+        return [getattr(self.model, attr) for attr in attrs] + [
+            expression.label(name) for name, (_, expression) in self.joined.items()
+        ]
+
+    def load(self, query, extra_columns: Iterable[Any] = ()):
+        """
+        Shape query to fetch exactly what this view dumps, in a single statement.
+
+        Selects only the view's columns (plus extra_columns, e.g. sort keys),
+        outer-joining the tables of joined fields. Views whose extras need a
+        relationship load full instances with the relationship selectin-loaded,
+        so serializing never lazy-loads per row.
+        """
+        columns = self.columns()
+        if columns is None:
+            relationships = sa_inspect(self.model).relationships
+            return query.options(*[
+                selectinload(getattr(self.model, attr)) for attr in self.extra_requires if attr in relationships
+            ])
+
+        keys = {column.key for column in columns}
+        columns += [column for column in extra_columns if column.key not in keys]
+        for relationship in dict.fromkeys(relationship for relationship, _ in self.joined.values()):
+            query = query.outerjoin(getattr(self.model, relationship))
+        return query.with_entities(*columns)
+
+
+_registry: Dict[tuple, ModelSerializer] = {}
+
+
+def register(model: type, fields: Iterable, view: str = 'default',
+             extra: Optional[Callable[[Any], Dict]] = None, extra_fields: Iterable[str] = (),
+             extra_requires: Iterable[str] = (), joined: Optional[Dict[str, tuple]] = None) -> ModelSerializer:
+    serializer = ModelSerializer(model, fields, extra, extra_fields, extra_requires, joined)
+    _registry[(model, view)] = serializer
+    return serializer
+
+
+def serializer_for(model: type, view: str = 'default') -> ModelSerializer:
+    try:
+        return _registry[(model, view)]
+    except KeyError:
+        raise LookupError(f'No serializer registered for {model.__name__} view {view!r}')
+
+
+def serialize(obj: Any, view: str = 'default') -> Dict[str, Any]:
+    """Serialize one model instance with a registered view."""
+    return serializer_for(type(obj), view).dump(obj)
+
+
+def serialize_many(objs: Iterable[Any], model: type, view: str = 'default') -> List[Dict[str, Any]]:
+    """Serialize a list of model instances with a registered view."""
+    return serializer_for(model, view).dump_many(objs)
+
+
+# Computed fields
+
+PROJECT_IMAGE_FIELDS = ('image_url_optimized', 'image_srcset')
+CERTIFICATE_PHOTO_FIELDS = ('photo_url_optimized', 'photo_srcset')
+
+
+def _project_images(project: Project) -> Dict[str, Any]:
+    optimized = ImageService.optimized_urls(project.image_url)
+    return {'image_url_optimized': optimized['url'], 'image_srcset': optimized['srcset']}
+
+
+def _certificate_photos(certificate: Certificate) -> Dict[str, Any]:
+    optimized = ImageService.optimized_urls(certificate.photo_url)
+    return {'photo_url_optimized': optimized['url'], 'photo_srcset': optimized['srcset']}
+
+
+def _anonymized_ip(session: AnalyticsSession) -> Dict[str, Any]:
+    return {'ip_address': (session.ip_address or '')[:8] + '***'}
+
+
+# Resume
+
+register(PersonalInfo, (
+    'id', 'name', 'title', 'email', 'phone', 'location', 'linkedin', 'github', 'website', 'summary'
+))
+register(Experience, (
+    'id', 'company', 'position', 'start_date', 'end_date', 'current',
+    'description', 'technologies', 'achievements'
+))
+register(Education, (
+    'id', 'institution', 'degree', 'field', 'start_date', 'end_date', 'gpa', 'description'
+))
+register(Certificate, (
+    'id', 'entity', 'course', 'issue_date', 'credential_url', 'photo_url', 'order'
+), extra=_certificate_photos, extra_fields=CERTIFICATE_PHOTO_FIELDS, extra_requires=('photo_url',))
+register(Certificate, (
+    'id', 'entity', 'course', 'topics', 'description', 'credit_hrs', 'issue_date', 'expiry_date',
+    'credential_id', 'credential_url', 'photo_url', 'order'
+), view='detail', extra=_certificate_photos, extra_fields=CERTIFICATE_PHOTO_FIELDS, extra_requires=('photo_url',))
+
+# Projects and skills
+
+register(Project, (
+    'id', 'title', 'description', 'technologies', 'github_url', 'github_account',
+    'live_url', 'image_url', 'featured', 'order', 'created_at'
+), extra=_project_images, extra_fields=PROJECT_IMAGE_FIELDS, extra_requires=('image_url',))
+register(Skill, (
+    'id', 'name', 'category', 'level', 'order', 'manual_override',
+    'auto_calculated_level', 'project_count', 'last_calculated'
+))
+register(Skill, ('name', 'level', 'category'), view='summary')
+
+# Analytics
+
+register(AnalyticsSession, (
+    'id', 'device_type', 'browser', 'os', 'started_at', 'last_activity', 'page_views',
+    ('total_time', 'total_time_seconds')
+), view='active')
+register(AnalyticsSession, (
+    'id', 'device_type', 'browser', 'os', 'started_at', 'total_time_seconds', 'page_views'
+), view='export', extra=_anonymized_ip, extra_fields=('ip_address',), extra_requires=('ip_address',))
+register(AnalyticsSession, (
+    ('session_id', 'id'), 'device_type', 'browser', ('timestamp', 'started_at')
+), view='live')
+
+register(AnalyticsEvent, (
+    'id', 'event_type', 'event_category', 'event_label', 'page_path', 'timestamp'
+), view='recent', joined={
+    'session_device': ('session', func.coalesce(AnalyticsSession.device_type, 'unknown'))
+})
+register(AnalyticsEvent, (
+    'event_type', 'event_category', 'event_label', 'page_path', 'timestamp', ('metadata', 'event_metadata')
+), view='export')
+register(AnalyticsEvent, (
+    'event_type', 'event_category', 'event_label', 'timestamp'
+), view='live')
+
+register(AnalyticsMetrics, (
+    'date', 'unique_visitors', 'total_sessions', 'total_page_views', 'avg_session_duration',
+    'bounce_rate', 'project_clicks', 'skill_interactions', 'top_projects', 'top_skills_viewed',
+    'device_breakdown', 'browser_breakdown'
+), view='export')
+
+register(SystemHealth, ('cpu_usage', 'memory_usage', 'disk_usage', 'status', 'timestamp'))
+register(SystemHealth, (
+    ('cpu', 'cpu_usage'), ('memory', 'memory_usage'), ('disk', 'disk_usage'), 'status', 'timestamp'
+), view='live')
@@ -0,0 +1,227 @@
+"""
+Hourly analytics rollups with mergeable sketches.
+
+Each hour of raw sessions and events is folded into one
+AnalyticsHourlyRollup row. The row holds totals, per-type event counts, a
+HyperLogLog of visitor IPs and Space-Saving top-k sketches of projects,
+skills and pages. Range questions such as "unique visitors over the last 90
+days" or "top projects this quarter" merge the hourly rows. They run in
+constant memory, and the raw tables can later be pruned (see the retention
+job).
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import AnalyticsSession, AnalyticsEvent, AnalyticsHourlyRollup
+from app.services.sketches import HyperLogLog, SpaceSaving
+
+HOUR = timedelta(hours=1)
+
+
+def hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class _HourAccumulator:
+    __slots__ = ('sessions', 'page_views', 'events', 'event_counts', 'visitors', 'projects', 'skills', 'pages')
+
+    def __init__(self):
+        self.sessions = 0
+        self.page_views = 0
+        self.events = 0
+        self.event_counts: Dict[str, int] = {}
+        self.visitors = HyperLogLog()
+        self.projects = SpaceSaving()
+        self.skills = SpaceSaving()
+        self.pages = SpaceSaving()
+
+
+class AnalyticsRollupService:
+    """Builds hourly rollups and answers range queries from them."""
+
+    STREAM_BATCH = 5000
+
+    @classmethod
+    def rollup_day(cls, day: date) -> int:
+        """Roll up the 24 hours of a day (without committing); returns the number of rollup rows written."""
+        start = datetime.combine(day, datetime.min.time())
+        return cls.rollup_range(start, start + timedelta(days=1))
+
+    @classmethod
+    def rollup_range(cls, start: datetime, end: datetime) -> int:
+        """
+        (Re)compute the rollups of every hour in [start, end).
+
+        Sessions and events are each streamed once, bucketed by hour in Python,
+        rather than queried per hour. Visitor IPs are hashed into the sketch in
+        batches. The rows are flushed, not committed; the caller owns the
+        transaction.
+
+        Args:
+            start: First hour (truncated to the hour)
+            end: End of the range, exclusive
+
+        Returns:
+            Number of hourly rows written
+        """
+        start = hour_start(start)
+        hours: Dict[datetime, _HourAccumulator] = {}
+        visitor_batches: Dict[datetime, list] = {}
+
+        sessions = db.session.execute(select(
+            AnalyticsSession.started_at, AnalyticsSession.ip_address, AnalyticsSession.page_views
+        ).where(
+            AnalyticsSession.started_at >= start, AnalyticsSession.started_at < end
+        ).execution_options(yield_per=cls.STREAM_BATCH))
+        for started_at, ip_address, page_views in sessions:
+            bucket = hour_start(started_at)
+            acc = hours.get(bucket) or hours.setdefault(bucket, _HourAccumulator())
+            acc.sessions += 1
+            acc.page_views += page_views or 0
+            batch = visitor_batches.setdefault(bucket, [])
+            batch.append(ip_address or '')
+            if len(batch) >= cls.STREAM_BATCH:
+                acc.visitors.add_many(batch)
+                batch.clear()
+        for bucket, batch in visitor_batches.items():
+            hours[bucket].visitors.add_many(batch)
+
+        events = db.session.execute(select(
+            AnalyticsEvent.timestamp, AnalyticsEvent.event_type, AnalyticsEvent.event_label, AnalyticsEvent.page_path
+        ).where(
+            AnalyticsEvent.timestamp >= start, AnalyticsEvent.timestamp < end
+        ).execution_options(yield_per=cls.STREAM_BATCH))
+        for timestamp, event_type, label, page_path in events:
+            bucket = hour_start(timestamp)
+            acc = hours.get(bucket) or hours.setdefault(bucket, _HourAccumulator())
+            acc.events += 1
+            acc.event_counts[event_type] = acc.event_counts.get(event_type, 0) + 1
+            if event_type == 'project_click':
+                acc.projects.add(label)
+            elif event_type.startswith('skill_'):
+                acc.skills.add(label)
+            elif event_type == 'page_view':
+                acc.pages.add(page_path)
+
+        existing = {
+            row.hour: row for row in AnalyticsHourlyRollup.query.filter(
+                AnalyticsHourlyRollup.hour >= start, AnalyticsHourlyRollup.hour < end
+            )
+        }
+        now = datetime.utcnow()
+        for bucket in sorted(set(hours) | set(existing)):
+            acc = hours.get(bucket) or _HourAccumulator()
+            row = existing.get(bucket)
+            if row is None:
+                row = AnalyticsHourlyRollup(hour=bucket)
+                db.session.add(row)
+            row.sessions = acc.sessions
+            row.page_views = acc.page_views
+            row.events = acc.events
+            row.event_counts = acc.event_counts
+            row.visitors_sketch = acc.visitors.to_bytes()
+            row.top_projects_sketch = acc.projects.to_dict()
+            row.top_skills_sketch = acc.skills.to_dict()
+            row.top_pages_sketch = acc.pages.to_dict()
+            row.updated_at = now
+
+        db.session.flush()
+        return len(set(hours) | set(existing))
+
+    @classmethod
+    def summarize(cls, start: datetime, end: datetime, top: int = 10) -> Dict[str, Any]:
+        """
+        Merge the hourly rollups in [start, end).
+
+        Returns:
+            Totals, event counts, estimated unique visitors and the top projects,
+            skills and pages over the range
+        """
+        visitors = HyperLogLog()
+        projects, skills, pages = SpaceSaving(), SpaceSaving(), SpaceSaving()
+        totals = {'sessions': 0, 'page_views': 0, 'events': 0}
+        event_counts: Dict[str, int] = {}
+        hours = 0
+
+        rows = db.session.execute(select(
+            AnalyticsHourlyRollup.sessions, AnalyticsHourlyRollup.page_views, AnalyticsHourlyRollup.events,
+            AnalyticsHourlyRollup.event_counts, AnalyticsHourlyRollup.visitors_sketch,
+            AnalyticsHourlyRollup.top_projects_sketch, AnalyticsHourlyRollup.top_skills_sketch,
+            AnalyticsHourlyRollup.top_pages_sketch
+        ).where(
+            AnalyticsHourlyRollup.hour >= hour_start(start), AnalyticsHourlyRollup.hour < end
+        ).execution_options(yield_per=500))
+        for sessions, page_views, events, counts, visitor_sketch, project_sketch, skill_sketch, page_sketch in rows:
+            hours += 1
+            totals['sessions'] += sessions or 0
+            totals['page_views'] += page_views or 0
+            totals['events'] += events or 0
+            for event_type, count in (counts or {}).items():
+                event_counts[event_type] = event_counts.get(event_type, 0) + count
+            visitors.merge(HyperLogLog.from_bytes(visitor_sketch))
+            projects.merge(SpaceSaving.from_dict(project_sketch))
+            skills.merge(SpaceSaving.from_dict(skill_sketch))
+            pages.merge(SpaceSaving.from_dict(page_sketch))
+
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'hours': hours,
+            **totals,
+            'unique_visitors': visitors.count() if totals['sessions'] else 0,
+            'event_counts': event_counts,
+            'top_projects': [{'title': item, 'clicks': count} for item, count in projects.top(top)],
+            'top_skills_viewed': [{'name': item, 'views': count} for item, count in skills.top(top)],
+            'top_pages': [{'path': item, 'views': count} for item, count in pages.top(top)]
+        }
+
+    @classmethod
+    def refresh(cls, start: datetime, end: datetime) -> int:
+        """
+        Roll up today's hours in [start, end) that haven't been finalized, and commit.
+
+        An hour is final once its row was computed after the hour ended. Hours
+        after the newest final one are recomputed from the raw tables, but
+        never before the start of the current day, so a request does at most a
+        day's work. Earlier gaps (e.g. before the daily job first ran) are left
+        to the daily job.
+
+        Returns:
+            Number of hourly rows written
+        """
+        now = datetime.utcnow()
+        start = max(hour_start(start), datetime.combine(now.date(), datetime.min.time()))
+        end = min(end, hour_start(now) + HOUR)
+        if start >= end:
+            return 0
+
+        rows = db.session.execute(select(AnalyticsHourlyRollup.hour, AnalyticsHourlyRollup.updated_at).where(
+            AnalyticsHourlyRollup.hour >= start, AnalyticsHourlyRollup.hour < end
+        )).all()
+        final = [hour for hour, updated_at in rows if updated_at and updated_at >= hour + HOUR]
+        pending = max(final) + HOUR if final else start
+        if pending >= end:
+            return 0
+
+        try:
+            written = cls.rollup_range(pending, end)
+            db.session.commit()
+            return written
+        except IntegrityError:
+            # Another worker inserted the same hours first; its rows are as fresh
+            db.session.rollback()
+            return 0
+
+    @classmethod
+    def summarize_days(cls, days: int, end: Optional[date] = None, top: int = 10) -> Dict[str, Any]:
+        """Summary of the last days days, ending with end (default today), including today's unprocessed hours."""
+        end_day = (end or date.today()) + timedelta(days=1)
+        end_at = datetime.combine(end_day, datetime.min.time())
+        start_at = end_at - timedelta(days=days)
+        cls.refresh(start_at, end_at)
+        return cls.summarize(start_at, end_at, top)
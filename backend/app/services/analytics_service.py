@@ -9,6 +9,7 @@ This service handles:
 - WebSocket communication for live updates
 """
 
+import os
 import uuid
 import json
 import psutil
@@ -22,49 +23,71 @@ from app.models import (
     AnalyticsSession, AnalyticsEvent, AnalyticsMetrics, 
     SystemHealth, Project, Skill
 )
+from app.partitions import day_range
+from app.serializers import serialize, serializer_for
+from app.services.broadcast import analytics_broadcaster
+from app.services.bulk_loader import BulkLoader
+from app.services.metrics_broadcaster import metrics_broadcaster
+from app.services.session_cache import session_cache
+from app.services.user_agent import UserAgentParser
+from app.services.analytics_rollups import AnalyticsRollupService
 
 class AnalyticsService:
     """Comprehensive analytics service for portfolio tracking"""
     
+    # Event subscribers join one room per event type ('*' for all types)
+    EVENT_ROOM_PREFIX = 'events:'
+    ALL_EVENTS = '*'
+    
+    # When this process last stored a SystemHealth row (time.monotonic)
+    _health_logged_at = float('-inf')
+    
+    @staticmethod
+    def event_room(event_type: str) -> str:
+        """Socket.IO room for subscribers to an event type"""
+        return AnalyticsService.EVENT_ROOM_PREFIX + event_type
+    
     @staticmethod
-    def create_or_update_session(session_data: Dict[str, Any]) -> AnalyticsSession:
-        """Create new session or update existing one"""
+    def create_or_update_session(session_data: Dict[str, Any]) -> str:
+        """
+        Record a page view on an existing session, or create a new one.
+        
+        Page views on known sessions go through the session cache and are
+        written back in batches, so they normally don't touch the database.
+        
+        Returns:
+            The session id
+        """
         session_id = session_data.get('session_id')
         
-        if session_id:
-            session = AnalyticsSession.query.get(session_id)
-            if session:
-                # Update existing session
-                session.last_activity = datetime.utcnow()
-                session.page_views += 1
-                session.total_time_seconds = int(
-                    (datetime.utcnow() - session.started_at).total_seconds()
-                )
-                db.session.commit()
-                return session
-        
-        # Create new session
+        if session_id and session_cache.touch(session_id, page_view=True):
+            return session_id
+        
+        # Create new session, classifying its User-Agent once
+        user_agent = request.headers.get('User-Agent', '')
+        client = UserAgentParser.parse(user_agent)
         session = AnalyticsSession(
             id=str(uuid.uuid4()),
             ip_address=AnalyticsService._get_client_ip(),
-            user_agent=request.headers.get('User-Agent', ''),
+            user_agent=user_agent,
             referrer=session_data.get('referrer', ''),
             country=session_data.get('country', ''),
             city=session_data.get('city', ''),
-            device_type=AnalyticsService._detect_device_type(),
-            browser=AnalyticsService._detect_browser(),
-            os=AnalyticsService._detect_os(),
+            device_type=client.device_type,
+            browser=client.browser,
+            os=client.os,
             screen_resolution=session_data.get('screen_resolution', ''),
             page_views=1
         )
         
         db.session.add(session)
         db.session.commit()
+        session_cache.add(session)
         
         # Emit real-time update
         AnalyticsService._emit_session_update(session)
         
-        return session
+        return session.id
     
     @staticmethod
     def track_event(session_id: str, event_data: Dict[str, Any]) -> AnalyticsEvent:
@@ -84,17 +107,56 @@ class AnalyticsService:
         db.session.add(event)
         db.session.commit()
         
-        # Update session activity
-        session = AnalyticsSession.query.get(session_id)
-        if session:
-            session.last_activity = datetime.utcnow()
-            db.session.commit()
+        # Update session activity (written back in the next batch)
+        session_cache.touch(session_id)
         
         # Emit real-time event update
         AnalyticsService._emit_event_update(event)
         
         return event
     
+    @staticmethod
+    def track_events(events: List[Dict[str, Any]], session_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Track a batch of events with one bulk insert.
+        
+        Args:
+            events: Event payloads, as accepted by track_event
+            session_id: Session of events that don't name their own
+        
+        Returns:
+            Counts of tracked events and of events rejected for an unknown session
+        """
+        now = datetime.utcnow()
+        rows = [{
+            'session_id': event_data.get('session_id') or session_id,
+            'event_type': event_data.get('event_type', 'unknown'),
+            'event_category': event_data.get('event_category', 'general'),
+            'event_label': event_data.get('event_label', ''),
+            'page_path': event_data.get('page_path', ''),
+            'element_id': event_data.get('element_id', ''),
+            'event_metadata': event_data.get('metadata', {}),
+            'page_load_time': event_data.get('page_load_time'),
+            'time_on_page': event_data.get('time_on_page'),
+            'timestamp': now
+        } for event_data in events]
+        
+        # Update session activity (written back in the next batch); unknown sessions are rejected
+        known = {sid for sid in {row['session_id'] for row in rows} if sid and session_cache.touch(sid)}
+        rows = [row for row in rows if row['session_id'] in known]
+        BulkLoader(AnalyticsEvent).load(rows)
+        
+        # Emit real-time event updates
+        for row in rows:
+            AnalyticsService.publish_event({
+                'event_type': row['event_type'], 'event_category': row['event_category'],
+                'event_label': row['event_label'], 'timestamp': now
+            })
+        if rows:
+            metrics_broadcaster.nudge()
+        
+        return {'tracked': len(rows), 'rejected': len(events) - len(rows)}
+    
     @staticmethod
     def get_real_time_metrics() -> Dict[str, Any]:
         """Get current real-time metrics"""
@@ -110,13 +172,17 @@ class AnalyticsService:
             )
         ).count()
         
-        # Today's metrics
+        # Today's metrics (plain ranges so indexes and partition pruning apply)
+        day_start, day_end = day_range(today)
         today_sessions = AnalyticsSession.query.filter(
-            func.date(AnalyticsSession.started_at) == today
+            AnalyticsSession.started_at >= day_start, AnalyticsSession.started_at < day_end
         ).count()
         
+        # Events of today's sessions can't predate the session, which limits
+        # the scan to today's partition
         today_events = AnalyticsEvent.query.join(AnalyticsSession).filter(
-            func.date(AnalyticsSession.started_at) == today
+            AnalyticsSession.started_at >= day_start, AnalyticsSession.started_at < day_end,
+            AnalyticsEvent.timestamp >= day_start
         ).count()
         
         # Popular content today
@@ -126,7 +192,8 @@ class AnalyticsService:
         ).filter(
             and_(
                 AnalyticsEvent.event_type == 'project_click',
-                func.date(AnalyticsEvent.timestamp) == today
+                AnalyticsEvent.timestamp >= day_start,
+                AnalyticsEvent.timestamp < day_end
             )
         ).group_by(AnalyticsEvent.event_label).order_by(desc('clicks')).limit(5).all()
         
@@ -136,7 +203,8 @@ class AnalyticsService:
         ).filter(
             and_(
                 AnalyticsEvent.event_type.in_(['skill_hover', 'skill_click']),
-                func.date(AnalyticsEvent.timestamp) == today
+                AnalyticsEvent.timestamp >= day_start,
+                AnalyticsEvent.timestamp < day_end
             )
         ).group_by(AnalyticsEvent.event_label).order_by(desc('interactions')).limit(5).all()
         
@@ -159,7 +227,11 @@ class AnalyticsService:
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        metrics = AnalyticsMetrics.query.filter(
+        metrics = db.session.query(
+            AnalyticsMetrics.date, AnalyticsMetrics.unique_visitors, AnalyticsMetrics.total_sessions,
+            AnalyticsMetrics.total_page_views, AnalyticsMetrics.avg_session_duration,
+            AnalyticsMetrics.bounce_rate, AnalyticsMetrics.project_clicks, AnalyticsMetrics.skill_interactions
+        ).filter(
             and_(
                 AnalyticsMetrics.date >= start_date,
                 AnalyticsMetrics.date <= end_date
@@ -197,7 +269,10 @@ class AnalyticsService:
     
     @staticmethod
     def calculate_daily_metrics(target_date: date = None) -> AnalyticsMetrics:
-        """Calculate and store daily aggregated metrics"""
+        """
+        Calculate and store daily aggregated metrics. Session activity still in
+        the session cache (up to SESSION_FLUSH_INTERVAL seconds) is not counted.
+        """
         if not target_date:
             target_date = date.today() - timedelta(days=1)  # Previous day
         
@@ -208,12 +283,20 @@ class AnalyticsService:
             db.session.add(metrics)
         
         # Calculate metrics for the day
-        day_sessions = AnalyticsSession.query.filter(
-            func.date(AnalyticsSession.started_at) == target_date
+        day_start, day_end = day_range(target_date)
+        day_sessions = db.session.query(
+            AnalyticsSession.page_views, AnalyticsSession.total_time_seconds,
+            AnalyticsSession.device_type, AnalyticsSession.browser
+        ).filter(
+            AnalyticsSession.started_at >= day_start, AnalyticsSession.started_at < day_end
         ).all()
         
+        # Hourly rollups hold the visitor and top-content sketches for the day
+        AnalyticsRollupService.rollup_day(target_date)
+        summary = AnalyticsRollupService.summarize(day_start, day_end)
+        
         if day_sessions:
-            metrics.unique_visitors = len(set(s.ip_address for s in day_sessions))
+            metrics.unique_visitors = summary['unique_visitors']
             metrics.total_sessions = len(day_sessions)
             metrics.total_page_views = sum(s.page_views for s in day_sessions)
             metrics.avg_session_duration = sum(s.total_time_seconds for s in day_sessions) / len(day_sessions)
@@ -223,34 +306,16 @@ class AnalyticsService:
             metrics.bounce_rate = (bounce_sessions / len(day_sessions)) * 100
         
         # Event-based metrics
-        day_events = AnalyticsEvent.query.join(AnalyticsSession).filter(
-            func.date(AnalyticsEvent.timestamp) == target_date
-        ).all()
-        
-        metrics.project_clicks = sum(1 for e in day_events if e.event_type == 'project_click')
-        metrics.skill_interactions = sum(1 for e in day_events if e.event_type.startswith('skill_'))
-        metrics.github_clicks = sum(1 for e in day_events if e.event_type == 'github_click')
-        metrics.contact_interactions = sum(1 for e in day_events if e.event_type.startswith('contact_'))
+        event_counts = summary['event_counts']
+        metrics.project_clicks = event_counts.get('project_click', 0)
+        metrics.skill_interactions = sum(n for t, n in event_counts.items() if t.startswith('skill_'))
+        metrics.github_clicks = event_counts.get('github_click', 0)
+        metrics.contact_interactions = sum(n for t, n in event_counts.items() if t.startswith('contact_'))
         
         # Top content
-        project_clicks = {}
-        skill_views = {}
-        page_views = {}
-        
-        for event in day_events:
-            if event.event_type == 'project_click':
-                project_clicks[event.event_label] = project_clicks.get(event.event_label, 0) + 1
-            elif event.event_type.startswith('skill_'):
-                skill_views[event.event_label] = skill_views.get(event.event_label, 0) + 1
-            elif event.event_type == 'page_view':
-                page_views[event.page_path] = page_views.get(event.page_path, 0) + 1
-        
-        metrics.top_projects = [{'title': k, 'clicks': v} for k, v in 
-                               sorted(project_clicks.items(), key=lambda x: x[1], reverse=True)[:10]]
-        metrics.top_skills_viewed = [{'name': k, 'views': v} for k, v in 
-                                    sorted(skill_views.items(), key=lambda x: x[1], reverse=True)[:10]]
-        metrics.top_pages = [{'path': k, 'views': v} for k, v in 
-                            sorted(page_views.items(), key=lambda x: x[1], reverse=True)[:10]]
+        metrics.top_projects = summary['top_projects']
+        metrics.top_skills_viewed = summary['top_skills_viewed']
+        metrics.top_pages = summary['top_pages']
         
         # Device and browser breakdown
         if day_sessions:
@@ -271,7 +336,13 @@ class AnalyticsService:
     
     @staticmethod
     def log_system_health() -> SystemHealth:
-        """Log current system health metrics"""
+        """
+        Sample current system health metrics.
+        
+        The sample is stored at most once per SYSTEM_HEALTH_LOG_INTERVAL seconds
+        (default 60) per process; samples in between are returned and emitted
+        without adding a row.
+        """
         health = SystemHealth(
             cpu_usage=psutil.cpu_percent(interval=1),
             memory_usage=psutil.virtual_memory().percent,
@@ -284,17 +355,16 @@ class AnalyticsService:
             status=AnalyticsService._determine_health_status()
         )
         
-        db.session.add(health)
-        db.session.commit()
+        now = time.monotonic()
+        if now - AnalyticsService._health_logged_at >= float(os.getenv('SYSTEM_HEALTH_LOG_INTERVAL', '60')):
+            AnalyticsService._health_logged_at = now
+            db.session.add(health)
+            db.session.commit()
+        else:
+            health.timestamp = datetime.utcnow()
         
         # Emit health update
-        socketio.emit('health_update', {
-            'cpu': health.cpu_usage,
-            'memory': health.memory_usage,
-            'disk': health.disk_usage,
-            'status': health.status,
-            'timestamp': health.timestamp.isoformat()
-        }, namespace='/analytics')
+        socketio.emit('health_update', serialize(health, 'live'), namespace='/analytics')
         
         return health
     
@@ -306,18 +376,23 @@ class AnalyticsService:
             start_date = end_date - timedelta(days=30)
             date_range = (start_date, end_date)
         
-        # Fetch data
-        sessions = AnalyticsSession.query.filter(
-            func.date(AnalyticsSession.started_at).between(*date_range)
-        ).all()
+        session_view = serializer_for(AnalyticsSession, 'export')
+        event_view = serializer_for(AnalyticsEvent, 'export')
+        metrics_view = serializer_for(AnalyticsMetrics, 'export')
         
-        events = AnalyticsEvent.query.join(AnalyticsSession).filter(
-            func.date(AnalyticsEvent.timestamp).between(*date_range)
-        ).all()
+        # Fetch data, selecting only the exported columns
+        range_start, range_end = day_range(*date_range)
+        sessions = session_view.load(AnalyticsSession.query.filter(
+            AnalyticsSession.started_at >= range_start, AnalyticsSession.started_at < range_end
+        )).all()
+        
+        events = event_view.load(AnalyticsEvent.query.join(AnalyticsSession).filter(
+            AnalyticsEvent.timestamp >= range_start, AnalyticsEvent.timestamp < range_end
+        )).all()
         
-        metrics = AnalyticsMetrics.query.filter(
+        metrics = metrics_view.load(AnalyticsMetrics.query.filter(
             AnalyticsMetrics.date.between(*date_range)
-        ).all()
+        )).all()
         
         export_data = {
             'export_timestamp': datetime.utcnow().isoformat(),
@@ -325,9 +400,9 @@ class AnalyticsService:
                 'start': date_range[0].isoformat(),
                 'end': date_range[1].isoformat()
             },
-            'sessions': [AnalyticsService._serialize_session(s) for s in sessions],
-            'events': [AnalyticsService._serialize_event(e) for e in events],
-            'daily_metrics': [AnalyticsService._serialize_metrics(m) for m in metrics]
+            'sessions': session_view.dump_many(sessions),
+            'events': event_view.dump_many(events),
+            'daily_metrics': metrics_view.dump_many(metrics)
         }
         
         return export_data
@@ -343,55 +418,13 @@ class AnalyticsService:
         else:
             return request.environ.get('REMOTE_ADDR', 'unknown')
     
-    @staticmethod
-    def _detect_device_type() -> str:
-        """Detect device type from user agent"""
-        user_agent = request.headers.get('User-Agent', '').lower()
-        if 'mobile' in user_agent:
-            return 'mobile'
-        elif 'tablet' in user_agent or 'ipad' in user_agent:
-            return 'tablet'
-        else:
-            return 'desktop'
-    
-    @staticmethod
-    def _detect_browser() -> str:
-        """Detect browser from user agent"""
-        user_agent = request.headers.get('User-Agent', '').lower()
-        if 'chrome' in user_agent:
-            return 'Chrome'
-        elif 'firefox' in user_agent:
-            return 'Firefox'
-        elif 'safari' in user_agent:
-            return 'Safari'
-        elif 'edge' in user_agent:
-            return 'Edge'
-        else:
-            return 'Other'
-    
-    @staticmethod
-    def _detect_os() -> str:
-        """Detect operating system from user agent"""
-        user_agent = request.headers.get('User-Agent', '').lower()
-        if 'windows' in user_agent:
-            return 'Windows'
-        elif 'mac' in user_agent:
-            return 'macOS'
-        elif 'linux' in user_agent:
-            return 'Linux'
-        elif 'ios' in user_agent:
-            return 'iOS'
-        elif 'android' in user_agent:
-            return 'Android'
-        else:
-            return 'Other'
-    
     @staticmethod
     def _get_system_health() -> Dict[str, Any]:
         """Get current system health snapshot"""
         try:
             return {
-                'cpu': psutil.cpu_percent(interval=0.1),
+                # Non-blocking: CPU use since the previous call (the last broadcaster tick)
+                'cpu': psutil.cpu_percent(interval=None),
                 'memory': psutil.virtual_memory().percent,
                 'disk': psutil.disk_usage('/').percent,
                 'status': 'healthy'  # Simplified for demo
@@ -427,64 +460,26 @@ class AnalyticsService:
     
     @staticmethod
     def _emit_session_update(session: AnalyticsSession):
-        """Emit session update via WebSocket"""
-        socketio.emit('session_update', {
-            'session_id': session.id,
-            'device_type': session.device_type,
-            'browser': session.browser,
-            'timestamp': session.started_at.isoformat()
-        }, namespace='/analytics')
+        """Queue session update for the next batched WebSocket frame"""
+        analytics_broadcaster.schedule('session_batch', serialize(session, 'live'), group=session.device_type)
     
     @staticmethod
     def _emit_event_update(event: AnalyticsEvent):
-        """Emit event update via WebSocket"""
-        socketio.emit('event_update', {
-            'event_type': event.event_type,
-            'event_category': event.event_category,
-            'event_label': event.event_label,
-            'timestamp': event.timestamp.isoformat()
-        }, namespace='/analytics')
-    
-    @staticmethod
-    def _serialize_session(session: AnalyticsSession) -> Dict[str, Any]:
-        """Serialize session for export"""
-        return {
-            'id': session.id,
-            'ip_address': session.ip_address[:8] + '***',  # Anonymize
-            'device_type': session.device_type,
-            'browser': session.browser,
-            'os': session.os,
-            'started_at': session.started_at.isoformat(),
-            'total_time_seconds': session.total_time_seconds,
-            'page_views': session.page_views
-        }
+        """Queue event update for the next batched WebSocket frame"""
+        AnalyticsService.publish_event(serialize(event, 'live'))
+        metrics_broadcaster.nudge()
     
     @staticmethod
-    def _serialize_event(event: AnalyticsEvent) -> Dict[str, Any]:
-        """Serialize event for export"""
-        return {
-            'event_type': event.event_type,
-            'event_category': event.event_category,
-            'event_label': event.event_label,
-            'page_path': event.page_path,
-            'timestamp': event.timestamp.isoformat(),
-            'metadata': event.event_metadata
-        }
-    
-    @staticmethod
-    def _serialize_metrics(metrics: AnalyticsMetrics) -> Dict[str, Any]:
-        """Serialize metrics for export"""
-        return {
-            'date': metrics.date.isoformat(),
-            'unique_visitors': metrics.unique_visitors,
-            'total_sessions': metrics.total_sessions,
-            'total_page_views': metrics.total_page_views,
-            'avg_session_duration': metrics.avg_session_duration,
-            'bounce_rate': metrics.bounce_rate,
-            'project_clicks': metrics.project_clicks,
-            'skill_interactions': metrics.skill_interactions,
-            'top_projects': metrics.top_projects,
-            'top_skills_viewed': metrics.top_skills_viewed,
-            'device_breakdown': metrics.device_breakdown,
-            'browser_breakdown': metrics.browser_breakdown
-        }
\ No newline at end of file
+    def publish_event(event_data: Dict[str, Any]):
+        """
+        Route an event to the subscribers of its type and of all types.
+        
+        The routing decision is two room lookups per event, however many
+        sockets are subscribed.
+        """
+        event_type = event_data.get('event_type', 'unknown')
+        for event_type_room in (event_type, AnalyticsService.ALL_EVENTS):
+            analytics_broadcaster.schedule(
+                'event_batch', event_data,
+                room=AnalyticsService.event_room(event_type_room), group=event_type
+            )
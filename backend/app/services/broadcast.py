@@ -0,0 +1,125 @@
+"""
+Coalesced Socket.IO broadcasts for analytics updates.
+
+Ingestion used to emit one websocket frame per event and per session, to
+every dashboard. Updates are now queued here and flushed as one batched
+frame per channel every ANALYTICS_BROADCAST_INTERVAL_MS (250ms by default).
+A batch carries the total count, counts per group (e.g. event type) and a
+sample of at most ANALYTICS_BROADCAST_SAMPLE of the most recent payloads:
+
+    {'count': 1840, 'counts': {'page_view': 1700, 'project_click': 140},
+     'sample': [...], 'dropped': 1820, 'interval_ms': 250}
+
+Queueing only appends to an in-memory buffer under a lock. Emitting happens
+in a Socket.IO background task, so a slow client never blocks ingestion. The
+task only runs while there is something to flush.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app import socketio
+
+
+class _Channel:
+    """Pending updates for one (frame, room) pair."""
+
+    __slots__ = ('count', 'counts', 'sample')
+
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.counts: Dict[str, int] = {}
+        self.sample = deque(maxlen=sample_size)
+
+
+class BroadcastScheduler:
+    """Buffers updates and emits them as periodic batched frames."""
+
+    def __init__(self, namespace: str = '/analytics', interval_ms: int = None, sample_size: int = None):
+        """
+        Args:
+            namespace: Socket.IO namespace frames are emitted on
+            interval_ms: Flush interval (default ANALYTICS_BROADCAST_INTERVAL_MS or 250)
+            sample_size: Most payloads kept per batch (default ANALYTICS_BROADCAST_SAMPLE or 20)
+        """
+        self.namespace = namespace
+        self.interval_ms = interval_ms if interval_ms is not None else int(
+            os.getenv('ANALYTICS_BROADCAST_INTERVAL_MS', '250'))
+        self.sample_size = sample_size if sample_size is not None else int(
+            os.getenv('ANALYTICS_BROADCAST_SAMPLE', '20'))
+        self._pending: Dict[tuple, _Channel] = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self.frames_sent = 0
+        self.updates_queued = 0
+
+    def schedule(self, frame: str, payload: Any, room: Optional[str] = None, group: Optional[str] = None):
+        """
+        Queue an update for the next batch.
+
+        Args:
+            frame: Socket.IO event name the batch is emitted as
+            payload: Serialized update, kept if it falls within the sample
+            room: Room to emit to (None for the whole namespace)
+            group: Optional key the batch counts updates by
+        """
+        with self._lock:
+            channel = self._pending.get((frame, room))
+            if channel is None:
+                channel = self._pending[(frame, room)] = _Channel(self.sample_size)
+            channel.count += 1
+            if group is not None:
+                channel.counts[group] = channel.counts.get(group, 0) + 1
+            channel.sample.append(payload)
+            self.updates_queued += 1
+
+            start = not self._running
+            self._running = True
+
+        if start:
+            socketio.start_background_task(self._run)
+
+    def flush(self):
+        """Emit everything pending now, one frame per channel."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        for (frame, room), channel in pending.items():
+            socketio.emit(frame, {
+                'count': channel.count,
+                'counts': channel.counts,
+                'sample': list(channel.sample),
+                'dropped': channel.count - len(channel.sample),
+                'interval_ms': self.interval_ms
+            }, namespace=self.namespace, to=room)
+            self.frames_sent += 1
+        return len(pending)
+
+    def _run(self):
+        """Flush every interval until a tick finds nothing to send."""
+        while True:
+            socketio.sleep(self.interval_ms / 1000)
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Analytics broadcast error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = sum(channel.count for channel in self._pending.values())
+        return {
+            'interval_ms': self.interval_ms,
+            'sample_size': self.sample_size,
+            'pending': pending,
+            'updates_queued': self.updates_queued,
+            'frames_sent': self.frames_sent
+        }
+
+
+analytics_broadcaster = BroadcastScheduler()
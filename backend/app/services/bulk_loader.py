@@ -0,0 +1,224 @@
+"""
+Bulk loading of analytics sessions and events.
+
+Backfills, archive replays and batched ingestion insert many rows at once.
+Through track_event that would be one INSERT and commit per row.
+BulkLoader streams any iterable of row dicts into a table in chunks of
+BULK_LOAD_CHUNK rows (10000). Each chunk is its own transaction:
+
+- Postgres: COPY ... FROM STDIN in text format, written per chunk in memory.
+- Other databases (SQLite): one executemany INSERT per chunk.
+
+Rows are keyed by column name. Missing or null columns get the model's
+Python-side defaults. Event ids come from the table's sequence unless
+keep_ids is set. On Postgres, a keep_ids load then moves the sequence past
+the largest id in each chunk's transaction, so later inserts from the app
+don't collide with the loaded rows.
+
+A named load records how many input rows it has consumed in
+analytics_load_checkpoints. The record is written in the same transaction
+as each chunk, so an interrupted load resumes at its first uncommitted row
+without duplicates.
+"""
+
+import gzip
+import io
+import os
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import orjson
+from sqlalchemy import JSON, DateTime, func, insert, select
+
+from app import db
+from app.models import AnalyticsEvent, AnalyticsLoadCheckpoint
+from app.partitions import MonthlyPartitions, month_start
+from app.serializers import dumps
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def read_jsonl(path: str, skip: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of a JSON-lines file, gzip-compressed if it ends in .gz (e.g. a
+    retention archive).
+
+    Args:
+        path: File to read
+        skip: Number of leading rows to pass over without parsing them
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as source:
+        for line in source:
+            if not line.strip():
+                continue
+            if skip:
+                skip -= 1
+                continue
+            yield orjson.loads(line)
+
+
+def _copy_text(value: Any) -> str:
+    """One field in COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat(' ')
+    return str(value).translate(_COPY_ESCAPES)
+
+
+class BulkLoader:
+    """Loads row dicts into one analytics table in chunked transactions."""
+
+    def __init__(self, model, chunk_size: Optional[int] = None, keep_ids: bool = False,
+                 log: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            model: AnalyticsSession or AnalyticsEvent
+            chunk_size: Rows per transaction (default BULK_LOAD_CHUNK)
+            keep_ids: Insert the rows' own values for an autoincrement id
+            log: Progress output, one line per chunk
+        """
+        self.model = model
+        self.table = model.__table__
+        self.chunk_size = chunk_size or int(os.getenv('BULK_LOAD_CHUNK', '10000'))
+        self.log = log
+
+        self.keep_ids = keep_ids
+        skip = None if keep_ids else self.table.autoincrement_column
+        self.columns = [column for column in self.table.columns if column is not skip]
+        self.keys = [column.key for column in self.columns]
+        self._defaults = [self._default(column) for column in self.columns]
+        self._datetimes = [isinstance(column.type, DateTime) for column in self.columns]
+        self._json = [isinstance(column.type, JSON) for column in self.columns]
+        self._copy_sql = f'COPY {self.table.name} ({", ".join(self.keys)}) FROM STDIN'
+
+        self._partitions = None
+        self._partitioned_from = None
+        if model is AnalyticsEvent:
+            self._time_index = self.keys.index('timestamp')
+
+    @staticmethod
+    def _default(column) -> Optional[Callable[[], Any]]:
+        default = column.default
+        if default is None:
+            return None
+        if default.is_callable:
+            return lambda: default.arg(None)
+        if default.is_scalar:
+            return lambda: default.arg
+        return None
+
+    def checkpoint(self, name: str) -> int:
+        """Input rows already committed by the named load (0 if it never ran)."""
+        saved = db.session.get(AnalyticsLoadCheckpoint, name)
+        return saved.offset if saved else 0
+
+    def load(self, rows: Iterable[Dict[str, Any]], name: Optional[str] = None, offset: int = 0) -> Dict[str, Any]:
+        """
+        Insert rows chunk by chunk.
+
+        Args:
+            rows: Row dicts, starting at input row offset
+            name: Checkpoint to record progress under (None: don't record)
+            offset: Input rows consumed before the first of rows
+
+        Returns:
+            Rows loaded, final offset, chunk count, elapsed seconds and rows per second
+        """
+        started = time.perf_counter()
+        rows = iter(rows)
+        loaded = chunks = 0
+        dialect = db.engine.dialect.name
+        while True:
+            chunk = [self._values(row) for row in islice(rows, self.chunk_size)]
+            if not chunk:
+                break
+            try:
+                connection = db.session.connection()
+                if dialect == 'postgresql':
+                    self._ensure_partitions(connection, chunk)
+                    self._copy(connection, chunk)
+                    if self.keep_ids:
+                        self._advance_sequence(connection)
+                else:
+                    connection.execute(insert(self.table), [dict(zip(self.keys, values)) for values in chunk])
+                if name:
+                    db.session.merge(AnalyticsLoadCheckpoint(
+                        name=name, table_name=self.table.name, offset=offset + len(chunk),
+                        updated_at=datetime.utcnow()
+                    ))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            offset += len(chunk)
+            loaded += len(chunk)
+            chunks += 1
+            if self.log:
+                self.log(f'{self.table.name}: {loaded} rows loaded (offset {offset})')
+
+        seconds = time.perf_counter() - started
+        return {
+            'table': self.table.name,
+            'rows': loaded,
+            'offset': offset,
+            'chunks': chunks,
+            'seconds': round(seconds, 3),
+            'rows_per_second': int(loaded / seconds) if seconds else 0
+        }
+
+    def _values(self, row: Dict[str, Any]) -> List[Any]:
+        values = []
+        for key, default, is_datetime in zip(self.keys, self._defaults, self._datetimes):
+            value = row.get(key)
+            if value is None:
+                value = default() if default else None
+            elif is_datetime and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            values.append(value)
+        return values
+
+    def _copy(self, connection, chunk: List[List[Any]]):
+        buffer = io.StringIO()
+        for values in chunk:
+            buffer.write('\t'.join(
+                _copy_text(dumps(value).decode('utf-8') if is_json and value is not None else value)
+                for value, is_json in zip(values, self._json)
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+        # The DBAPI cursor shares the session's transaction
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(self._copy_sql, buffer)
+        finally:
+            cursor.close()
+
+    def _advance_sequence(self, connection):
+        """Set the id sequence to the largest id, which the explicit ids may have passed (Postgres)."""
+        column = self.table.autoincrement_column
+        if column is None:
+            return
+        connection.execute(select(func.setval(
+            func.pg_get_serial_sequence(self.table.name, column.name),
+            select(func.max(column)).scalar_subquery()
+        )))
+
+    def _ensure_partitions(self, connection, chunk: List[List[Any]]):
+        """Create the months an events chunk reaches back to, so old rows skip the DEFAULT partition."""
+        if self.model is not AnalyticsEvent:
+            return
+        if self._partitions is None:
+            partitioned = MonthlyPartitions.is_partitioned(connection, self.table.name)
+            self._partitions = MonthlyPartitions(self.table.name) if partitioned else False
+        if not self._partitions:
+            return
+        first = month_start(min(values[self._time_index] for values in chunk))
+        if self._partitioned_from is None or first < self._partitioned_from:
+            self._partitions.ensure(connection, start=first)
+            self._partitioned_from = first
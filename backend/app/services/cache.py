@@ -0,0 +1,173 @@
+"""
+In-process caching helpers shared by the services.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a time-to-live."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries before least recently used ones are evicted
+            ttl: Default lifetime of an entry in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store value under key for ttl seconds (defaults to the cache TTL)."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value (expired or not), or default."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
+
+
+class TableVersions:
+    """
+    Per-table version stamps, bumped by the transaction that wrote to the table.
+
+    Caches record the stamp of the tables they depend on and treat any change
+    as invalidation. The counters live in the table_versions table and are
+    incremented inside the writing transaction, so every worker and every
+    restart sees the same stamp for the same data (it's safe to use in ETags).
+    A counter starts at a random value, so a recreated database doesn't
+    repeat the stamps of the one it replaced.
+    Only tables passed to track() are counted, which keeps hot insert paths
+    like analytics free of the extra UPDATE.
+
+    Wired to SQLAlchemy session events by register_session_events().
+    """
+
+    def __init__(self):
+        self._tracked = set()
+        self._registered = set()
+
+    def track(self, tables):
+        """Count commits that write to tables."""
+        self._tracked.update(tables)
+
+    def stamp(self, tables) -> tuple:
+        """Current versions of tables, in order (0 for tables never written)."""
+        from app import db
+        from app.models import TableVersion
+
+        tables = tuple(tables)
+        versions = dict(db.session.execute(
+            select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+        ).all())
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def bump(self, connection, tables):
+        """Increment the versions of tables on connection, inside its transaction."""
+        from app.models import TableVersion
+
+        counters = TableVersion.__table__
+        for table in sorted(tables):  # a fixed order so concurrent writers can't deadlock
+            bumped = connection.execute(
+                update(counters).where(counters.c.table_name == table).values(version=counters.c.version + 1)
+            )
+            if bumped.rowcount:
+                continue
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(counters).values(table_name=table, version=secrets.randbits(40)))
+            except IntegrityError:
+                # Another transaction created the row first
+                connection.execute(
+                    update(counters).where(counters.c.table_name == table).values(version=counters.c.version + 1)
+                )
+
+    def register_session_events(self, session_class):
+        """Track ORM flushes and bulk statements per session and bump before commit."""
+        from sqlalchemy import event
+
+        if session_class in self._registered:
+            return
+        self._registered.add(session_class)
+
+        def _mark(session, tables):
+            tables = set(tables) & self._tracked
+            if tables:
+                session.info.setdefault('written_tables', set()).update(tables)
+
+        @event.listens_for(session_class, 'after_flush')
+        def after_flush(session, flush_context):
+            tables = set()
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                table = getattr(obj, '__table__', None)
+                if table is not None:
+                    tables.add(table.name)
+            if tables:
+                _mark(session, tables)
+
+        @event.listens_for(session_class, 'do_orm_execute')
+        def do_orm_execute(orm_execute_state):
+            # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+            if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+                table = getattr(orm_execute_state.statement, 'table', None)
+                if table is not None and getattr(table, 'name', None):
+                    _mark(orm_execute_state.session, {table.name})
+
+        @event.listens_for(session_class, 'before_commit')
+        def before_commit(session):
+            # Commit flushes after this hook; flush now so its writes are counted too
+            session.flush()
+            tables = session.info.pop('written_tables', None)
+            if tables:
+                self.bump(session.connection(), tables)
+
+        @event.listens_for(session_class, 'after_soft_rollback')
+        def after_soft_rollback(session, previous_transaction):
+            session.info.pop('written_tables', None)
+
+
+table_versions = TableVersions()
@@ -0,0 +1,233 @@
+"""
+GitHub API rate limit scheduler.
+
+GitHub reports the remaining quota for a token on every response through the
+X-RateLimit-* headers and asks clients to back off with Retry-After when a
+secondary limit is hit. This module keeps that state per token in a single
+scheduler shared by every GitHubService instance in the worker, so calls are
+spent right up to the quota and deferred (instead of failing) once it runs out.
+
+Interactive imports always win over background syncs: background calls stop
+early to leave a reserve, and they also yield while an interactive call is
+waiting for quota.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional, Any
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BACKGROUND = 'background'
+
+
+class GitHubRateLimitError(Exception):
+    """Raised when a GitHub call cannot be scheduled within the allowed wait."""
+
+    def __init__(self, message: str, retry_after: int = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _TokenBucket:
+    """Quota state for a single GitHub token (or the anonymous client)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.remaining = limit
+        self.reset_at = 0.0          # epoch seconds when the quota refills
+        self.blocked_until = 0.0     # epoch seconds from Retry-After / secondary limits
+        self.in_flight = 0
+        self.waiting_interactive = 0
+        self.waiting_background = 0
+        self.total_requests = 0
+        self.total_deferred = 0
+        self.last_updated = None
+
+    def refill_if_reset(self, now: float):
+        if self.reset_at and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = 0.0
+
+
+class GitHubRateLimiter:
+    """Token-bucket scheduler tracking GitHub quota per token."""
+
+    ANONYMOUS_LIMIT = 60
+    AUTHENTICATED_LIMIT = 5000
+
+    def __init__(self, max_wait: float = None, background_reserve: float = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_wait: Longest time (seconds) a call may be deferred before giving up
+            background_reserve: Fraction of the quota background syncs leave for interactive imports
+        """
+        self.max_wait = max_wait if max_wait is not None else float(
+            os.getenv('GITHUB_RATE_LIMIT_MAX_WAIT', '30'))
+        self.background_reserve = background_reserve if background_reserve is not None else float(
+            os.getenv('GITHUB_RATE_LIMIT_BACKGROUND_RESERVE', '0.1'))
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def token_key(github_token: Optional[str]) -> str:
+        """Return a non-reversible key for a token so raw tokens never end up in state."""
+        if not github_token:
+            return 'anonymous'
+        return 'token:' + hashlib.sha256(github_token.encode('utf-8')).hexdigest()[:12]
+
+    def _bucket(self, key: str) -> _TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit = self.ANONYMOUS_LIMIT if key == 'anonymous' else self.AUTHENTICATED_LIMIT
+            bucket = _TokenBucket(limit)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _available(self, bucket: _TokenBucket, priority: str, now: float) -> bool:
+        if now < bucket.blocked_until:
+            return False
+        bucket.refill_if_reset(now)
+        budget = bucket.remaining - bucket.in_flight
+        if priority == PRIORITY_BACKGROUND:
+            if bucket.waiting_interactive:
+                return False
+            return budget > int(bucket.limit * self.background_reserve)
+        return budget > 0
+
+    def _wake_time(self, bucket: _TokenBucket, now: float) -> float:
+        wake = max(bucket.blocked_until, bucket.reset_at)
+        # Nothing we know of will free quota; poll again shortly in case a
+        # response in flight brings fresh headers.
+        return wake if wake > now else now + 1.0
+
+    def acquire(self, key: str, priority: str = PRIORITY_INTERACTIVE, max_wait: float = None):
+        """
+        Reserve one call against the token's quota, waiting if necessary.
+
+        Args:
+            key: Token key from token_key()
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+            max_wait: Override for the maximum deferral in seconds
+
+        Raises:
+            GitHubRateLimitError: If quota will not be available within max_wait
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.time() + max_wait
+        waiting_attr = 'waiting_interactive' if priority == PRIORITY_INTERACTIVE else 'waiting_background'
+
+        with self._condition:
+            bucket = self._bucket(key)
+            deferred = False
+            try:
+                while True:
+                    now = time.time()
+                    if self._available(bucket, priority, now):
+                        break
+
+                    wake = self._wake_time(bucket, now)
+                    if wake > deadline:
+                        raise GitHubRateLimitError(
+                            'GitHub API rate limit exhausted',
+                            retry_after=max(1, int(wake - now + 0.5))
+                        )
+
+                    if not deferred:
+                        deferred = True
+                        bucket.total_deferred += 1
+                        setattr(bucket, waiting_attr, getattr(bucket, waiting_attr) + 1)
+                    self._condition.wait(timeout=wake - now)
+            finally:
+                if deferred:
+                    setattr(bucket, waiting_attr, getattr(bucket, waiting_attr) - 1)
+                    # Background callers may have been held back by us
+                    self._condition.notify_all()
+
+            bucket.in_flight += 1
+            bucket.total_requests += 1
+
+    def release(self, key: str, response: Any = None):
+        """
+        Finish a call reserved with acquire() and record the quota GitHub reported.
+
+        Args:
+            key: Token key from token_key()
+            response: The requests.Response, or None if the call failed before a response
+        """
+        with self._condition:
+            bucket = self._bucket(key)
+            bucket.in_flight = max(0, bucket.in_flight - 1)
+
+            if response is not None:
+                self._update_from_headers(bucket, response)
+            self._condition.notify_all()
+
+    def _update_from_headers(self, bucket: _TokenBucket, response: Any):
+        headers = response.headers or {}
+        now = time.time()
+
+        limit = headers.get('X-RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+
+        try:
+            if limit is not None:
+                bucket.limit = int(limit)
+            if remaining is not None:
+                bucket.remaining = int(remaining)
+            if reset is not None:
+                bucket.reset_at = float(reset)
+        except ValueError:
+            pass
+        else:
+            if remaining is None:
+                # No quota headers (e.g. raw.githubusercontent.com); count the call locally
+                bucket.remaining = max(0, bucket.remaining - 1)
+
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                bucket.blocked_until = max(bucket.blocked_until, now + float(retry_after))
+            except ValueError:
+                pass
+        elif response.status_code in (403, 429) and bucket.remaining == 0 and bucket.reset_at:
+            bucket.blocked_until = max(bucket.blocked_until, bucket.reset_at)
+
+        bucket.last_updated = now
+
+    @staticmethod
+    def is_rate_limited(response: Any) -> bool:
+        """Return True if a response was rejected because of a primary or secondary rate limit."""
+        if response.status_code not in (403, 429):
+            return False
+        headers = response.headers or {}
+        return 'Retry-After' in headers or headers.get('X-RateLimit-Remaining') == '0'
+
+    def get_state(self) -> Dict[str, Any]:
+        """Return the current quota state for every known token."""
+        now = time.time()
+        with self._condition:
+            state = {}
+            for key, bucket in self._buckets.items():
+                bucket.refill_if_reset(now)
+                state[key] = {
+                    'limit': bucket.limit,
+                    'remaining': bucket.remaining,
+                    'reset_at': int(bucket.reset_at) if bucket.reset_at else None,
+                    'reset_in_seconds': max(0, int(bucket.reset_at - now)) if bucket.reset_at else None,
+                    'blocked_for_seconds': max(0, int(bucket.blocked_until - now)),
+                    'in_flight': bucket.in_flight,
+                    'waiting_interactive': bucket.waiting_interactive,
+                    'waiting_background': bucket.waiting_background,
+                    'total_requests': bucket.total_requests,
+                    'total_deferred': bucket.total_deferred
+                }
+            return state
+
+
+# Shared by every GitHubService in this worker process
+rate_limiter = GitHubRateLimiter()
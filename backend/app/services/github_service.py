@@ -2,20 +2,39 @@ import requests
 import json
 import re
 import base64
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 from typing import Dict, Optional, List
+from app.services.github_rate_limiter import (
+    rate_limiter, GitHubRateLimitError, PRIORITY_INTERACTIVE
+)
+from app.services.cache import TTLCache
+
+# Results of probing raw.githubusercontent.com for screenshot files, keyed by
+# (owner, repo, branches). Misses are cached as "" so repeat imports skip the probes.
+# The cache is per worker process and starts empty after a restart.
+_cover_probe_cache = TTLCache(
+    maxsize=2048,
+    ttl=float(os.getenv('GITHUB_COVER_CACHE_TTL', str(24 * 3600)))
+)
+COVER_MISS_TTL = float(os.getenv('GITHUB_COVER_MISS_CACHE_TTL', str(6 * 3600)))
 
 class GitHubService:
     """Service for fetching GitHub repository data and extracting project information."""
     
     BASE_API_URL = "https://api.github.com"
+    RAW_CONTENT_URL = "https://raw.githubusercontent.com"
+    SCREENSHOT_FILES = ['screenshot.png', 'demo.png', 'preview.png']
     
-    def __init__(self, github_token: Optional[str] = None):
+    def __init__(self, github_token: Optional[str] = None, priority: str = PRIORITY_INTERACTIVE):
         """
         Initialize GitHub service.
         
         Args:
             github_token: Optional GitHub personal access token for higher rate limits
+            priority: Scheduling priority for API calls (interactive imports or background syncs)
         """
         self.headers = {
             'Accept': 'application/vnd.github.v3+json',
@@ -27,6 +46,44 @@ class GitHubService:
             self.authenticated = True
         else:
             self.authenticated = False
+        
+        self.priority = priority
+        self.rate_limit_key = rate_limiter.token_key(github_token if self.authenticated else None)
+    
+    def _api_get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Perform a GitHub API GET through the shared rate limit scheduler.
+        
+        Waits for quota when the token is exhausted and retries once when GitHub
+        answers with a rate limit response, instead of silently returning nothing.
+        
+        Raises:
+            GitHubRateLimitError: If quota does not become available in time
+        """
+        kwargs.setdefault('timeout', 10)
+        for attempt in range(2):
+            rate_limiter.acquire(self.rate_limit_key, self.priority)
+            response = None
+            try:
+                response = requests.get(url, headers=self.headers, **kwargs)
+            finally:
+                rate_limiter.release(self.rate_limit_key, response)
+            
+            if not rate_limiter.is_rate_limited(response) or attempt:
+                break
+        
+        if rate_limiter.is_rate_limited(response):
+            retry_after = response.headers.get('Retry-After')
+            reset = response.headers.get('X-RateLimit-Reset')
+            if retry_after and retry_after.isdigit():
+                wait = int(retry_after)
+            elif reset and reset.isdigit():
+                wait = max(1, int(reset) - int(time.time()))
+            else:
+                wait = 60
+            raise GitHubRateLimitError('GitHub API rate limit exceeded', retry_after=wait)
+        
+        return response
     
     def parse_github_url(self, github_url: str) -> Optional[tuple]:
         """
@@ -80,13 +137,30 @@ class GitHubService:
             'github_url': github_url,
             'github_account': owner,  # Extract the account name from the URL
             'live_url': self._extract_live_url(repo_data, readme_data),
-            'image_url': self._extract_cover_image(readme_data, owner, repo),
+            'image_url': self._extract_cover_image(readme_data, owner, repo, repo_data.get('default_branch')),
+            'github_languages': languages or None,
             'featured': False,  # Let user decide
             'order': 0  # Let user decide
         }
         
         return project_info
     
+    def fetch_languages(self, github_url: str) -> Dict:
+        """
+        Fetch a repository's language byte counts.
+        
+        Args:
+            github_url: GitHub repository URL
+            
+        Returns:
+            Language -> bytes, or an empty dict if GitHub returned nothing
+        """
+        parsed_url = self.parse_github_url(github_url)
+        if not parsed_url:
+            raise ValueError("Invalid GitHub URL")
+        
+        return self._get_languages(*parsed_url)
+    
     def fetch_user_repositories(self, username: str, per_page: int = 30) -> List[Dict]:
         """
         Fetch all public repositories for a given GitHub user.
@@ -112,7 +186,7 @@ class GitHubService:
             }
             
             try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=10)
+                response = self._api_get(url, params=params)
                 if response.status_code != 200:
                     break
                 
@@ -162,7 +236,7 @@ class GitHubService:
         """Fetch basic repository data from GitHub API."""
         url = f"{self.BASE_API_URL}/repos/{owner}/{repo}"
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self._api_get(url)
             return response.json() if response.status_code == 200 else {}
         except requests.RequestException:
             return {}
@@ -171,12 +245,14 @@ class GitHubService:
         """Fetch README content from repository."""
         url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/readme"
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self._api_get(url)
             if response.status_code == 200:
                 content = response.json().get('content', '')
                 # Decode base64 content
                 return base64.b64decode(content).decode('utf-8')
             return ""
+        except GitHubRateLimitError:
+            raise
         except Exception:
             return ""
     
@@ -184,12 +260,14 @@ class GitHubService:
         """Fetch package.json content if it exists."""
         url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/contents/package.json"
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self._api_get(url)
             if response.status_code == 200:
                 content = response.json().get('content', '')
                 decoded_content = base64.b64decode(content).decode('utf-8')
                 return json.loads(decoded_content)
             return {}
+        except GitHubRateLimitError:
+            raise
         except Exception:
             return {}
     
@@ -197,12 +275,14 @@ class GitHubService:
         """Fetch manifest.json content if it exists (for Chrome extensions)."""
         url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/contents/manifest.json"
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self._api_get(url)
             if response.status_code == 200:
                 content = response.json().get('content', '')
                 decoded_content = base64.b64decode(content).decode('utf-8')
                 return json.loads(decoded_content)
             return {}
+        except GitHubRateLimitError:
+            raise
         except Exception:
             return {}
     
@@ -210,7 +290,7 @@ class GitHubService:
         """Fetch repository languages from GitHub API."""
         url = f"{self.BASE_API_URL}/repos/{owner}/{repo}/languages"
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self._api_get(url)
             return response.json() if response.status_code == 200 else {}
         except requests.RequestException:
             return {}
@@ -361,7 +441,7 @@ class GitHubService:
         
         return ""
     
-    def _extract_cover_image(self, readme_content: str, owner: str, repo: str) -> str:
+    def _extract_cover_image(self, readme_content: str, owner: str, repo: str, default_branch: Optional[str] = None) -> str:
         """Extract cover/banner image from README."""
         if not readme_content:
             return ""
@@ -392,19 +472,62 @@ class GitHubService:
             return images[0]
         
         # Check for common screenshot locations
-        screenshot_paths = [
-            f"https://raw.githubusercontent.com/{owner}/{repo}/main/screenshot.png",
-            f"https://raw.githubusercontent.com/{owner}/{repo}/main/demo.png",
-            f"https://raw.githubusercontent.com/{owner}/{repo}/main/preview.png",
-            f"https://raw.githubusercontent.com/{owner}/{repo}/master/screenshot.png"
+        return self._probe_screenshot_paths(owner, repo, default_branch)
+    
+    def _probe_screenshot_paths(self, owner: str, repo: str, default_branch: Optional[str] = None) -> str:
+        """
+        Look for a screenshot committed at a well-known path in the repository.
+        
+        All candidate paths are probed concurrently; the first existing one in
+        candidate order wins, whichever probe finishes first. Results, including
+        misses, are cached in this process so repeat imports of the same
+        repository don't hit raw.githubusercontent.com again.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            default_branch: The repository's default branch, if known
+            
+        Returns:
+            URL of the screenshot, or empty string if none was found
+        """
+        branches = [default_branch] if default_branch else ['main', 'master']
+        cache_key = (owner.lower(), repo.lower(), tuple(branches))
+        
+        cached = _cover_probe_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        candidates = [
+            f"{self.RAW_CONTENT_URL}/{owner}/{repo}/{branch}/{filename}"
+            for branch in branches
+            for filename in self.SCREENSHOT_FILES
         ]
         
-        for path in screenshot_paths:
-            try:
-                response = requests.head(path, timeout=5)
-                if response.status_code == 200:
-                    return path
-            except requests.RequestException:
-                continue
+        found = ""
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = [executor.submit(self._head_exists, path) for path in candidates]
+        try:
+            # Wait in candidate order, so a later path that answers sooner can't win;
+            # once a path exists, none of the later ones matter
+            for future in futures:
+                found = future.result()
+                if found:
+                    break
+        finally:
+            # Drop the probes we no longer need; in-flight ones finish on their own
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
         
-        return ""
\ No newline at end of file
+        _cover_probe_cache.set(cache_key, found, ttl=None if found else COVER_MISS_TTL)
+        return found
+    
+    @staticmethod
+    def _head_exists(url: str) -> str:
+        """Return url if a HEAD request for it succeeds, otherwise empty string."""
+        try:
+            response = requests.head(url, timeout=5)
+            return url if response.status_code == 200 else ""
+        except requests.RequestException:
+            return ""
@@ -0,0 +1,469 @@
+"""
+Image optimization pipeline for project and certificate images.
+
+Source images (usually full-size README screenshots) are fetched or uploaded
+once, hashed, and turned into resized WebP/AVIF variants that are stored
+content-addressed on local disk:
+
+    <IMAGE_CACHE_DIR>/originals/<digest>
+    <IMAGE_CACHE_DIR>/variants/<digest>/<width>.<format>
+    <IMAGE_CACHE_DIR>/sources/<url_key>.json      (source URL -> digest)
+
+The variant store is capped at IMAGE_CACHE_MAX_BYTES and evicts the least
+recently served files first. Because variant paths are derived from the
+content hash they never change and can be served with immutable caching.
+
+Remote sources are only fetched from GitHub and the hosts listed in
+IMAGE_SOURCE_HOSTS (comma-separated, subdomains included), and never from
+private, loopback or link-local addresses. Each request connects to the
+address that was checked (see _PinnedAdapter), so a host can't pass the
+check and then resolve somewhere else for the download.
+"""
+
+import hashlib
+import io
+import ipaddress
+import json
+import os
+import socket
+import tempfile
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional, Any, Tuple
+from urllib.parse import urljoin, urlsplit
+from flask import request
+from PIL import Image, ImageOps, features
+from sqlalchemy import select
+
+from app import db
+from app.models import Project, Certificate
+
+
+def _supported_formats() -> Tuple[str, ...]:
+    """Output formats supported by the installed Pillow build, best first."""
+    try:
+        avif = features.check_module('avif')
+    except ValueError:
+        # Pillow builds older than 11.2 don't know the AVIF module
+        avif = False
+    return ('avif', 'webp') if avif else ('webp',)
+
+
+class ImageProcessingError(Exception):
+    """Raised when a source image can't be fetched or decoded."""
+
+
+class _PinnedAdapter(HTTPAdapter):
+    """
+    Connects to the vetted IP address a URL was rewritten to, while TLS (SNI
+    and the certificate check) still uses the original host name.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        super().__init__(max_retries=0)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.update(server_hostname=self.host, assert_hostname=self.host)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _pinned(url: str, address: str) -> Tuple[str, str]:
+    """url rewritten to connect to address, and the Host header it should still send."""
+    parts = urlsplit(url)
+    ip_host = f'[{address}]' if ':' in address else address
+    netloc = f'{ip_host}:{parts.port}' if parts.port else ip_host
+    return parts._replace(netloc=netloc).geturl(), parts.netloc.rsplit('@', 1)[-1]
+
+
+class ImageService:
+    """Fetches, resizes and stores optimized image variants."""
+
+    WIDTHS = (320, 640, 1280)
+    DEFAULT_WIDTH = 640
+    MAX_SOURCE_BYTES = 10 * 1024 * 1024
+    MAX_REDIRECTS = 3
+    SOURCE_HOSTS = ('github.com', 'githubusercontent.com')
+    FORMATS = _supported_formats()
+    QUALITY = {'webp': 80, 'avif': 50}
+    MIMETYPES = {'webp': 'image/webp', 'avif': 'image/avif'}
+
+    _lock = threading.Lock()
+    _url_index: Dict[str, str] = None   # url_key -> digest
+    _total_bytes = 0
+
+    # Configuration
+    @staticmethod
+    def cache_dir() -> str:
+        return os.getenv('IMAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'portfolio-image-cache'))
+
+    @staticmethod
+    def max_bytes() -> int:
+        return int(os.getenv('IMAGE_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+
+    @classmethod
+    def formats(cls) -> Tuple[str, ...]:
+        """Output formats supported by the installed Pillow build, best first."""
+        return cls.FORMATS
+
+    @classmethod
+    def source_hosts(cls) -> Tuple[str, ...]:
+        configured = os.getenv('IMAGE_SOURCE_HOSTS', '')
+        return cls.SOURCE_HOSTS + tuple(h.strip().lower() for h in configured.split(',') if h.strip())
+
+    # Public API
+    @staticmethod
+    def url_key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+
+    @staticmethod
+    def is_optimizable(url: Optional[str]) -> bool:
+        """Only remote images are run through the pipeline; local assets are served as-is."""
+        return bool(url) and url.startswith(('http://', 'https://')) and '/api/images/' not in url
+
+    @classmethod
+    def ingest_url(cls, url: str) -> str:
+        """
+        Fetch a remote image once and build its variants.
+
+        Args:
+            url: Absolute http(s) URL of the source image
+
+        Returns:
+            Content digest of the image
+
+        Raises:
+            ImageProcessingError: If the image can't be downloaded or decoded
+        """
+        cls._load_index()
+        key = cls.url_key(url)
+        digest = cls._url_index.get(key)
+        if digest and os.path.exists(cls._original_path(digest)):
+            return digest
+
+        digest = cls.ingest_bytes(cls._fetch(url))
+
+        with cls._lock:
+            cls._url_index[key] = digest
+        cls._atomic_write(
+            os.path.join(cls.cache_dir(), 'sources', f'{key}.json'),
+            json.dumps({'url': url, 'digest': digest}).encode('utf-8')
+        )
+        return digest
+
+    @classmethod
+    def ingest_bytes(cls, content: bytes) -> str:
+        """
+        Store an uploaded or fetched image and build its variants.
+
+        Returns:
+            Content digest of the image
+        """
+        if len(content) > cls.MAX_SOURCE_BYTES:
+            raise ImageProcessingError('Image is too large')
+
+        digest = hashlib.sha256(content).hexdigest()
+        image = cls._decode(content)
+
+        if not os.path.exists(cls._original_path(digest)):
+            cls._store(cls._original_path(digest), content)
+
+        for width in cls.WIDTHS:
+            for fmt in cls.formats():
+                if not os.path.exists(cls._variant_path(digest, width, fmt)):
+                    cls._store(cls._variant_path(digest, width, fmt), cls._render(image, width, fmt))
+
+        return digest
+
+    @classmethod
+    def lookup_digest(cls, url: str) -> Optional[str]:
+        """Return the digest for an already ingested source URL without fetching it."""
+        cls._load_index()
+        key = cls.url_key(url)
+        digest = cls._url_index.get(key)
+        if digest and not os.path.exists(cls._original_path(digest)):
+            # Evicted, possibly by another worker: serve it through the source endpoint again
+            with cls._lock:
+                cls._url_index.pop(key, None)
+            return None
+        return digest
+
+    @classmethod
+    def get_variant(cls, digest: str, width: int, fmt: str) -> Optional[str]:
+        """
+        Return the path of a variant, rebuilding it from the original if it was evicted.
+
+        Args:
+            digest: Content digest of the source image
+            width: Requested width; snapped to the nearest configured width
+            fmt: Output format ('webp' or 'avif')
+
+        Returns:
+            Filesystem path of the variant, or None if the image is unknown
+        """
+        if fmt not in cls.formats():
+            return None
+
+        width = next((w for w in cls.WIDTHS if w >= width), cls.WIDTHS[-1])
+        path = cls._variant_path(digest, width, fmt)
+        if not os.path.exists(path):
+            original = cls._original_path(digest)
+            if not os.path.exists(original):
+                return None
+            with open(original, 'rb') as f:
+                image = cls._decode(f.read())
+            os.utime(original)
+            cls._store(path, cls._render(image, width, fmt))
+
+        os.utime(path)
+        return path
+
+    @classmethod
+    def negotiate_format(cls, accept_header: str) -> str:
+        """Pick the best variant format the client accepts."""
+        accept = accept_header or ''
+        for fmt in cls.formats():
+            if cls.MIMETYPES[fmt] in accept:
+                return fmt
+        return 'webp'
+
+    @classmethod
+    def optimized_urls(cls, url: Optional[str]) -> Dict[str, Any]:
+        """
+        Build the optimized URL and srcset for an image referenced by a model.
+
+        Images that were already ingested point straight at their content-addressed,
+        immutable variants. Others point at the source-keyed endpoint, which ingests
+        them on first request.
+
+        Returns:
+            Dictionary with 'url' and 'srcset', both None when the image isn't optimizable
+        """
+        if not cls.is_optimizable(url):
+            return {'url': None, 'srcset': None}
+
+        base = cls.public_base_url()
+        digest = cls.lookup_digest(url)
+        if digest:
+            prefix = f'{base}/api/images/{digest}'
+        else:
+            prefix = f'{base}/api/images/source/{cls.url_key(url)}'
+
+        return {
+            'url': f'{prefix}/{cls.DEFAULT_WIDTH}',
+            'srcset': ', '.join(f'{prefix}/{w} {w}w' for w in cls.WIDTHS)
+        }
+
+    @classmethod
+    def source_url(cls, key: str) -> Optional[str]:
+        """
+        Return the source URL for a url_key: one ingested before, or an image
+        referenced by a project or certificate.
+        """
+        path = os.path.join(cls.cache_dir(), 'sources', f'{key}.json')
+        try:
+            with open(path) as f:
+                return json.load(f).get('url')
+        except (OSError, ValueError):
+            pass
+
+        urls = db.session.scalars(select(Project.image_url).where(Project.image_url.isnot(None))).all() + \
+            db.session.scalars(select(Certificate.photo_url).where(Certificate.photo_url.isnot(None))).all()
+        return next((url for url in urls if cls.is_optimizable(url) and cls.url_key(url) == key), None)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        cls._load_index()
+        return {
+            'cache_dir': cls.cache_dir(),
+            'total_bytes': cls._total_bytes,
+            'max_bytes': cls.max_bytes(),
+            'sources': len(cls._url_index),
+            'formats': list(cls.formats()),
+            'widths': list(cls.WIDTHS)
+        }
+
+    # Private helpers
+    @classmethod
+    def public_base_url(cls) -> str:
+        base = os.getenv('IMAGE_PUBLIC_BASE_URL')
+        if base:
+            return base.rstrip('/')
+        scheme = request.headers.get('X-Forwarded-Proto', request.scheme)
+        return f'{scheme}://{request.host}'
+
+    @classmethod
+    def _fetch(cls, url: str) -> bytes:
+        """
+        Download a source image, following redirects only to allowed hosts.
+
+        Raises:
+            ImageProcessingError: If a host isn't allowed, the download fails or
+                the image is larger than MAX_SOURCE_BYTES
+        """
+        for _ in range(cls.MAX_REDIRECTS + 1):
+            # Every hop is re-checked and fetched from the address that passed the check
+            address = cls._check_source(url)
+            pinned_url, host_header = _pinned(url, address)
+            try:
+                with requests.Session() as session:
+                    session.trust_env = False  # a proxy would resolve the host itself
+                    session.mount(f'{urlsplit(url).scheme}://', _PinnedAdapter(urlsplit(url).hostname))
+                    response = session.get(pinned_url, headers={'Host': host_header},
+                                           timeout=10, stream=True, allow_redirects=False)
+                    if response.is_redirect:
+                        url = urljoin(url, response.headers['Location'])
+                        response.close()
+                        continue
+                    if response.status_code != 200:
+                        raise ImageProcessingError(f'Source image returned HTTP {response.status_code}')
+                    if int(response.headers.get('Content-Length') or 0) > cls.MAX_SOURCE_BYTES:
+                        raise ImageProcessingError('Image is too large')
+                    return response.raw.read(cls.MAX_SOURCE_BYTES + 1, decode_content=True)
+            except (requests.RequestException, ValueError) as e:
+                raise ImageProcessingError(f'Failed to fetch image: {str(e)}')
+        raise ImageProcessingError('Too many redirects')
+
+    @classmethod
+    def _check_source(cls, url: str) -> str:
+        """
+        Reject URLs outside the allowed hosts or resolving to non-public addresses.
+
+        Returns:
+            A vetted address of the host, for the request to connect to
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        if parts.scheme not in ('http', 'https') or not any(
+            host == allowed or host.endswith('.' + allowed) for allowed in cls.source_hosts()
+        ):
+            raise ImageProcessingError(f'Images from {host or url} are not allowed')
+
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port or 443, proto=socket.IPPROTO_TCP)}
+        except (socket.gaierror, ValueError) as e:
+            raise ImageProcessingError(f'Failed to resolve {host}: {str(e)}')
+        for address in addresses:
+            ip = ipaddress.ip_address(address.split('%')[0])
+            if getattr(ip, 'ipv4_mapped', None):
+                ip = ip.ipv4_mapped
+            if not ip.is_global or ip.is_multicast:
+                raise ImageProcessingError(f'{host} resolves to a non-public address')
+        # Prefer IPv4, which every deployment can reach
+        return sorted(addresses, key=lambda address: (':' in address, address))[0]
+
+    @classmethod
+    def _load_index(cls):
+        if cls._url_index is not None:
+            return
+        with cls._lock:
+            if cls._url_index is not None:
+                return
+            index = {}
+            sources_dir = os.path.join(cls.cache_dir(), 'sources')
+            if os.path.isdir(sources_dir):
+                for name in os.listdir(sources_dir):
+                    try:
+                        with open(os.path.join(sources_dir, name)) as f:
+                            digest = json.load(f).get('digest')
+                    except (OSError, ValueError):
+                        continue
+                    if digest and os.path.exists(cls._original_path(digest)):
+                        index[name[:-len('.json')]] = digest
+
+            total = 0
+            for sub in ('originals', 'variants'):
+                for root, _, files in os.walk(os.path.join(cls.cache_dir(), sub)):
+                    for name in files:
+                        try:
+                            total += os.path.getsize(os.path.join(root, name))
+                        except OSError:
+                            pass
+
+            cls._total_bytes = total
+            cls._url_index = index
+
+    @classmethod
+    def _original_path(cls, digest: str) -> str:
+        return os.path.join(cls.cache_dir(), 'originals', digest)
+
+    @classmethod
+    def _variant_path(cls, digest: str, width: int, fmt: str) -> str:
+        return os.path.join(cls.cache_dir(), 'variants', digest, f'{width}.{fmt}')
+
+    @staticmethod
+    def _decode(content: bytes) -> Image.Image:
+        try:
+            image = Image.open(io.BytesIO(content))
+            image.load()
+        except Exception as e:
+            raise ImageProcessingError(f'Unsupported image: {str(e)}')
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+        return image
+
+    @classmethod
+    def _render(cls, image: Image.Image, width: int, fmt: str) -> bytes:
+        # Never upscale; small sources are just re-encoded at their own size
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt.upper(), quality=cls.QUALITY[fmt])
+        return buffer.getvalue()
+
+    @classmethod
+    def _store(cls, path: str, content: bytes):
+        cls._load_index()
+        cls._atomic_write(path, content)
+        with cls._lock:
+            cls._total_bytes += len(content)
+        if cls._total_bytes > cls.max_bytes():
+            cls._evict()
+
+    @staticmethod
+    def _atomic_write(path: str, content: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def _evict(cls):
+        """Delete least recently served files until the store is back under 90% of the cap."""
+        with cls._lock:
+            entries = []
+            for sub in ('originals', 'variants'):
+                for root, _, files in os.walk(os.path.join(cls.cache_dir(), sub)):
+                    for name in files:
+                        path = os.path.join(root, name)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, path))
+
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            target = int(cls.max_bytes() * 0.9)
+            originals_dir = os.path.join(cls.cache_dir(), 'originals')
+            evicted = set()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    continue
+                if os.path.dirname(path) == originals_dir:
+                    evicted.add(os.path.basename(path))
+
+            # Without its original a digest's variants can't be rebuilt, so stop
+            # handing out its immutable URLs; the source endpoint re-ingests it
+            for key in [key for key, digest in cls._url_index.items() if digest in evicted]:
+                del cls._url_index[key]
+            cls._total_bytes = total
@@ -0,0 +1,125 @@
+"""
+Background task that pushes real-time metrics to connected dashboards.
+
+Dashboards used to poll, so every open dashboard ran its own metrics
+queries. Now one Socket.IO background task computes the metrics once per
+tick and publishes them through the metrics stream. Query cost therefore
+stays flat however many dashboards are connected.
+
+The task starts with the first dashboard connection and exits once the last
+one disconnects. The tick adapts to load:
+- it backs off toward ANALYTICS_METRICS_TICK_MAX while visitor metrics are unchanged;
+- it drops to ANALYTICS_METRICS_TICK_MIN as soon as events are ingested;
+- it never runs more often than ten times the time a tick takes.
+
+System health is sampled and logged every ANALYTICS_HEALTH_INTERVAL seconds.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from app import socketio
+from app.services.metrics_stream import metrics_stream
+
+
+class MetricsBroadcaster:
+    """Owns the metrics background task and its tick rate."""
+
+    BACKOFF = 1.5
+    LOAD_FACTOR = 10  # tick at most once per LOAD_FACTOR x tick duration
+    PASSIVE_KEYS = frozenset({'timestamp', 'system_health'})
+
+    def __init__(self):
+        self.enabled = os.getenv('ANALYTICS_METRICS_BROADCAST', 'true').lower() == 'true'
+        self.min_tick = float(os.getenv('ANALYTICS_METRICS_TICK_MIN', '2'))
+        self.max_tick = float(os.getenv('ANALYTICS_METRICS_TICK_MAX', '30'))
+        self.health_interval = float(os.getenv('ANALYTICS_HEALTH_INTERVAL', '60'))
+        self.tick = self.min_tick
+        self.clients = 0
+        self.running = False
+        self.ticks = 0
+        self.last_duration = 0.0
+        self._last_health = 0.0
+        self._lock = threading.Lock()
+
+    def client_connected(self, app):
+        """Count a dashboard connection, starting the task if it isn't running."""
+        with self._lock:
+            self.clients += 1
+            start = self.enabled and not self.running
+            self.running = self.running or start
+        if start:
+            socketio.start_background_task(self._run, app)
+
+    def client_disconnected(self):
+        with self._lock:
+            self.clients = max(0, self.clients - 1)
+
+    def nudge(self):
+        """New activity: tick at the fastest rate again."""
+        self.tick = self.min_tick
+
+    def _run(self, app):
+        self.tick = self.min_tick
+        while True:
+            self._sleep()
+            with self._lock:
+                if self.clients == 0:
+                    self.running = False
+                    return
+
+            changed = False
+            try:
+                with app.app_context():
+                    started = time.monotonic()
+                    changed = self.broadcast()
+                    self.last_duration = time.monotonic() - started
+                    self._log_health()
+            except Exception as e:
+                app.logger.error(f"Metrics broadcaster error: {str(e)}")
+            self.ticks += 1
+
+            tick = self.min_tick if changed else min(self.tick * self.BACKOFF, self.max_tick)
+            self.tick = max(tick, self.last_duration * self.LOAD_FACTOR)
+
+    def _sleep(self):
+        """Sleep for the current tick, cutting it short if nudge() lowers it."""
+        slept = 0.0
+        while slept < self.tick:
+            step = min(self.min_tick, self.tick - slept)
+            socketio.sleep(step)
+            slept += step
+
+    def broadcast(self) -> bool:
+        """
+        Compute and publish metrics once (requires an app context).
+
+        Returns:
+            Whether visitor activity changed (system health jitter alone doesn't count)
+        """
+        from app.services.analytics_service import AnalyticsService
+        frame = metrics_stream.publish(AnalyticsService.get_real_time_metrics())
+        return frame is not None and any(key not in self.PASSIVE_KEYS for key in frame['changes'])
+
+    def _log_health(self):
+        """Sample system health if it's due; log_system_health emits the health_update itself."""
+        from app.services.analytics_service import AnalyticsService
+        now = time.monotonic()
+        if now - self._last_health >= self.health_interval:
+            self._last_health = now
+            AnalyticsService.log_system_health()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'running': self.running,
+            'clients': self.clients,
+            'tick_seconds': round(self.tick, 2),
+            'last_tick_duration_ms': round(self.last_duration * 1000, 1),
+            'ticks': self.ticks
+        }
+
+
+metrics_broadcaster = MetricsBroadcaster()
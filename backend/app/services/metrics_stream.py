@@ -0,0 +1,152 @@
+"""
+Versioned, delta-encoded real-time metrics stream.
+
+Dashboards used to receive the full get_real_time_metrics() dict on every
+update. The stream keeps the last published snapshot and a sequence number.
+A client gets one 'metrics_snapshot' frame on connect; after that, each
+publish broadcasts only the fields that changed:
+
+    {'seq': 42, 'changes': {'active_visitors': 3, 'system_health': {'cpu': 7.5}}}
+
+Nested dicts are diffed recursively, and lists are replaced whole. Keys that
+disappear are listed under REMOVED_KEY at the level they were removed from,
+e.g. when system health collapses to an error:
+
+    {'seq': 43, 'changes': {'system_health': {'status': 'error', '$removed': ['cpu', 'disk', 'memory']}}}
+
+Floats are rounded (METRICS_FLOAT_DIGITS, default 0) before diffing, so
+sensor jitter below that precision doesn't produce a delta. A publish where
+nothing but the timestamp changed sends nothing. A client that sees a gap in
+seq emits 'metrics_resync' and gets a fresh snapshot.
+
+Sequence numbers are per process. With a message queue shared by several
+workers, each worker's deltas therefore go to a room of its own clients only
+(see MetricsStream.room).
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app import socketio
+
+# Always differs between publishes; only sent along with a real change
+VOLATILE_KEYS = frozenset({'timestamp'})
+# Lists the keys removed at a level of a delta (metrics keys never start with '$')
+REMOVED_KEY = '$removed'
+FLOAT_DIGITS = int(os.getenv('METRICS_FLOAT_DIGITS', '0'))
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of new that differ from old, recursing into nested dicts."""
+    changes = {}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if previous == value:
+            continue
+        if isinstance(value, dict) and isinstance(previous, dict):
+            changes[key] = diff(previous, value)
+        else:
+            changes[key] = value
+    removed = sorted(key for key in old if key not in new)
+    if removed:
+        changes[REMOVED_KEY] = removed
+    return changes
+
+
+def apply(base: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of diff: base with changes merged in (base is not modified)."""
+    merged = dict(base)
+    for key, value in changes.items():
+        if key == REMOVED_KEY:
+            for removed in value:
+                merged.pop(removed, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = apply(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def rounded(value: Any, digits: int = FLOAT_DIGITS) -> Any:
+    """value with every float, including nested ones, rounded to digits."""
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, dict):
+        return {key: rounded(item, digits) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rounded(item, digits) for item in value]
+    return value
+
+
+_MISSING = object()
+
+
+class MetricsStream:
+    """Publishes metrics as a snapshot plus sequence-numbered deltas."""
+
+    def __init__(self, namespace: str = '/analytics', room: str = 'analytics_metrics'):
+        self.namespace = namespace
+        self.base_room = room
+        self.seq = 0
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.published_at = 0.0
+        self._lock = threading.Lock()
+        self.deltas_sent = 0
+
+    @property
+    def room(self) -> str:
+        """Room for this worker's clients (resolved after fork, so preloaded apps get distinct rooms)."""
+        return f'{self.base_room}:{socket.gethostname()}:{os.getpid()}'
+
+    def publish(self, metrics: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Record new metrics and broadcast what changed.
+
+        Args:
+            metrics: Full metrics dict, as returned by get_real_time_metrics()
+
+        Returns:
+            The delta frame broadcast, or None if nothing changed
+        """
+        metrics = rounded(metrics)
+        with self._lock:
+            self.published_at = time.monotonic()
+            if self.snapshot is None:
+                self.seq += 1
+                self.snapshot = metrics
+                return None
+
+            changes = diff(
+                {k: v for k, v in self.snapshot.items() if k not in VOLATILE_KEYS},
+                {k: v for k, v in metrics.items() if k not in VOLATILE_KEYS}
+            )
+            if not changes:
+                return None
+            changes.update({k: metrics[k] for k in VOLATILE_KEYS if k in metrics})
+
+            self.seq += 1
+            self.snapshot = metrics
+            frame = {'seq': self.seq, 'changes': changes}
+            self.deltas_sent += 1
+
+        socketio.emit('metrics_delta', frame, namespace=self.namespace, to=self.room)
+        return frame
+
+    def snapshot_frame(self, compute: Callable[[], Dict[str, Any]], max_age: float = 5.0) -> Dict[str, Any]:
+        """
+        Full snapshot for a (re)syncing client.
+
+        Args:
+            compute: Returns fresh metrics when the snapshot is missing or older than max_age seconds
+            max_age: Oldest snapshot served without recomputing
+        """
+        if self.snapshot is None or time.monotonic() - self.published_at > max_age:
+            self.publish(compute())
+        with self._lock:
+            return {'seq': self.seq, 'metrics': self.snapshot}
+
+
+metrics_stream = MetricsStream()
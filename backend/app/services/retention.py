@@ -0,0 +1,265 @@
+"""
+Retention, downsampling and archival for raw analytics data.
+
+Raw analytics tables otherwise grow forever. A retention run applies these
+steps in order:
+
+1. Rolls up every day older than the event cutoff that has no daily metrics
+   yet (AnalyticsMetrics plus hourly sketches). Reports keep working once the
+   raw rows are gone.
+2. Deletes analytics_events older than ANALYTICS_EVENT_RETENTION_DAYS (90).
+   On Postgres, whole months past the cutoff are dropped as partitions (see
+   app.partitions). Only the rest of the cutoff month is deleted row by row.
+   Upcoming monthly partitions are created on the same run.
+3. Deletes analytics_sessions inactive for longer than
+   ANALYTICS_SESSION_RETENTION_DAYS (180) that have no events left.
+4. Downsamples system_health rows older than SYSTEM_HEALTH_RAW_DAYS (2) to
+   one row per hour.
+5. Deletes system_health rows older than SYSTEM_HEALTH_RETENTION_DAYS (365).
+
+Deletes run in batches of ANALYTICS_RETENTION_BATCH rows (5000), each in its
+own short transaction, selected by primary key. This avoids holding long
+locks or bloating one huge transaction.
+
+If ANALYTICS_ARCHIVE_DIR is set, each batch is first appended to a gzip
+JSON-lines file per table and run before it is deleted.
+
+Run it with `flask analytics retention` (see app.cli).
+"""
+
+import gzip
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, exists, func, select, text
+
+from app import db
+from app.models import AnalyticsEvent, AnalyticsMetrics, AnalyticsSession, SystemHealth
+from app.partitions import MonthlyPartitions
+from app.serializers import dumps
+
+
+class RetentionPolicy:
+    """Retention settings, read from the environment."""
+
+    def __init__(self):
+        self.event_days = int(os.getenv('ANALYTICS_EVENT_RETENTION_DAYS', '90'))
+        self.session_days = int(os.getenv('ANALYTICS_SESSION_RETENTION_DAYS', '180'))
+        self.health_raw_days = int(os.getenv('SYSTEM_HEALTH_RAW_DAYS', '2'))
+        self.health_days = int(os.getenv('SYSTEM_HEALTH_RETENTION_DAYS', '365'))
+        self.batch_size = int(os.getenv('ANALYTICS_RETENTION_BATCH', '5000'))
+        self.batch_pause = float(os.getenv('ANALYTICS_RETENTION_PAUSE', '0.05'))
+        self.archive_dir = os.getenv('ANALYTICS_ARCHIVE_DIR') or None
+
+
+class RetentionService:
+    """Applies a RetentionPolicy to the analytics tables."""
+
+    STATUS_SEVERITY = {'healthy': 0, 'unknown': 1, 'warning': 2, 'critical': 3}
+
+    def __init__(self, policy: Optional[RetentionPolicy] = None, dry_run: bool = False,
+                 log: Callable[[str], None] = print):
+        """
+        Args:
+            policy: Retention settings (default: from the environment)
+            dry_run: Count what would be removed without changing anything
+            log: Progress output
+        """
+        self.policy = policy or RetentionPolicy()
+        self.dry_run = dry_run
+        self.log = log
+        self._archive_stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Apply every step of the policy; returns row counts per step."""
+        now = now or datetime.utcnow()
+        event_cutoff = now - timedelta(days=self.policy.event_days)
+        session_cutoff = now - timedelta(days=self.policy.session_days)
+
+        report = {'partitions_created': self.ensure_partitions()}
+        report['days_rolled_up'] = self.rollup_expiring_days(event_cutoff.date())
+        report['events_deleted'] = self.drop_expired_partitions(event_cutoff) + self._delete_batches(
+            AnalyticsEvent, AnalyticsEvent.timestamp < event_cutoff
+        )
+        report['sessions_deleted'] = self._delete_batches(
+            AnalyticsSession,
+            AnalyticsSession.last_activity < session_cutoff,
+            ~exists().where(AnalyticsEvent.session_id == AnalyticsSession.id)
+        )
+        report['health_rows_downsampled'] = self.downsample_health(now - timedelta(days=self.policy.health_raw_days))
+        report['health_rows_deleted'] = self._delete_batches(
+            SystemHealth, SystemHealth.timestamp < now - timedelta(days=self.policy.health_days)
+        )
+        return report
+
+    def rollup_expiring_days(self, cutoff: date) -> int:
+        """Compute daily metrics for days before cutoff that still have raw events but no metrics row."""
+        from app.services.analytics_service import AnalyticsService
+
+        oldest = db.session.scalar(select(func.min(AnalyticsEvent.timestamp)))
+        if oldest is None or oldest.date() >= cutoff:
+            return 0
+
+        done = set(db.session.scalars(select(AnalyticsMetrics.date).where(
+            AnalyticsMetrics.date >= oldest.date(), AnalyticsMetrics.date < cutoff
+        )))
+        missing = [oldest.date() + timedelta(days=i) for i in range((cutoff - oldest.date()).days)]
+        missing = [day for day in missing if day not in done]
+        if self.dry_run:
+            self.log(f'Would roll up {len(missing)} days')
+            return len(missing)
+        for day in missing:
+            AnalyticsService.calculate_daily_metrics(day)
+        if missing:
+            self.log(f'Rolled up {len(missing)} days before {cutoff}')
+        return len(missing)
+
+    def ensure_partitions(self) -> int:
+        """Create the upcoming monthly analytics_events partitions (Postgres only)."""
+        connection = db.session.connection()
+        if not MonthlyPartitions.is_partitioned(connection, AnalyticsEvent.__tablename__):
+            return 0
+        partitions = MonthlyPartitions(AnalyticsEvent.__tablename__)
+        if self.dry_run:
+            missing = partitions.missing(connection)
+            self.log(f'Would create {len(missing)} analytics_events partitions')
+            return len(missing)
+        created = partitions.ensure(connection)
+        db.session.commit()
+        if created:
+            self.log(f'Created partitions {", ".join(created)}')
+        return len(created)
+
+    def drop_expired_partitions(self, cutoff: datetime) -> int:
+        """
+        Drop every analytics_events partition entirely older than cutoff (Postgres only).
+
+        Returns:
+            Number of rows dropped. A dry run returns 0 here: its row count
+            for the whole cutoff comes from the batched delete step.
+        """
+        connection = db.session.connection()
+        if not MonthlyPartitions.is_partitioned(connection, AnalyticsEvent.__tablename__):
+            return 0
+        partitions = MonthlyPartitions(AnalyticsEvent.__tablename__)
+        dropped = 0
+        for name, first, end in partitions.expired(connection, cutoff):
+            # Each drop commits, so fetch the session's connection again
+            count = db.session.execute(text(f'SELECT count(*) FROM {name}')).scalar()
+            if self.dry_run:
+                self.log(f'Would drop partition {name} ({count} rows)')
+                continue
+            if self.policy.archive_dir:
+                rows = db.session.execute(
+                    select(AnalyticsEvent.__table__).where(
+                        AnalyticsEvent.timestamp >= first, AnalyticsEvent.timestamp < end
+                    ).execution_options(yield_per=self.policy.batch_size)
+                )
+                for batch in rows.partitions():
+                    self._archive(AnalyticsEvent, batch)
+            partitions.drop(db.session.connection(), name)
+            db.session.commit()
+            self.log(f'Dropped partition {name} ({count} rows)')
+            dropped += count
+        return dropped
+
+    def downsample_health(self, cutoff: datetime) -> int:
+        """
+        Collapse system_health rows older than cutoff into one row per hour.
+
+        Each hour keeps averaged usage, the worst status and summed error counts.
+        Hours already down to a single row are left alone, so runs are idempotent.
+
+        Returns:
+            Number of raw rows replaced
+        """
+        cutoff = cutoff.replace(minute=0, second=0, microsecond=0)  # whole hours only
+        hour = func.strftime('%Y-%m-%d %H:00:00', SystemHealth.timestamp) if db.engine.dialect.name == 'sqlite' \
+            else func.date_trunc('hour', SystemHealth.timestamp)
+        hours = db.session.execute(
+            select(hour.label('hour'), func.count(SystemHealth.id))
+            .where(SystemHealth.timestamp < cutoff)
+            .group_by(hour)
+            .having(func.count(SystemHealth.id) > 1)
+        ).all()
+        if self.dry_run:
+            replaced = sum(count for _, count in hours)
+            self.log(f'Would downsample {replaced} system_health rows into {len(hours)} hourly rows')
+            return replaced
+
+        replaced = 0
+        for bucket, _ in hours:
+            start = bucket if isinstance(bucket, datetime) else datetime.fromisoformat(bucket)
+            rows = SystemHealth.query.filter(
+                SystemHealth.timestamp >= start, SystemHealth.timestamp < start + timedelta(hours=1)
+            ).all()
+            if len(rows) < 2:
+                continue
+            self._archive(SystemHealth, rows)
+            db.session.add(self._average_health(start, rows))
+            for row in rows:
+                db.session.delete(row)
+            db.session.commit()
+            replaced += len(rows)
+            time.sleep(self.policy.batch_pause)
+        if replaced:
+            self.log(f'Downsampled {replaced} system_health rows into {len(hours)} hourly rows')
+        return replaced
+
+    @classmethod
+    def _average_health(cls, hour: datetime, rows: List[SystemHealth]) -> SystemHealth:
+        def mean(attr):
+            values = [getattr(row, attr) for row in rows if getattr(row, attr) is not None]
+            return sum(values) / len(values) if values else None
+
+        return SystemHealth(
+            timestamp=hour,
+            cpu_usage=mean('cpu_usage'),
+            memory_usage=mean('memory_usage'),
+            disk_usage=mean('disk_usage'),
+            active_connections=max((row.active_connections or 0) for row in rows),
+            avg_response_time=mean('avg_response_time'),
+            error_count=sum((row.error_count or 0) for row in rows),
+            db_connections=max((row.db_connections or 0) for row in rows),
+            db_query_time=mean('db_query_time'),
+            status=max((row.status or 'unknown' for row in rows), key=lambda s: cls.STATUS_SEVERITY.get(s, 1))
+        )
+
+    def _delete_batches(self, model, *conditions) -> int:
+        """Delete rows matching conditions in primary-key batches, each in its own transaction."""
+        pk = model.__mapper__.primary_key[0]
+        if self.dry_run:
+            count = db.session.scalar(select(func.count()).select_from(model).where(*conditions))
+            self.log(f'Would delete {count} {model.__tablename__} rows')
+            return count
+
+        deleted = 0
+        while True:
+            ids = db.session.scalars(
+                select(pk).where(*conditions).order_by(pk).limit(self.policy.batch_size)
+            ).all()
+            if not ids:
+                break
+            if self.policy.archive_dir:
+                self._archive(model, db.session.scalars(select(model).where(pk.in_(ids))).all())
+            db.session.execute(delete(model).where(pk.in_(ids)).execution_options(synchronize_session=False))
+            db.session.commit()
+            deleted += len(ids)
+            time.sleep(self.policy.batch_pause)
+        if deleted:
+            self.log(f'Deleted {deleted} {model.__tablename__} rows')
+        return deleted
+
+    def _archive(self, model, rows: List[Any]):
+        """Append rows to this run's gzip JSON-lines archive for the table."""
+        if not self.policy.archive_dir or not rows:
+            return
+        os.makedirs(self.policy.archive_dir, exist_ok=True)
+        path = os.path.join(self.policy.archive_dir, f'{model.__tablename__}-{self._archive_stamp}.jsonl.gz')
+        columns = [column.key for column in model.__mapper__.column_attrs]
+        with gzip.open(path, 'ab') as archive:
+            for row in rows:
+                archive.write(dumps({column: getattr(row, column) for column in columns}))
+                archive.write(b'\n')
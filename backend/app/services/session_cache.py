@@ -0,0 +1,256 @@
+"""
+In-memory analytics session cache with batched write-back.
+
+Every page view used to read its AnalyticsSession row and commit an UPDATE,
+and every tracked event did the same to bump last_activity. Sessions are now
+cached in a bounded LRU (SESSION_CACHE_SIZE entries, SESSION_CACHE_TTL
+seconds). Each entry holds started_at, last_activity and page_views. A touch
+only updates the entry and marks it dirty.
+
+Dirty entries are written back together as one executemany UPDATE. This
+happens every SESSION_FLUSH_INTERVAL seconds from a background task, right
+away (also in the background) once SESSION_FLUSH_BATCH sessions are pending,
+and at exit. A dirty entry evicted from the LRU stays pending until that
+write-back. A page view therefore costs no synchronous database write, and
+a failed write-back never fails the request that triggered it.
+
+Readers of the database rows (/sessions/active, the hourly rollups,
+calculate_daily_metrics) therefore lag the cache by up to
+SESSION_FLUSH_INTERVAL seconds: a page view shows up there after the next
+write-back.
+
+The write-back adds page views as an increment and only moves last_activity
+forward. Workers that each cache the same session therefore don't overwrite
+one another.
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import bindparam, case, select, update
+
+from app import db, socketio
+from app.models import AnalyticsSession
+
+
+class CachedSession:
+    """Activity of one session, as cached between write-backs."""
+
+    __slots__ = ('id', 'started_at', 'last_activity', 'page_views', 'pending_views', 'dirty', 'expires_at')
+
+    def __init__(self, session_id: str, started_at: datetime, last_activity: datetime, page_views: int):
+        self.id = session_id
+        self.started_at = started_at or datetime.utcnow()
+        self.last_activity = last_activity or self.started_at
+        self.page_views = page_views or 0
+        self.pending_views = 0
+        self.dirty = False
+        self.expires_at = 0.0
+
+    @property
+    def total_time_seconds(self) -> int:
+        return int((self.last_activity - self.started_at).total_seconds())
+
+
+_table = AnalyticsSession.__table__
+_WRITE_BACK = update(_table).where(_table.c.id == bindparam('b_id')).values(
+    page_views=_table.c.page_views + bindparam('b_views'),
+    last_activity=case(
+        (_table.c.last_activity < bindparam('b_last'), bindparam('b_last')),
+        else_=_table.c.last_activity
+    ),
+    total_time_seconds=case(
+        (_table.c.last_activity < bindparam('b_last'), bindparam('b_total')),
+        else_=_table.c.total_time_seconds
+    )
+)
+
+
+class SessionCache:
+    """LRU/TTL cache of session activity, written back to the database in batches."""
+
+    def __init__(self):
+        self.maxsize = int(os.getenv('SESSION_CACHE_SIZE', '10000'))
+        self.ttl = float(os.getenv('SESSION_CACHE_TTL', '1800'))
+        self.flush_interval = float(os.getenv('SESSION_FLUSH_INTERVAL', '5'))
+        self.flush_batch = int(os.getenv('SESSION_FLUSH_BATCH', '200'))
+        self._entries: "OrderedDict[str, CachedSession]" = OrderedDict()
+        self._dirty: Dict[str, CachedSession] = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._flusher_running = False
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        atexit.register(self._flush_at_exit)
+
+    def add(self, session: AnalyticsSession):
+        """Cache a session that was just inserted."""
+        entry = CachedSession(session.id, session.started_at, session.last_activity, session.page_views)
+        with self._lock:
+            self._store(entry)
+
+    def touch(self, session_id: str, page_view: bool = False) -> Optional[CachedSession]:
+        """
+        Record activity on a session (requires an app context).
+
+        Args:
+            session_id: Session to touch
+            page_view: Whether the activity is a page view
+
+        Returns:
+            The cached session, or None if no such session exists
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._lookup(session_id)
+        if entry is None:
+            entry = self._load(session_id)
+            if entry is None:
+                return None
+
+        with self._lock:
+            entry.last_activity = max(entry.last_activity, now)
+            if page_view:
+                entry.page_views += 1
+                entry.pending_views += 1
+            entry.dirty = True
+            self._dirty[entry.id] = entry
+            flush_now = len(self._dirty) >= self.flush_batch
+
+        if flush_now:
+            self._flush_in_background()
+        else:
+            self._ensure_flusher()
+        return entry
+
+    def flush(self) -> int:
+        """Write every dirty session back in one batched UPDATE (requires an app context)."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            rows = []
+            for entry in dirty.values():
+                rows.append({
+                    'b_id': entry.id, 'b_views': entry.pending_views,
+                    'b_last': entry.last_activity, 'b_total': entry.total_time_seconds
+                })
+                entry.pending_views = 0
+                entry.dirty = False
+        if not rows:
+            return 0
+
+        try:
+            db.session.execute(_WRITE_BACK, rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                # Keep the activity for the next attempt
+                for row, entry in zip(rows, dirty.values()):
+                    entry.pending_views += row['b_views']
+                    entry.dirty = True
+                    self._dirty.setdefault(entry.id, entry)
+            raise
+        self.flushes += 1
+        return len(rows)
+
+    def _lookup(self, session_id: str) -> Optional[CachedSession]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            entry = self._dirty.get(session_id)
+            if entry is not None:
+                # Evicted before its write-back: keep accumulating on it
+                self._store(entry)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+        if entry.expires_at < time.monotonic() and not entry.dirty:
+            del self._entries[session_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(session_id)
+        self.hits += 1
+        return entry
+
+    def _load(self, session_id: str) -> Optional[CachedSession]:
+        row = db.session.execute(select(
+            AnalyticsSession.started_at, AnalyticsSession.last_activity, AnalyticsSession.page_views
+        ).where(AnalyticsSession.id == session_id)).first()
+        if row is None:
+            return None
+        entry = CachedSession(session_id, *row)
+        with self._lock:
+            # Another request may have loaded it meanwhile
+            existing = self._entries.get(session_id)
+            if existing is not None:
+                return existing
+            self._store(entry)
+        return entry
+
+    def _store(self, entry: CachedSession):
+        """Insert under the lock, evicting the least recently used entries beyond maxsize."""
+        entry.expires_at = time.monotonic() + self.ttl
+        self._entries[entry.id] = entry
+        self._entries.move_to_end(entry.id)
+        while len(self._entries) > self.maxsize:
+            # Evicted dirty entries stay in _dirty until the next flush
+            self._entries.popitem(last=False)
+
+    def _flush_in_background(self):
+        """Write the pending batch from a background task, outside the request's session."""
+        from flask import current_app
+        self._app = current_app._get_current_object()
+        socketio.start_background_task(self._flush_logged, self._app)
+
+    def _flush_logged(self, app):
+        try:
+            with app.app_context():
+                self.flush()
+        except Exception as e:
+            app.logger.error(f"Session write-back error: {str(e)}")
+
+    def _ensure_flusher(self):
+        from flask import current_app
+        with self._lock:
+            if self._flusher_running:
+                return
+            self._flusher_running = True
+            self._app = current_app._get_current_object()
+        socketio.start_background_task(self._run_flusher, self._app)
+
+    def _run_flusher(self, app):
+        """Flush every interval until there is nothing left to write."""
+        while True:
+            socketio.sleep(self.flush_interval)
+            with self._lock:
+                if not self._dirty:
+                    self._flusher_running = False
+                    return
+            self._flush_logged(app)
+
+    def _flush_at_exit(self):
+        if self._app is not None and self._dirty:
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'pending_writes': len(self._dirty),
+                'hits': self.hits,
+                'misses': self.misses,
+                'flushes': self.flushes
+            }
+
+
+session_cache = SessionCache()
@@ -0,0 +1,164 @@
+"""
+Mergeable probabilistic sketches for analytics rollups.
+
+HyperLogLog estimates distinct counts (unique visitors) in a fixed 2^p
+registers. Space-Saving keeps the approximate top-k items (projects, skills,
+pages) in a fixed number of counters.
+
+Both sketches are stored per hour in AnalyticsHourlyRollup and merge across
+hours: HyperLogLog losslessly (register max), Space-Saving with a bounded
+overestimate (counter sum). Any range can be answered by folding the rows of
+that range. Memory stays constant, and the
+raw sessions and events are never rescanned.
+"""
+
+import hashlib
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def _bit_length32(values: np.ndarray) -> np.ndarray:
+    """Bit lengths of values below 2^32 (exact: float64 holds every 32-bit integer)."""
+    bit_length = np.zeros(values.size, dtype=np.int64)
+    nonzero = values > 0
+    bit_length[nonzero] = np.floor(np.log2(values[nonzero].astype(np.float64))).astype(np.int64) + 1
+    return bit_length
+
+
+def hash64(value: Any) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality sketch; standard error is about 1.04 / sqrt(2^p)."""
+
+    DEFAULT_PRECISION = 12  # 4096 registers, ~1.6% error
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[np.ndarray] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else np.zeros(self.size, dtype=np.uint8)
+
+    def add(self, value: Any):
+        self.add_many((value,))
+
+    def add_many(self, values: Iterable[Any]):
+        hashes = np.fromiter((hash64(value) for value in values), dtype=np.uint64)
+        if not hashes.size:
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        np.maximum.at(self.registers, index, self._ranks(hashes))
+
+    def _ranks(self, hashes: np.ndarray) -> np.ndarray:
+        """Position of the leftmost 1-bit in the 64 - p bits after the register index."""
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # rest can need up to 60 bits, more than float64 represents exactly, so
+        # take the bit length of its high and low 32-bit halves separately
+        high = rest >> np.uint64(32)
+        bit_length = np.where(high > 0, _bit_length32(high) + 32, _bit_length32(rest & np.uint64(0xFFFFFFFF)))
+        return (64 - self.precision - bit_length + 1).astype(np.uint8)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.precision != self.precision:
+            raise ValueError('Cannot merge HyperLogLog sketches of different precision')
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        m = float(self.size)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """Compact form for storage; sparse (low-traffic) sketches compress to a few bytes."""
+        return bytes([self.precision]) + zlib.compress(self.registers.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> 'HyperLogLog':
+        if not data:
+            return cls()
+        precision = data[0]
+        registers = np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8).copy()
+        return cls(precision, registers)
+
+
+class SpaceSaving:
+    """
+    Space-Saving top-k sketch (Metwally et al.).
+
+    Each monitored item has a count and the maximum overestimate of that
+    count. When a new item arrives and every counter is taken, it replaces the
+    smallest counter and inherits its count as error.
+    """
+
+    DEFAULT_CAPACITY = 100
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, counters: Optional[Dict[str, List[int]]] = None):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = counters or {}  # item -> [count, error]
+
+    def add(self, item: Any, count: int = 1):
+        if item is None or item == '':
+            return
+        item = str(item)
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+        else:
+            smallest = min(self.counters, key=lambda key: self.counters[key][0])
+            floor = self.counters.pop(smallest)[0]
+            self.counters[item] = [floor + count, floor]
+
+    def add_many(self, items: Iterable[Any]):
+        for item in items:
+            self.add(item)
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """
+        Sum the counters of both sketches, then keep the capacity largest.
+
+        An item a full sketch doesn't monitor may still have occurred up to that
+        sketch's smallest count, so that floor is added to its count and error.
+        Counts therefore never underestimate after merging.
+        """
+        own_floor, other_floor = self._floor(), other._floor()
+        for item in set(self.counters) | set(other.counters):
+            count, error = self.counters.get(item) or (own_floor, own_floor)
+            other_count, other_error = other.counters.get(item) or (other_floor, other_floor)
+            self.counters[item] = [count + other_count, error + other_error]
+        if len(self.counters) > self.capacity:
+            ranked = sorted(self.counters.items(), key=lambda entry: entry[1][0], reverse=True)
+            self.counters = dict(ranked[:self.capacity])
+        return self
+
+    def _floor(self) -> int:
+        """Smallest count once the sketch is full; unmonitored items can't have occurred more often."""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        ranked = sorted(self.counters.items(), key=lambda entry: (-entry[1][0], entry[0]))
+        return [(item, count) for item, (count, _) in ranked[:n]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'capacity': self.capacity, 'counters': self.counters}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'SpaceSaving':
+        if not data:
+            return cls()
+        return cls(data.get('capacity', cls.DEFAULT_CAPACITY),
+                   {item: list(counter) for item, counter in data.get('counters', {}).items()})
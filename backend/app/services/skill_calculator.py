@@ -1,13 +1,32 @@
 # Skills auto-calculation from project data
 
-from app.models import Project, Skill
+from app.models import Project, Skill, Technology, ProjectTechnology
 from app import db
+from app.services.technology_index import TechnologyIndex
+from app.services.skill_scoring import SkillScoringEngine
 from sqlalchemy import func
 import re
-from datetime import datetime, timedelta
+from datetime import datetime
+from difflib import get_close_matches
+from functools import lru_cache
+from flask import current_app
+from app.services.cache import table_versions
+import threading
 
 class SkillCalculator:
     
+    UPSERT_CHUNK_SIZE = 500
+    # Columns a recalculation refreshes on an existing skill
+    UPSERT_UPDATE_COLUMNS = (
+        'category', 'order', 'level', 'auto_calculated_level', 'project_count', 'last_calculated'
+    )
+    
+    # Tables get_skill_insights reads; a committed write to any of them invalidates the cache
+    INSIGHTS_DEPENDENCIES = ('project', 'skill', 'technology', 'technology_alias', 'project_technology')
+    _insights_cache = {'version': None, 'value': None}
+    _insights_lock = threading.Lock()
+    _insights_refreshing = False
+    
     SKILL_CATEGORIES = {
         'frontend': [
             'react', 'vue', 'vue.js', 'angular', 'javascript', 'typescript', 'js', 'ts',
@@ -44,69 +63,113 @@ class SkillCalculator:
         ]
     }
     
+    # Hash index from normalized alias -> category, built once at import time
+    _CATEGORY_INDEX = {}
+    FUZZY_MATCH_CUTOFF = 0.85
+    FUZZY_MIN_LENGTH = 4
+    
+    _VERSION_SUFFIX = re.compile(r'\s*v?\d+(\.\d+|\.x)*$')
+    _NON_ALNUM = re.compile(r'[^a-z0-9#+]')
+    _SEGMENT_SPLIT = re.compile(r'\s*(?:\+|/|&|\band\b|\bwith\b)\s*')
+    
     @classmethod
-    def categorize_technology(cls, tech_name):
-        tech_lower = tech_name.lower().strip()
+    def _normalize_tech(cls, name):
+        """Lower-case, drop a trailing version ("Postgres 15") and punctuation ("Vue.js" -> "vuejs")."""
+        name = cls._VERSION_SUFFIX.sub('', name.lower().strip())
+        return cls._NON_ALNUM.sub('', name)
+    
+    @classmethod
+    def _build_category_index(cls):
+        index = {}
+        
+        def add(name, category):
+            key = cls._normalize_tech(name)
+            if not key:
+                return
+            index.setdefault(key, category)
+            # "ReactJS" / "Node" style variants of the same name
+            if key.endswith('js') and len(key) > 4:
+                index.setdefault(key[:-2], category)
+            elif not key.endswith('js'):
+                index.setdefault(key + 'js', category)
         
+        # Category lists first so their order decides overlaps (e.g. java, kotlin)
         for category, technologies in cls.SKILL_CATEGORIES.items():
-            if tech_lower in technologies:
-                return category
+            for tech in technologies:
+                add(tech, category)
         
-        return 'tools'
+        for key, (display_name, aliases) in TechnologyIndex.CANONICAL_TECHNOLOGIES.items():
+            category = index.get(cls._normalize_tech(key))
+            if category:
+                for alias in [display_name] + aliases:
+                    add(alias, category)
+        
+        return index
     
     @classmethod
-    def extract_technologies_from_projects(cls):
-        projects = Project.query.all()
-        tech_data = {}
-        
-        for project in projects:
-            if project.technologies:
-                techs = [tech.strip() for tech in project.technologies.split(',')]
-                
-                for tech in techs:
-                    if tech:
-                        tech_clean = tech.lower().strip()
-                        
-                        if tech_clean not in tech_data:
-                            tech_data[tech_clean] = {
-                                'name': tech,
-                                'count': 0,
-                                'projects': [],
-                                'featured_projects': 0,
-                                'category': cls.categorize_technology(tech_clean)
-                            }
-                        
-                        tech_data[tech_clean]['count'] += 1
-                        tech_data[tech_clean]['projects'].append({
-                            'id': project.id,
-                            'title': project.title,
-                            'featured': project.featured
-                        })
-                        
-                        if project.featured:
-                            tech_data[tech_clean]['featured_projects'] += 1
-        
-        return tech_data
+    def categorize_technology(cls, tech_name):
+        category = cls._CATEGORY_INDEX.get(cls._normalize_tech(tech_name))
+        if category:
+            return category
+        return cls._resolve_category(tech_name.lower().strip())
     
     @classmethod
-    def calculate_skill_level(cls, tech_data, max_count):
-        count = tech_data['count']
-        featured_bonus = tech_data['featured_projects'] * 0.5
+    @lru_cache(maxsize=4096)
+    def _resolve_category(cls, tech_lower):
+        """
+        Slow path for names missing from the index, memoized per name:
+        try each part of compound names ("React Native + Expo"), then the
+        closest indexed alias by similarity ratio.
+        """
+        segments = [seg for seg in cls._SEGMENT_SPLIT.split(tech_lower) if seg]
+        for segment in segments:
+            category = cls._CATEGORY_INDEX.get(cls._normalize_tech(segment))
+            if category:
+                return category
         
-        if count == 0:
-            base_level = 1
-        elif count == 1:
-            base_level = 2
-        elif count == 2:
-            base_level = 3
-        elif count >= 3:
-            base_level = 4
+        for segment in segments or [tech_lower]:
+            key = cls._normalize_tech(segment)
+            if len(key) < cls.FUZZY_MIN_LENGTH:
+                continue
+            matches = get_close_matches(key, cls._CATEGORY_INDEX.keys(), n=1, cutoff=cls.FUZZY_MATCH_CUTOFF)
+            if matches:
+                return cls._CATEGORY_INDEX[matches[0]]
         
-        bonus = min(1.0, featured_bonus)
+        return 'tools'
+    
+    @classmethod
+    def extract_technologies_from_projects(cls):
+        rows = db.session.query(
+            Technology.key, Technology.name, Technology.category,
+            Project.id, Project.title, Project.featured
+        ).join(
+            ProjectTechnology, ProjectTechnology.technology_id == Technology.id
+        ).join(
+            Project, Project.id == ProjectTechnology.project_id
+        ).all()
         
-        final_level = min(5, base_level + bonus)
+        tech_data = {}
+        for tech_key, tech_name, category, project_id, title, featured in rows:
+            if tech_key not in tech_data:
+                tech_data[tech_key] = {
+                    'name': tech_name,
+                    'count': 0,
+                    'projects': [],
+                    'featured_projects': 0,
+                    'category': category
+                }
+            
+            tech_data[tech_key]['count'] += 1
+            tech_data[tech_key]['projects'].append({
+                'id': project_id,
+                'title': title,
+                'featured': featured
+            })
+            
+            if featured:
+                tech_data[tech_key]['featured_projects'] += 1
         
-        return round(final_level)
+        return tech_data
     
     @classmethod
     def auto_generate_skills(cls):
@@ -115,7 +178,7 @@ class SkillCalculator:
         if not tech_data:
             return []
         
-        max_count = max(data['count'] for data in tech_data.values())
+        scores = SkillScoringEngine.score_technologies()
         calculated_skills = []
         
         sorted_techs = sorted(
@@ -126,10 +189,11 @@ class SkillCalculator:
         order_counters = {'frontend': 100, 'backend': 100, 'database': 100, 'tools': 100, 'mobile': 100, 'data': 100}
         
         for tech_key, data in sorted_techs:
-            level = cls.calculate_skill_level(data, max_count)
+            level = scores.get(tech_key, {}).get('level', SkillScoringEngine.MIN_LEVEL)
             category = data['category']
             
             calculated_skills.append({
+                'key': tech_key,
                 'name': data['name'],
                 'category': category,
                 'level': level,
@@ -145,72 +209,52 @@ class SkillCalculator:
     
     @classmethod
     def sync_skills_with_projects(cls, preserve_manual_overrides=True):
+        # Reads the technology index, which project writes keep current;
+        # `flask skills rebuild-index` repairs it after out-of-band edits
         calculated_skills = cls.auto_generate_skills()
         
         if not calculated_skills:
             return {'status': 'no_projects', 'message': 'No projects found to calculate skills from'}
         
-        existing_skills = {skill.name.lower(): skill for skill in Skill.query.all()}
+        # One narrow read to classify rows; the writes themselves are set-based
+        aliases = TechnologyIndex.alias_map()
+        existing_skills = {
+            TechnologyIndex.resolve_key(name, aliases): (name, manual_override)
+            for name, manual_override in db.session.query(Skill.name, Skill.manual_override).all()
+        }
         
         added = 0
         updated = 0
         preserved = 0
+        now = datetime.utcnow()
+        rows = []
         
         for skill_data in calculated_skills:
-            skill_name_lower = skill_data['name'].lower()
+            existing = existing_skills.get(skill_data['key'])
             
-            if skill_name_lower in existing_skills:
-                # Update existing skill
-                existing_skill = existing_skills[skill_name_lower]
-                
-                # Check if it's manually overridden (has different level than calculated)
-                if preserve_manual_overrides and hasattr(existing_skill, 'manual_override'):
-                    if getattr(existing_skill, 'manual_override', False):
-                        preserved += 1
-                        continue
-                
-                # Update non-manual skills
-                existing_skill.category = skill_data['category']
-                existing_skill.order = skill_data['order']
-                
-                # Safely update optional columns that might not exist in older databases
-                if hasattr(existing_skill, 'auto_calculated_level'):
-                    existing_skill.auto_calculated_level = skill_data['level']
-                if hasattr(existing_skill, 'project_count'):
-                    existing_skill.project_count = skill_data['project_count']
-                if hasattr(existing_skill, 'last_calculated'):
-                    existing_skill.last_calculated = datetime.utcnow()
-                
-                # Only update level if preserve_manual_overrides is False or skill is not manually overridden
-                manual_override = getattr(existing_skill, 'manual_override', False)
-                if not preserve_manual_overrides or not manual_override:
-                    existing_skill.level = skill_data['level']
-                
-                updated += 1
-            else:
-                # Add new skill with safe column handling
-                skill_kwargs = {
-                    'name': skill_data['name'],
-                    'category': skill_data['category'],
-                    'level': skill_data['level'],
-                    'order': skill_data['order']
-                }
-                
-                # Add optional columns if they exist in the model
-                if hasattr(Skill, 'auto_calculated_level'):
-                    skill_kwargs['auto_calculated_level'] = skill_data['level']
-                if hasattr(Skill, 'project_count'):
-                    skill_kwargs['project_count'] = skill_data['project_count']
-                if hasattr(Skill, 'manual_override'):
-                    skill_kwargs['manual_override'] = False
-                if hasattr(Skill, 'last_calculated'):
-                    skill_kwargs['last_calculated'] = datetime.utcnow()
-                
-                new_skill = Skill(**skill_kwargs)
-                db.session.add(new_skill)
+            if existing is None:
                 added += 1
+            elif preserve_manual_overrides and existing[1]:
+                preserved += 1
+                continue
+            else:
+                updated += 1
+            
+            rows.append({
+                # Keep the existing spelling so alias matches hit the same row
+                'name': existing[0] if existing else skill_data['name'][:50],
+                'category': skill_data['category'],
+                'level': skill_data['level'],
+                'order': skill_data['order'],
+                'auto_calculated_level': skill_data['level'],
+                'project_count': skill_data['project_count'],
+                'manual_override': False,
+                'last_calculated': now,
+                'created_at': now
+            })
         
         try:
+            cls._bulk_upsert_skills(rows, preserve_manual_overrides)
             db.session.commit()
             
             return {
@@ -227,29 +271,220 @@ class SkillCalculator:
                 'message': str(e)
             }
     
+    @classmethod
+    def _bulk_upsert_skills(cls, rows, preserve_manual_overrides=True):
+        """
+        Upsert calculated skills keyed on the unique lower(name) index, in chunks,
+        with INSERT ... ON CONFLICT DO UPDATE (Postgres and SQLite). Other
+        databases fall back to a select followed by an update or insert.
+        """
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+        
+        table = Skill.__table__
+        for start in range(0, len(rows), cls.UPSERT_CHUNK_SIZE):
+            chunk = rows[start:start + cls.UPSERT_CHUNK_SIZE]
+            if insert is None:
+                cls._upsert_skills_without_on_conflict(chunk, preserve_manual_overrides)
+                continue
+            
+            stmt = insert(table).values(chunk)
+            excluded = stmt.excluded
+            
+            # With preserve on, the caller already skipped manual overrides; the WHERE
+            # also protects rows flagged as manual since that read
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[func.lower(table.c.name)],
+                set_={column: excluded[column] for column in cls.UPSERT_UPDATE_COLUMNS},
+                where=(
+                    db.or_(table.c.manual_override == False, table.c.manual_override.is_(None))
+                    if preserve_manual_overrides else None
+                )
+            )
+            db.session.execute(stmt)
+    
+    @classmethod
+    def _upsert_skills_without_on_conflict(cls, rows, preserve_manual_overrides=True):
+        """Upsert one chunk with a select, then per-row updates and one insert."""
+        table = Skill.__table__
+        by_name = {row['name'].lower(): row for row in rows}
+        existing = db.session.execute(
+            db.select(table.c.id, func.lower(table.c.name), table.c.manual_override)
+            .where(func.lower(table.c.name).in_(list(by_name)))
+        ).all()
+        
+        for skill_id, lowered, manual_override in existing:
+            row = by_name.pop(lowered)
+            if preserve_manual_overrides and manual_override:
+                continue
+            db.session.execute(
+                table.update().where(table.c.id == skill_id)
+                .values({column: row[column] for column in cls.UPSERT_UPDATE_COLUMNS})
+            )
+        
+        if by_name:
+            db.session.execute(table.insert(), list(by_name.values()))
+    
+    @classmethod
+    def recalculate_technologies(cls, technology_keys, preserve_manual_overrides=True):
+        """
+        Incrementally recalculate only the skills for the given technologies,
+        using counts from the technology index instead of rescanning projects.
+        Does not commit; callers commit with their own write.
+        """
+        keys = {key.lower() for key in technology_keys if key}
+        if not keys:
+            return {'added': 0, 'updated': 0, 'preserved': 0}
+        
+        stats = TechnologyIndex.technology_stats(keys)
+        scores = SkillScoringEngine.score_technologies(keys)
+        aliases = TechnologyIndex.alias_map()
+        candidate_names = keys | {alias for alias, key in aliases.items() if key in keys}
+        existing_skills = {
+            TechnologyIndex.resolve_key(skill.name, aliases): skill for skill in
+            Skill.query.filter(func.lower(Skill.name).in_(candidate_names)).all()
+        }
+        
+        added = 0
+        updated = 0
+        preserved = 0
+        touched_categories = set()
+        now = datetime.utcnow()
+        
+        for key in keys:
+            data = stats.get(key, {'name': key, 'category': None, 'count': 0, 'featured_projects': 0})
+            level = scores.get(key, {}).get('level', SkillScoringEngine.MIN_LEVEL)
+            skill = existing_skills.get(key)
+            
+            if skill is None:
+                if data['count'] == 0:
+                    continue
+                category = data['category'] or cls.categorize_technology(key)
+                db.session.add(Skill(
+                    name=data['name'][:50],
+                    category=category,
+                    level=level,
+                    order=0,
+                    auto_calculated_level=level,
+                    project_count=data['count'],
+                    manual_override=False,
+                    last_calculated=now
+                ))
+                touched_categories.add(category)
+                added += 1
+                continue
+            
+            skill.project_count = data['count']
+            skill.auto_calculated_level = level
+            skill.last_calculated = now
+            touched_categories.add(skill.category)
+            
+            if preserve_manual_overrides and skill.manual_override:
+                preserved += 1
+            elif data['count'] > 0:
+                skill.level = level
+                updated += 1
+        
+        db.session.flush()
+        cls._reorder_categories(touched_categories)
+        
+        return {'added': added, 'updated': updated, 'preserved': preserved}
+    
+    @classmethod
+    def _reorder_categories(cls, categories):
+        """Re-rank auto-calculated skills within the given categories by project count."""
+        for category in categories:
+            skills = Skill.query.filter(
+                Skill.category == category,
+                db.or_(Skill.manual_override == False, Skill.manual_override.is_(None))
+            ).order_by(Skill.project_count.desc(), func.lower(Skill.name)).all()
+            
+            for position, skill in enumerate(skills):
+                skill.order = 100 - position
+    
     @classmethod
     def get_skill_insights(cls):
         """
         Get insights about current skills and project alignment
         """
-        tech_data = cls.extract_technologies_from_projects()
-        existing_skills = Skill.query.all()
+        tech_stats = TechnologyIndex.technology_stats()
+        aliases = TechnologyIndex.alias_map()
+        skill_names = [name for (name,) in db.session.query(Skill.name).all()]
+        skill_keys = {
+            TechnologyIndex.resolve_key(name, aliases): name.lower()
+            for name in skill_names
+        }
         
         # Technologies in projects but not in skills
-        project_techs = set(data['name'].lower() for data in tech_data.values())
-        skill_names = set(skill.name.lower() for skill in existing_skills)
+        project_techs = set(tech_stats.keys())
         
-        missing_skills = project_techs - skill_names
-        unused_skills = skill_names - project_techs
+        missing_skills = project_techs - set(skill_keys)
+        unused_skills = {skill_keys[key] for key in set(skill_keys) - project_techs}
+        
+        distribution = {cat: 0 for cat in cls.SKILL_CATEGORIES.keys()}
+        for data in tech_stats.values():
+            if data['category'] in distribution:
+                distribution[data['category']] += 1
         
         return {
             'total_projects': Project.query.count(),
-            'total_technologies': len(tech_data),
-            'total_skills': len(existing_skills),
+            'total_technologies': len(tech_stats),
+            'total_skills': len(skill_names),
             'missing_skills': list(missing_skills),
             'unused_skills': list(unused_skills),
-            'project_tech_distribution': {
-                cat: len([t for t in tech_data.values() if t['category'] == cat])
-                for cat in cls.SKILL_CATEGORIES.keys()
-            }
-        }
\ No newline at end of file
+            'project_tech_distribution': distribution
+        }
+
+    
+    @classmethod
+    def get_cached_skill_insights(cls, stale_while_revalidate=False):
+        """
+        Serve get_skill_insights from cache until a Project/Skill/technology write is committed.
+        
+        With stale_while_revalidate, an outdated result is returned immediately while a
+        background thread recomputes it.
+        
+        Returns:
+            Tuple of (insights, version stamp, cache status 'hit'/'miss'/'stale')
+        """
+        version = table_versions.stamp(cls.INSIGHTS_DEPENDENCIES)
+        cached = cls._insights_cache
+        
+        if cached['value'] is not None and cached['version'] == version:
+            return cached['value'], version, 'hit'
+        
+        if stale_while_revalidate and cached['value'] is not None:
+            cls._revalidate_insights_in_background(current_app._get_current_object())
+            return cached['value'], cached['version'], 'stale'
+        
+        value = cls.get_skill_insights()
+        cls._insights_cache = {'version': version, 'value': value}
+        return value, version, 'miss'
+    
+    @classmethod
+    def _revalidate_insights_in_background(cls, app):
+        with cls._insights_lock:
+            if cls._insights_refreshing:
+                return
+            cls._insights_refreshing = True
+        
+        def refresh():
+            try:
+                with app.app_context():
+                    version = table_versions.stamp(cls.INSIGHTS_DEPENDENCIES)
+                    cls._insights_cache = {'version': version, 'value': cls.get_skill_insights()}
+            except Exception as e:
+                print(f"Skill insights revalidation failed: {str(e)}")
+            finally:
+                cls._insights_refreshing = False
+        
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+SkillCalculator._CATEGORY_INDEX = SkillCalculator._build_category_index()
+table_versions.track(SkillCalculator.INSIGHTS_DEPENDENCIES)
@@ -0,0 +1,225 @@
+"""
+Vectorized skill scoring.
+
+Every technology is scored from the projects and experience entries that use
+it. The links are loaded once as the coordinates of a sparse technology x
+project usage matrix, and per-project features (recency, featured flag) are
+applied as matrix-vector products with np.bincount instead of a Python loop
+per technology. The weighted score is then quantized to the 1-5 skill scale.
+
+Each feature is log-scaled against a fixed saturation point (e.g. 5 projects
+or 5 years of experience count as full marks). A technology's score
+therefore depends only on its own usage, not on the strongest technology.
+Incremental recalculation can score just the technologies a write touched
+and still agree with a full sync.
+
+Weights and saturation points are read from the environment so they can be
+tuned without a deploy:
+
+    SKILL_WEIGHT_COUNT, SKILL_WEIGHT_RECENCY, SKILL_WEIGHT_FEATURED,
+    SKILL_WEIGHT_LANGUAGE, SKILL_WEIGHT_EXPERIENCE, SKILL_RECENCY_HALF_LIFE_DAYS,
+    SKILL_SATURATION_COUNT, SKILL_SATURATION_RECENCY, SKILL_SATURATION_FEATURED,
+    SKILL_SATURATION_LANGUAGE, SKILL_SATURATION_EXPERIENCE
+"""
+
+import os
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from app import db
+from app.models import Project, Experience, Technology, ProjectTechnology, ExperienceTechnology
+from app.services.technology_index import TechnologyIndex
+
+
+class SkillScoringEngine:
+    """Scores technologies in one pass over NumPy arrays."""
+
+    DEFAULT_WEIGHTS = {
+        'count': 0.35,       # how many projects use it
+        'recency': 0.2,      # projects decayed by age
+        'featured': 0.15,    # featured projects
+        'language': 0.15,    # share of the repositories' code, per GitHub
+        'experience': 0.15   # years used in professional experience
+    }
+    # Feature value that scores 1.0; anything above is capped
+    DEFAULT_SATURATION = {
+        'count': 5.0,        # projects
+        'recency': 3.0,      # projects, each decayed by age
+        'featured': 2.0,     # featured projects
+        'language': 2.0,     # repositories' worth of code
+        'experience': 5.0    # years
+    }
+    DEFAULT_HALF_LIFE_DAYS = 365
+    MIN_LEVEL = 1
+    MAX_LEVEL = 5
+
+    @classmethod
+    def weights(cls) -> Dict[str, float]:
+        return {
+            name: float(os.getenv(f'SKILL_WEIGHT_{name.upper()}', str(default)))
+            for name, default in cls.DEFAULT_WEIGHTS.items()
+        }
+
+    @classmethod
+    def saturation(cls) -> Dict[str, float]:
+        return {
+            name: float(os.getenv(f'SKILL_SATURATION_{name.upper()}', str(default)))
+            for name, default in cls.DEFAULT_SATURATION.items()
+        }
+
+    @classmethod
+    def half_life_days(cls) -> float:
+        return float(os.getenv('SKILL_RECENCY_HALF_LIFE_DAYS', str(cls.DEFAULT_HALF_LIFE_DAYS)))
+
+    @classmethod
+    def score_technologies(cls, keys: Optional[Iterable[str]] = None,
+                           weights: Optional[Dict[str, float]] = None) -> Dict[str, Dict]:
+        """
+        Score technologies from their project and experience usage.
+
+        Scores are absolute (see DEFAULT_SATURATION), so with keys only those
+        technologies and their links are loaded.
+
+        Args:
+            keys: Optional technology keys to score (default: all)
+            weights: Optional override of the configured weights
+
+        Returns:
+            {key: {'score': float in [0, 1], 'level': int 1-5}}
+        """
+        tech_query = select(Technology.id, Technology.key)
+        if keys is not None:
+            tech_query = tech_query.where(Technology.key.in_(set(keys)))
+        tech_rows = db.session.execute(tech_query).all()
+        if not tech_rows:
+            return {}
+
+        tech_ids = np.fromiter((tech_id for tech_id, _ in tech_rows), dtype=np.int64, count=len(tech_rows))
+        tech_keys = [key for _, key in tech_rows]
+        key_positions = {key: i for i, key in enumerate(tech_keys)}
+
+        project_rows = db.session.execute(select(
+            Project.id, Project.created_at, Project.featured, Project.github_languages
+        )).all()
+        project_ids = np.fromiter((row[0] for row in project_rows), dtype=np.int64, count=len(project_rows))
+
+        link_tech_ids, link_project_ids = cls._columns(db.session.execute(
+            select(ProjectTechnology.technology_id, ProjectTechnology.project_id)
+            .where(ProjectTechnology.technology_id.in_(tech_ids.tolist()))
+        ).all(), 2)
+        rows = cls._positions(tech_ids, link_tech_ids)
+        cols = cls._positions(project_ids, link_project_ids)
+
+        experience_links = db.session.execute(select(
+            ExperienceTechnology.technology_id, Experience.start_date, Experience.end_date, Experience.current
+        ).join(Experience, Experience.id == ExperienceTechnology.experience_id).where(
+            ExperienceTechnology.technology_id.in_(tech_ids.tolist())
+        )).all()
+
+        featured = np.array([1.0 if row[2] else 0.0 for row in project_rows])
+        features = {
+            'count': cls._project_sum(rows, cols, np.ones(project_ids.size), tech_ids.size),
+            'recency': cls._project_sum(rows, cols, cls._recency(project_rows), tech_ids.size),
+            'featured': cls._project_sum(rows, cols, featured, tech_ids.size),
+            'language': cls._language_share(key_positions, project_rows),
+            'experience': cls._experience_years(tech_ids, experience_links)
+        }
+
+        weights = weights or cls.weights()
+        saturation = cls.saturation()
+        total_weight = sum(weights.values()) or 1.0
+        scores = np.zeros(len(tech_keys))
+        for name, values in features.items():
+            scores += weights.get(name, 0.0) * cls._saturate(values, saturation[name])
+        scores /= total_weight
+
+        levels = cls.quantize(scores)
+
+        return {
+            key: {'score': round(float(scores[i]), 4), 'level': int(levels[i])}
+            for i, key in enumerate(tech_keys)
+        }
+
+    @classmethod
+    def quantize(cls, scores: np.ndarray) -> np.ndarray:
+        """Map scores in [0, 1] onto the 1-5 skill scale."""
+        span = cls.MAX_LEVEL - cls.MIN_LEVEL
+        return np.clip(np.rint(cls.MIN_LEVEL + scores * span), cls.MIN_LEVEL, cls.MAX_LEVEL).astype(np.int64)
+
+    @staticmethod
+    def _saturate(values: np.ndarray, saturation: float) -> np.ndarray:
+        """Log-scale a feature onto [0, 1], reaching 1 at the saturation point."""
+        if saturation <= 0:
+            return np.zeros_like(values, dtype=float)
+        return np.minimum(np.log1p(np.maximum(values, 0.0)) / np.log1p(saturation), 1.0)
+
+    @staticmethod
+    def _columns(rows, width: int):
+        """Split result rows into one int64 array per column."""
+        if not rows:
+            return tuple(np.zeros(0, dtype=np.int64) for _ in range(width))
+        return tuple(np.array(column, dtype=np.int64) for column in zip(*rows))
+
+    @staticmethod
+    def _positions(ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Map database ids to their positions in ids (every value must be present)."""
+        order = np.argsort(ids)
+        return order[np.searchsorted(ids, values, sorter=order)]
+
+    @staticmethod
+    def _project_sum(rows: np.ndarray, cols: np.ndarray, project_values: np.ndarray, size: int) -> np.ndarray:
+        """
+        Multiply the technology x project usage matrix, held as its (row, col)
+        coordinates, by a per-project vector.
+        """
+        return np.bincount(rows, weights=project_values[cols], minlength=size)
+
+    @classmethod
+    def _recency(cls, project_rows) -> np.ndarray:
+        """Exponential decay per project by age; undated projects count as current."""
+        now = datetime.utcnow()
+        ages = np.array([
+            (now - created_at).total_seconds() / 86400 if created_at else 0.0
+            for _, created_at, _, _ in project_rows
+        ])
+        return np.power(0.5, np.maximum(ages, 0.0) / max(cls.half_life_days(), 1.0))
+
+    @staticmethod
+    def _language_share(key_positions: Dict[str, int], project_rows) -> np.ndarray:
+        """
+        Fraction of each repository's code written in a technology, per the GitHub
+        languages API byte counts, summed over projects.
+        """
+        share = np.zeros(len(key_positions))
+        aliases = TechnologyIndex.alias_map()
+        for _, _, _, languages in project_rows:
+            if not languages:
+                continue
+            total = sum(languages.values())
+            if total <= 0:
+                continue
+            for language, byte_count in languages.items():
+                row = key_positions.get(TechnologyIndex.resolve_key(language, aliases))
+                if row is not None:
+                    share[row] += byte_count / total
+        return share
+
+    @classmethod
+    def _experience_years(cls, tech_ids: np.ndarray, experience_links) -> np.ndarray:
+        """Years of professional experience per technology."""
+        if not experience_links:
+            return np.zeros(tech_ids.size)
+
+        today = date.today()
+        link_tech_ids = np.array([tech_id for tech_id, _, _, _ in experience_links], dtype=np.int64)
+        durations = np.array([
+            max(0, ((today if current or not end_date else end_date) - start_date).days) / 365.25
+            for _, start_date, end_date, current in experience_links
+        ])
+
+        return np.bincount(
+            cls._positions(tech_ids, link_tech_ids), weights=durations, minlength=tech_ids.size
+        )
@@ -0,0 +1,231 @@
+# Normalized technology tables maintained on project/experience writes
+
+from app.models import (
+    Project, Experience, Technology, TechnologyAlias,
+    ProjectTechnology, ExperienceTechnology
+)
+from app import db
+from sqlalchemy import func, case
+
+class TechnologyIndex:
+
+    # canonical key: (display name, aliases)
+    CANONICAL_TECHNOLOGIES = {
+        'react': ('React', ['reactjs', 'react.js']),
+        'react native': ('React Native', ['react-native']),
+        'vue.js': ('Vue.js', ['vue', 'vuejs']),
+        'next.js': ('Next.js', ['nextjs']),
+        'nuxt.js': ('Nuxt.js', ['nuxt', 'nuxtjs']),
+        'node.js': ('Node.js', ['node', 'nodejs', 'node js']),
+        'express.js': ('Express.js', ['express', 'expressjs']),
+        'javascript': ('JavaScript', ['js']),
+        'typescript': ('TypeScript', ['ts']),
+        'postgresql': ('PostgreSQL', ['postgres', 'psql']),
+        'mongodb': ('MongoDB', ['mongo']),
+        'tailwind css': ('Tailwind CSS', ['tailwind', 'tailwindcss']),
+        'go': ('Go', ['golang']),
+        'kubernetes': ('Kubernetes', ['k8s']),
+        'html': ('HTML', ['html5']),
+        'css': ('CSS', ['css3']),
+        'socket.io': ('Socket.IO', ['socketio', 'socket io']),
+    }
+
+    _STATIC_ALIASES = {
+        alias: key
+        for key, (_, aliases) in CANONICAL_TECHNOLOGIES.items()
+        for alias in aliases
+    }
+
+    @classmethod
+    def alias_map(cls):
+        """Alias -> canonical key, combining the built-in aliases with the technology_alias table."""
+        aliases = dict(cls._STATIC_ALIASES)
+        rows = db.session.query(TechnologyAlias.alias, Technology.key).join(
+            Technology, Technology.id == TechnologyAlias.technology_id
+        ).all()
+        aliases.update({alias: key for alias, key in rows})
+        return aliases
+
+    @classmethod
+    def resolve_key(cls, name, aliases=None):
+        """Canonical key for a technology name."""
+        key = name.strip().lower()[:100]
+        aliases = cls._STATIC_ALIASES if aliases is None else aliases
+        return aliases.get(key, key)
+
+    @classmethod
+    def split_technologies(cls, technologies, aliases=None):
+        """
+        Split a comma-separated technologies string into {canonical key: display name},
+        keeping the first spelling of each technology that has no canonical name.
+        """
+        result = {}
+        if not technologies:
+            return result
+
+        for tech in technologies.split(','):
+            name = tech.strip()[:100]
+            if not name:
+                continue
+            key = cls.resolve_key(name, aliases)
+            canonical = cls.CANONICAL_TECHNOLOGIES.get(key)
+            result.setdefault(key, canonical[0] if canonical else name)
+        return result
+
+    @classmethod
+    def get_or_create_technologies(cls, names):
+        """
+        Map {canonical key: display name} to Technology rows, creating missing ones.
+
+        Returns {key: Technology}
+        """
+        from app.services.skill_calculator import SkillCalculator
+
+        if not names:
+            return {}
+
+        technologies = {
+            tech.key: tech for tech in
+            Technology.query.filter(Technology.key.in_(list(names))).all()
+        }
+        for key, name in names.items():
+            if key not in technologies:
+                tech = Technology(key=key, name=name, category=SkillCalculator.categorize_technology(key))
+                db.session.add(tech)
+                technologies[key] = tech
+
+        db.session.flush()
+        return technologies
+
+    @classmethod
+    def _sync_links(cls, link_model, owner_column, owner_id, technologies_text, aliases=None):
+        wanted = cls.split_technologies(technologies_text, aliases)
+        existing = {
+            key: link for link, key in
+            db.session.query(link_model, Technology.key).join(
+                Technology, Technology.id == link_model.technology_id
+            ).filter(owner_column == owner_id).all()
+        }
+
+        changed = set()
+        for key, link in existing.items():
+            if key not in wanted:
+                db.session.delete(link)
+                changed.add(key)
+
+        missing = {key: name for key, name in wanted.items() if key not in existing}
+        for key, tech in cls.get_or_create_technologies(missing).items():
+            db.session.add(link_model(**{owner_column.key: owner_id, 'technology_id': tech.id}))
+            changed.add(key)
+
+        return changed
+
+    @classmethod
+    def index_project(cls, project, aliases=None):
+        """
+        Bring the technology links for a project in line with its technologies string.
+        Must be called after the project has an id (flush first for new projects).
+
+        Returns the set of technology keys whose project counts changed.
+        """
+        return cls._sync_links(
+            ProjectTechnology, ProjectTechnology.project_id, project.id,
+            project.technologies, aliases or cls.alias_map()
+        )
+
+    @classmethod
+    def index_experience(cls, experience, aliases=None):
+        """Same as index_project, for an experience entry."""
+        return cls._sync_links(
+            ExperienceTechnology, ExperienceTechnology.experience_id, experience.id,
+            experience.technologies, aliases or cls.alias_map()
+        )
+
+    @classmethod
+    def project_keys(cls, project_id):
+        """Technology keys currently linked to a project."""
+        return {
+            key for (key,) in
+            db.session.query(Technology.key).join(
+                ProjectTechnology, ProjectTechnology.technology_id == Technology.id
+            ).filter(ProjectTechnology.project_id == project_id).all()
+        }
+
+    @classmethod
+    def remove_project(cls, project_id):
+        """Drop a project's technology links. Returns the technology keys that lost a project."""
+        keys = cls.project_keys(project_id)
+        ProjectTechnology.query.filter_by(project_id=project_id).delete(synchronize_session=False)
+        return keys
+
+    @classmethod
+    def rebuild(cls):
+        """Rebuild all project and experience links from the comma-separated strings."""
+        ProjectTechnology.query.delete(synchronize_session=False)
+        ExperienceTechnology.query.delete(synchronize_session=False)
+
+        aliases = cls.alias_map()
+        links = []
+        for model, link_model, owner_field in (
+            (Project, ProjectTechnology, 'project_id'),
+            (Experience, ExperienceTechnology, 'experience_id')
+        ):
+            for owner_id, technologies in db.session.query(model.id, model.technologies).all():
+                for key, name in cls.split_technologies(technologies, aliases).items():
+                    links.append((link_model, owner_field, owner_id, key, name))
+
+        technologies = cls.get_or_create_technologies({key: name for _, _, _, key, name in links})
+        for link_model, owner_field, owner_id, key, _ in links:
+            db.session.add(link_model(**{owner_field: owner_id, 'technology_id': technologies[key].id}))
+
+        db.session.flush()
+        return len(links)
+
+    @classmethod
+    def technology_stats(cls, keys=None):
+        """
+        Aggregate project counts per technology with an indexed join.
+
+        Args:
+            keys: Optional iterable of technology keys to restrict the aggregation to
+
+        Returns:
+            {key: {'name', 'category', 'count', 'featured_projects'}}
+        """
+        query = db.session.query(
+            Technology.key,
+            Technology.name,
+            Technology.category,
+            func.count(ProjectTechnology.project_id),
+            func.sum(case((Project.featured == True, 1), else_=0))
+        ).join(
+            ProjectTechnology, ProjectTechnology.technology_id == Technology.id
+        ).join(
+            Project, Project.id == ProjectTechnology.project_id
+        ).group_by(Technology.id, Technology.key, Technology.name, Technology.category)
+
+        if keys is not None:
+            keys = list(keys)
+            if not keys:
+                return {}
+            query = query.filter(Technology.key.in_(keys))
+
+        return {
+            key: {
+                'name': name,
+                'category': category,
+                'count': count,
+                'featured_projects': int(featured or 0)
+            }
+            for key, name, category, count, featured in query.all()
+        }
+
+    @classmethod
+    def projects_using(cls, name):
+        """Query for the projects that use a technology (resolving aliases)."""
+        key = cls.resolve_key(name, cls.alias_map())
+        return Project.query.join(
+            ProjectTechnology, ProjectTechnology.project_id == Project.id
+        ).join(
+            Technology, Technology.id == ProjectTechnology.technology_id
+        ).filter(Technology.key == key)
@@ -0,0 +1,96 @@
+"""
+User-agent classification for analytics sessions.
+
+A User-Agent string is matched against ordered tables of compiled rules and
+the first match wins. Order matters because UAs carry compatibility tokens:
+- Edge and Opera also say "Chrome";
+- Chrome also says "Safari";
+- iOS says "like Mac OS X";
+- Android says "Linux".
+
+Results are memoized per UA string in a bounded LRU. A site sees few
+distinct UAs, so classifying a session is usually a dict hit.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+
+class ParsedUserAgent(NamedTuple):
+    device_type: str  # desktop, mobile, tablet or bot
+    browser: str
+    os: str
+
+
+def _rules(*rules: Tuple[str, str]):
+    return tuple((re.compile(pattern, re.IGNORECASE), name) for pattern, name in rules)
+
+
+class UserAgentParser:
+    """Classifies User-Agent strings with ordered rule tables."""
+
+    BOT_RULE = re.compile(r'bot\b|crawl|spider|slurp|headless|lighthouse|facebookexternalhit|preview', re.IGNORECASE)
+
+    BROWSER_RULES = _rules(
+        (r'\bedg(?:e|a|ios)?/', 'Edge'),
+        (r'\bopr/|\bopera\b|\bopt/', 'Opera'),
+        (r'samsungbrowser/', 'Samsung Internet'),
+        (r'firefox/|fxios/', 'Firefox'),
+        (r'chrome/|crios/|chromium/', 'Chrome'),
+        (r'msie |trident/', 'Internet Explorer'),
+        (r'safari/', 'Safari'),
+    )
+
+    OS_RULES = _rules(
+        (r'iphone|ipad|ipod', 'iOS'),
+        (r'android', 'Android'),
+        (r'windows', 'Windows'),
+        (r'\bcros\b', 'ChromeOS'),
+        (r'mac os x|macintosh', 'macOS'),
+        (r'linux|x11', 'Linux'),
+    )
+
+    DEVICE_RULES = _rules(
+        (r'ipad|tablet|kindle|silk/|playbook', 'tablet'),
+        (r'mobi|iphone|ipod|windows phone', 'mobile'),
+        (r'android', 'tablet'),  # Android without "Mobile" is a tablet
+    )
+
+    MAX_LENGTH = 512
+
+    @classmethod
+    def parse(cls, user_agent: str) -> ParsedUserAgent:
+        """
+        Classify a User-Agent header.
+
+        Args:
+            user_agent: Raw header value (may be empty)
+
+        Returns:
+            ParsedUserAgent of device type, browser and OS ('Other' when unknown)
+        """
+        return cls._parse((user_agent or '')[:cls.MAX_LENGTH])
+
+    @classmethod
+    @lru_cache(maxsize=int(os.getenv('USER_AGENT_CACHE_SIZE', '2048')))
+    def _parse(cls, user_agent: str) -> ParsedUserAgent:
+        browser = cls._first(cls.BROWSER_RULES, user_agent, 'Other')
+        os_name = cls._first(cls.OS_RULES, user_agent, 'Other')
+        if cls.BOT_RULE.search(user_agent):
+            device_type = 'bot'
+        else:
+            device_type = cls._first(cls.DEVICE_RULES, user_agent, 'desktop')
+        return ParsedUserAgent(device_type, browser, os_name)
+
+    @staticmethod
+    def _first(rules, user_agent: str, default: str) -> str:
+        for pattern, name in rules:
+            if pattern.search(user_agent):
+                return name
+        return default
+
+    @classmethod
+    def cache_info(cls):
+        return cls._parse.cache_info()
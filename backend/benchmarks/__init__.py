@@ -0,0 +1 @@
+"""Analytics benchmarks and synthetic data generator (see benchmarks.__main__)."""
@@ -0,0 +1,88 @@
+"""
+Analytics benchmarks.
+
+Run from backend/:
+
+    python -m benchmarks generate --sessions 1000000 --reset [--db postgres]
+    python -m benchmarks run [--db postgres] [--save NAME] [--compare NAME]
+
+--db is sqlite (a file in the temp directory), postgres
+(BENCHMARK_POSTGRES_URL, default postgresql://localhost/portfolio_benchmark)
+or a database URL. Point it at a dedicated database: --reset drops every
+table first and refuses databases whose name doesn't contain "bench".
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from sqlalchemy.engine import make_url
+
+
+def database_url(db: str) -> str:
+    if db == 'sqlite':
+        return 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'portfolio-benchmark.db')
+    if db == 'postgres':
+        return os.getenv('BENCHMARK_POSTGRES_URL', 'postgresql://localhost/portfolio_benchmark')
+    return db
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Analytics benchmarks')
+    parser.add_argument('--db', default='sqlite', help='sqlite, postgres or a database URL (default: sqlite)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Populate the database with synthetic analytics')
+    generate.add_argument('--sessions', type=int, default=100000)
+    generate.add_argument('--events-per-session', type=float, default=8.0, help='Mean events per session')
+    generate.add_argument('--days', type=int, default=30, help='Days of history')
+    generate.add_argument('--seed', type=int, default=42)
+    generate.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+
+    run = commands.add_parser('run', help='Run the benchmark cases')
+    run.add_argument('--cases', help='Comma-separated case names (default: all)')
+    run.add_argument('--repeat', type=float, default=1.0, help='Scale the iterations of every case')
+    run.add_argument('--save', metavar='NAME', help='Save the results as a baseline')
+    run.add_argument('--compare', metavar='NAME', help='Compare the results with a saved baseline')
+    run.add_argument('--threshold', type=float, default=0.2, help='Regression threshold (default: 0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    url = database_url(args.db)
+    os.environ['DATABASE_URL'] = url
+    from app import create_app, db
+    from benchmarks import suite
+
+    app = create_app()
+    with app.app_context():
+        if args.command == 'generate':
+            if args.reset:
+                if 'bench' not in (make_url(url).database or ''):
+                    parser.error(f'refusing to reset {make_url(url).database!r}: not a benchmark database')
+                db.drop_all()
+            db.create_all()
+            report = suite.generate(args.sessions, args.events_per_session, args.days, args.seed)
+            for table in ('sessions', 'events'):
+                result = report[table]
+                print(f"{result['table']}: {result['rows']} rows in {result['seconds']}s "
+                      f"({result['rows_per_second']} rows/s)")
+            print(f"daily metrics: {report['daily_metrics_seconds']}s")
+            return 0
+
+        cases = args.cases.split(',') if args.cases else None
+        unknown = set(cases or ()) - set(suite.AnalyticsBenchmarks.ITERATIONS)
+        if unknown:
+            parser.error(f'unknown cases: {", ".join(sorted(unknown))}')
+        report = suite.AnalyticsBenchmarks(app, repeat=args.repeat).run(cases)
+        if args.save:
+            print(f'Saved baseline {suite.save_baseline(report, args.save)}')
+        if args.compare:
+            regressions = suite.compare(report, suite.load_baseline(args.compare), args.threshold)
+            if regressions:
+                print(f'Regressed: {", ".join(regressions)}')
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Synthetic analytics traffic for benchmarks.
+
+The data is skewed the way real portfolio traffic is:
+- Arrivals follow a daily curve that peaks in the (UTC) afternoon, with
+  quieter weekends.
+- Returning visitors share a pool of IPs, weighted toward a few heavy
+  visitors.
+- Devices are mostly desktop and mobile with a few bots, each with a
+  matching User-Agent.
+- Events per session are log-normal (most sessions are short, a few are
+  very long).
+- Projects, skills and pages follow Zipf distributions.
+
+Every session draws from its own RNG seeded by (seed, index). The events
+stream can therefore replay the sessions stream without keeping millions
+of sessions in memory. Sessions are loaded before their events, as the
+foreign key requires.
+"""
+
+import bisect
+import itertools
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+from app.services.user_agent import UserAgentParser
+
+USER_AGENTS = {
+    'desktop': [
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15',
+        'Mozilla/5.0 (X11; Linux x86_64; rv:127.0) Gecko/20100101 Firefox/127.0',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36 Edg/126.0',
+    ],
+    'mobile': [
+        'Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1',
+        'Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Mobile Safari/537.36',
+        'Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/25.0 Chrome/121.0 Mobile Safari/537.36',
+    ],
+    'tablet': [
+        'Mozilla/5.0 (iPad; CPU OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1',
+    ],
+    'bot': [
+        'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) HeadlessChrome/126.0 Safari/537.36',
+    ],
+}
+DEVICE_WEIGHTS = {'desktop': 55, 'mobile': 38, 'tablet': 5, 'bot': 2}
+RESOLUTIONS = {'desktop': ['1920x1080', '2560x1440', '1440x900'], 'mobile': ['390x844', '412x915'],
+               'tablet': ['820x1180'], 'bot': ['800x600']}
+REFERRERS = ['', '', '', 'https://www.google.com/', 'https://www.linkedin.com/', 'https://github.com/']
+COUNTRIES = ['US', 'US', 'US', 'CA', 'GB', 'DE', 'IN', 'BR']
+
+# Share of traffic per UTC hour
+HOURLY_WEIGHTS = [2, 1, 1, 1, 1, 1, 2, 3, 4, 5, 6, 7, 8, 8, 9, 10, 10, 9, 8, 7, 6, 5, 4, 3]
+WEEKEND_FACTOR = 0.6
+
+EVENT_WEIGHTS = {
+    'page_view': 45, 'skill_hover': 20, 'project_click': 15, 'scroll_depth': 7,
+    'skill_click': 5, 'github_click': 5, 'contact_click': 2, 'contact_submit': 1,
+}
+EVENT_CATEGORIES = {'page_view': 'navigation', 'scroll_depth': 'engagement', 'contact_submit': 'conversion'}
+
+PROJECTS = [f'Project {n}' for n in range(1, 41)]
+SKILLS = [f'Skill {n}' for n in range(1, 121)]
+PAGES = ['/', '/projects', '/skills', '/experience', '/certificates', '/contact'] + \
+        [f'/projects/{n}' for n in range(1, 41)]
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+class Picker:
+    """Weighted choice with precomputed cumulative weights (random.choices recomputes them per call)."""
+
+    def __init__(self, items, weights):
+        self.items = list(items)
+        self.cumulative = list(itertools.accumulate(weights))
+        self.total = self.cumulative[-1]
+
+    def __call__(self, rng: random.Random):
+        return self.items[bisect.bisect(self.cumulative, rng.random() * self.total)]
+
+
+class SyntheticAnalytics:
+    """Deterministic streams of synthetic analytics sessions and events."""
+
+    def __init__(self, sessions: int, events_per_session: float = 8.0, days: int = 30,
+                 seed: int = 42, end: datetime = None):
+        """
+        Args:
+            sessions: Number of sessions to generate
+            events_per_session: Mean events per session
+            days: Days of history, ending at end
+            seed: Base seed; the same arguments always give the same data
+            end: Newest possible session start (default now)
+        """
+        self.count = sessions
+        self.days = days
+        self.seed = seed
+        self.end = end or datetime.utcnow()
+        self.start = self.end - timedelta(days=days)
+        self.visitors = max(1, int(sessions * 0.6))
+        # Log-normal events per session with the requested mean
+        self.sigma = 1.0
+        self.mu = math.log(max(events_per_session, 1.0)) - self.sigma ** 2 / 2
+
+        hour_slots = [(day, hour) for day in range(days) for hour in range(24)]
+        self.pick_slot = Picker(hour_slots, [
+            HOURLY_WEIGHTS[hour] * (WEEKEND_FACTOR if (self.start + timedelta(days=day)).weekday() >= 5 else 1)
+            for day, hour in hour_slots
+        ])
+        self.pick_device = Picker(DEVICE_WEIGHTS, DEVICE_WEIGHTS.values())
+        self.pick_event = Picker(EVENT_WEIGHTS, EVENT_WEIGHTS.values())
+        self.pick_project = Picker(PROJECTS, zipf_weights(len(PROJECTS)))
+        self.pick_skill = Picker(SKILLS, zipf_weights(len(SKILLS)))
+        self.pick_page = Picker(PAGES, zipf_weights(len(PAGES), 1.3))
+
+    def _session(self, index: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        rng = random.Random(self.seed * 1_000_003 + index)
+        day, hour = self.pick_slot(rng)
+        started_at = self.start.replace(minute=0, second=0, microsecond=0) + \
+            timedelta(days=day, hours=hour, seconds=rng.random() * 3600)
+        device = self.pick_device(rng)
+        user_agent = rng.choice(USER_AGENTS[device])
+        client = UserAgentParser.parse(user_agent)
+        session_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+        count = max(1, min(500, int(rng.lognormvariate(self.mu, self.sigma))))
+        events, moment, page_views = [], started_at, 0
+        for position in range(count):
+            event_type = 'page_view' if position == 0 else self.pick_event(rng)
+            label, page = '', self.pick_page(rng)
+            if event_type == 'project_click':
+                label = self.pick_project(rng)
+            elif event_type.startswith('skill_'):
+                label = self.pick_skill(rng)
+            elif event_type == 'page_view':
+                page_views += 1
+            events.append({
+                'session_id': session_id,
+                'event_type': event_type,
+                'event_category': EVENT_CATEGORIES.get(event_type, 'interaction'),
+                'event_label': label,
+                'page_path': page,
+                'event_metadata': {'position': position},
+                'timestamp': moment,
+                'page_load_time': int(rng.lognormvariate(6.2, 0.5)) if event_type == 'page_view' else None,
+            })
+            moment += timedelta(seconds=rng.expovariate(1 / 25))
+
+        visitor = int(self.visitors * rng.random() ** 2)  # a few heavy returning visitors
+        session = {
+            'id': session_id,
+            'ip_address': f'10.{visitor >> 16 & 255}.{visitor >> 8 & 255}.{visitor & 255}',
+            'user_agent': user_agent,
+            'referrer': rng.choice(REFERRERS),
+            'country': rng.choice(COUNTRIES),
+            'device_type': client.device_type,
+            'browser': client.browser,
+            'os': client.os,
+            'screen_resolution': rng.choice(RESOLUTIONS[device]),
+            'started_at': started_at,
+            'last_activity': events[-1]['timestamp'],
+            'total_time_seconds': int((events[-1]['timestamp'] - started_at).total_seconds()),
+            'page_views': page_views,
+            'is_active': False,
+        }
+        return session, events
+
+    def sessions(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.count):
+            yield self._session(index)[0]
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.count):
+            yield from self._session(index)[1]
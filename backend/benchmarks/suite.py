@@ -0,0 +1,223 @@
+"""
+Analytics benchmark cases, timing harness and baselines.
+
+Each case times one AnalyticsService entry point, called the way its route
+calls it. The write paths run inside a request context with a realistic
+User-Agent and client IP. A result reports throughput and the mean, p50,
+p95 and p99 latency in milliseconds.
+
+Baselines are JSON files under benchmarks/baselines/. A comparison flags a
+case as a regression when its p95 latency grew, or its throughput fell, by
+more than the threshold (default 20%).
+"""
+
+import json
+import os
+import platform
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models import AnalyticsEvent, AnalyticsMetrics, AnalyticsSession
+from app.services.analytics_service import AnalyticsService
+from benchmarks.generator import USER_AGENTS, SyntheticAnalytics
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def measure(call: Callable[[int], Any], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    """Time iterations calls of call(i) after warmup untimed calls."""
+    for i in range(warmup):
+        call(i)
+    timings = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        before = time.perf_counter()
+        call(i)
+        timings.append(time.perf_counter() - before)
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'seconds': round(elapsed, 4),
+        'ops_per_second': round(iterations / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+    }
+
+
+class AnalyticsBenchmarks:
+    """The benchmark cases, run against the data already in the app's database."""
+
+    # Iterations per case at repeat=1
+    ITERATIONS = {
+        'track_event': 2000,
+        'create_session': 1000,
+        'touch_session': 2000,
+        'get_real_time_metrics': 50,
+        'calculate_daily_metrics': 10,
+        'get_historical_metrics': 200,
+        'export_data': 5,
+    }
+
+    def __init__(self, app, repeat: float = 1.0, seed: int = 7):
+        self.app = app
+        self.repeat = repeat
+        self.rng = random.Random(seed)
+        self.session_ids: List[str] = []
+        self.days: List[date] = []
+
+    def setup(self):
+        """Sample session ids and data days to drive the cases."""
+        self.session_ids = list(db.session.scalars(select(AnalyticsSession.id).limit(5000)))
+        if not self.session_ids:
+            raise RuntimeError('No analytics data: run `python -m benchmarks generate` first')
+        first, last = db.session.execute(
+            select(func.min(AnalyticsSession.started_at), func.max(AnalyticsSession.started_at))
+        ).one()
+        self.days = [first.date() + timedelta(days=n) for n in range((last.date() - first.date()).days + 1)]
+
+    def dataset(self) -> Dict[str, int]:
+        return {
+            'sessions': db.session.scalar(select(func.count()).select_from(AnalyticsSession)),
+            'events': db.session.scalar(select(func.count()).select_from(AnalyticsEvent)),
+            'daily_metrics': db.session.scalar(select(func.count()).select_from(AnalyticsMetrics)),
+        }
+
+    def _request(self, i: int):
+        device = ('desktop', 'mobile', 'tablet')[i % 3]
+        return self.app.test_request_context(
+            '/api/analytics/event', method='POST',
+            headers={'User-Agent': USER_AGENTS[device][i % len(USER_AGENTS[device])]},
+            environ_base={'REMOTE_ADDR': f'10.200.{i >> 8 & 255}.{i & 255}'}
+        )
+
+    def case_track_event(self, i: int):
+        with self._request(i):
+            AnalyticsService.track_event(self.rng.choice(self.session_ids), {
+                'event_type': 'project_click', 'event_category': 'interaction',
+                'event_label': f'Project {i % 40 + 1}', 'page_path': '/projects', 'metadata': {'i': i}
+            })
+
+    def case_create_session(self, i: int):
+        with self._request(i):
+            AnalyticsService.create_or_update_session({'referrer': '', 'screen_resolution': '1920x1080'})
+
+    def case_touch_session(self, i: int):
+        with self._request(i):
+            AnalyticsService.create_or_update_session({'session_id': self.rng.choice(self.session_ids)})
+
+    def case_get_real_time_metrics(self, i: int):
+        AnalyticsService.get_real_time_metrics()
+
+    def case_calculate_daily_metrics(self, i: int):
+        AnalyticsService.calculate_daily_metrics(self.days[i % len(self.days)])
+
+    def case_get_historical_metrics(self, i: int):
+        AnalyticsService.get_historical_metrics(30)
+
+    def case_export_data(self, i: int):
+        end = self.days[-1]
+        AnalyticsService.export_data('json', (end - timedelta(days=6), end))
+
+    def run(self, cases: Optional[List[str]] = None, log: Callable[[str], None] = print) -> Dict[str, Any]:
+        """Run the cases (default all); returns the results with the dataset and environment."""
+        self.setup()
+        results = {}
+        for name in cases or list(self.ITERATIONS):
+            iterations = max(1, int(self.ITERATIONS[name] * self.repeat))
+            results[name] = measure(getattr(self, f'case_{name}'), iterations)
+            log(format_result(name, results[name]))
+        return {
+            'created': datetime.utcnow().isoformat(timespec='seconds'),
+            'database': db.engine.dialect.name,
+            'dataset': self.dataset(),
+            'python': platform.python_version(),
+            'results': results,
+        }
+
+
+def generate(sessions: int, events_per_session: float, days: int, seed: int,
+             log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """Bulk load synthetic sessions and events, then compute their daily metrics."""
+    from app.services.bulk_loader import BulkLoader
+
+    data = SyntheticAnalytics(sessions, events_per_session, days, seed)
+    report = {
+        'sessions': BulkLoader(AnalyticsSession, log=log).load(data.sessions()),
+        'events': BulkLoader(AnalyticsEvent, log=log).load(data.events()),
+    }
+    started = time.perf_counter()
+    day = data.start.date()
+    while day <= data.end.date():
+        AnalyticsService.calculate_daily_metrics(day)
+        day += timedelta(days=1)
+    report['daily_metrics_seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def format_result(name: str, result: Dict[str, float]) -> str:
+    return (f"{name:<24} {result['ops_per_second']:>10.1f} ops/s   p50 {result['p50_ms']:>9.3f} ms   "
+            f"p95 {result['p95_ms']:>9.3f} ms   p99 {result['p99_ms']:>9.3f} ms")
+
+
+def baseline_path(name: str) -> str:
+    return name if name.endswith('.json') else os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def save_baseline(report: Dict[str, Any], name: str) -> str:
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as baseline:
+        json.dump(report, baseline, indent=2)
+    return path
+
+
+def load_baseline(name: str) -> Dict[str, Any]:
+    with open(baseline_path(name)) as baseline:
+        return json.load(baseline)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2,
+            log: Callable[[str], None] = print) -> List[str]:
+    """
+    Compare a run with a baseline, case by case.
+
+    Returns:
+        Names of the cases that regressed by more than threshold
+    """
+    if report['database'] != baseline.get('database'):
+        log(f"Note: baseline ran on {baseline.get('database')}, this run on {report['database']}")
+    if report['dataset'] != baseline.get('dataset'):
+        log(f"Note: dataset differs from the baseline ({baseline.get('dataset')})")
+
+    regressions = []
+    for name, result in report['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            log(f'{name:<24} (not in baseline)')
+            continue
+        p95 = result['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0.0
+        throughput = result['ops_per_second'] / before['ops_per_second'] - 1 if before['ops_per_second'] else 0.0
+        regressed = p95 > threshold or throughput < -threshold
+        if regressed:
+            regressions.append(name)
+        log(f"{name:<24} p95 {before['p95_ms']:>9.3f} -> {result['p95_ms']:>9.3f} ms ({p95:+.0%})   "
+            f"throughput {throughput:+.0%}{'   REGRESSION' if regressed else ''}")
+    return regressions
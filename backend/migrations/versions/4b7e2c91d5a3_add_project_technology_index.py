@@ -0,0 +1,60 @@
+"""Add project_technology inverted index
+
+Revision ID: 4b7e2c91d5a3
+Revises: 1ae0a701676b
+Create Date: 2026-10-19 10:12:31.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2c91d5a3'
+down_revision = '1ae0a701676b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_technology',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('project_id', 'key', name='uq_project_technology_project_key')
+    )
+    with op.batch_alter_table('project_technology', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_project_technology_key'), ['key'], unique=False)
+        batch_op.create_index(batch_op.f('ix_project_technology_project_id'), ['project_id'], unique=False)
+
+    # Backfill the index from the existing comma-separated strings
+    bind = op.get_bind()
+    project = sa.table('project', sa.column('id', sa.Integer), sa.column('technologies', sa.String))
+    project_technology = sa.table('project_technology',
+        sa.column('project_id', sa.Integer),
+        sa.column('key', sa.String),
+        sa.column('name', sa.String)
+    )
+
+    rows = []
+    for project_id, technologies in bind.execute(sa.select(project.c.id, project.c.technologies)):
+        seen = set()
+        for tech in (technologies or '').split(','):
+            name = tech.strip()[:100]
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                rows.append({'project_id': project_id, 'key': name.lower(), 'name': name})
+
+    if rows:
+        op.bulk_insert(project_technology, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('project_technology', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_project_technology_project_id'))
+        batch_op.drop_index(batch_op.f('ix_project_technology_key'))
+
+    op.drop_table('project_technology')
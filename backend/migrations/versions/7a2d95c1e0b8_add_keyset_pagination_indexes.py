@@ -0,0 +1,37 @@
+"""Add keyset pagination indexes
+
+Revision ID: 7a2d95c1e0b8
+Revises: e3f81b6d2a47
+Create Date: 2026-10-19 13:26:52.918047
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2d95c1e0b8'
+down_revision = 'e3f81b6d2a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.create_index('ix_project_order_id', ['order', 'id'], unique=False)
+
+    with op.batch_alter_table('analytics_sessions', schema=None) as batch_op:
+        batch_op.create_index('ix_analytics_sessions_last_activity_id', ['last_activity', 'id'], unique=False)
+
+    with op.batch_alter_table('analytics_events', schema=None) as batch_op:
+        batch_op.create_index('ix_analytics_events_timestamp_id', ['timestamp', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('analytics_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_analytics_events_timestamp_id')
+
+    with op.batch_alter_table('analytics_sessions', schema=None) as batch_op:
+        batch_op.drop_index('ix_analytics_sessions_last_activity_id')
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_order_id')
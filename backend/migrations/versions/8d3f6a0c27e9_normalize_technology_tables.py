@@ -0,0 +1,250 @@
+"""Normalize technologies into technology/alias/link tables
+
+Revision ID: 8d3f6a0c27e9
+Revises: 4b7e2c91d5a3
+Create Date: 2026-10-19 11:02:47.530912
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3f6a0c27e9'
+down_revision = '4b7e2c91d5a3'
+branch_labels = None
+depends_on = None
+
+
+# The backfill works from a snapshot of the application's technology rules
+# (TechnologyIndex.CANONICAL_TECHNOLOGIES and SkillCalculator.SKILL_CATEGORIES)
+# as they were at this revision, so later changes to app code can't change
+# what this migration does.
+
+# canonical key: (display name, aliases, category)
+CANONICAL_TECHNOLOGIES = {
+    'react': ('React', ['reactjs', 'react.js'], 'frontend'),
+    'react native': ('React Native', ['react-native'], 'mobile'),
+    'vue.js': ('Vue.js', ['vue', 'vuejs'], 'frontend'),
+    'next.js': ('Next.js', ['nextjs'], 'frontend'),
+    'nuxt.js': ('Nuxt.js', ['nuxt', 'nuxtjs'], 'frontend'),
+    'node.js': ('Node.js', ['node', 'nodejs', 'node js'], 'backend'),
+    'express.js': ('Express.js', ['express', 'expressjs'], 'backend'),
+    'javascript': ('JavaScript', ['js'], 'frontend'),
+    'typescript': ('TypeScript', ['ts'], 'frontend'),
+    'postgresql': ('PostgreSQL', ['postgres', 'psql'], 'database'),
+    'mongodb': ('MongoDB', ['mongo'], 'database'),
+    'tailwind css': ('Tailwind CSS', ['tailwind', 'tailwindcss'], 'frontend'),
+    'go': ('Go', ['golang'], 'backend'),
+    'kubernetes': ('Kubernetes', ['k8s'], 'tools'),
+    'html': ('HTML', ['html5'], 'frontend'),
+    'css': ('CSS', ['css3'], 'frontend'),
+    'socket.io': ('Socket.IO', ['socketio', 'socket io'], 'tools'),
+}
+
+CATEGORIES = {
+    'frontend': [
+        'react', 'vue', 'vue.js', 'angular', 'javascript', 'typescript', 'js', 'ts',
+        'html', 'html5', 'css', 'css3', 'sass', 'scss', 'less', 'tailwind', 'tailwind css',
+        'bootstrap', 'material-ui', 'styled-components', 'next.js', 'nextjs', 'nuxt.js',
+        'svelte', 'jquery', 'webpack', 'vite', 'parcel', 'rollup'
+    ],
+    'backend': [
+        'python', 'flask', 'django', 'fastapi', 'node.js', 'nodejs', 'express', 'express.js',
+        'java', 'spring', 'spring boot', 'c#', 'asp.net', '.net', 'ruby', 'rails',
+        'php', 'laravel', 'symfony', 'go', 'golang', 'rust', 'kotlin', 'scala',
+        'restful apis', 'rest api', 'graphql', 'api', 'microservices'
+    ],
+    'database': [
+        'postgresql', 'postgres', 'mysql', 'mongodb', 'sqlite', 'redis', 'elasticsearch',
+        'cassandra', 'dynamodb', 'mariadb', 'oracle', 'sql server', 'firebase',
+        'supabase', 'prisma', 'mongoose', 'sequelize', 'typeorm', 'sqlalchemy'
+    ],
+    'tools': [
+        'git', 'github', 'gitlab', 'bitbucket', 'docker', 'kubernetes', 'aws', 'azure',
+        'gcp', 'google cloud', 'heroku', 'vercel', 'netlify', 'linux',
+        'ubuntu', 'nginx', 'apache', 'ci/cd', 'jenkins', 'github actions', 'gitlab ci',
+        'terraform', 'ansible', 'vagrant', 'vim', 'vscode', 'intellij', 'postman',
+        'figma', 'adobe', 'jira', 'confluence', 'slack', 'notion'
+    ],
+    'mobile': [
+        'react native', 'flutter', 'ionic', 'cordova', 'swift', 'kotlin', 'java',
+        'objective-c', 'xamarin', 'unity', 'unreal engine'
+    ],
+    'data': [
+        'pandas', 'numpy', 'matplotlib', 'seaborn', 'scikit-learn', 'tensorflow',
+        'pytorch', 'jupyter', 'r', 'tableau', 'power bi', 'excel', 'sql',
+        'apache spark', 'hadoop', 'airflow', 'kafka'
+    ]
+}
+
+ALIASES = {alias: key for key, (_, aliases, _) in CANONICAL_TECHNOLOGIES.items() for alias in aliases}
+VERSION_SUFFIX = re.compile(r'\s*v?\d+(\.\d+|\.x)*$')
+NON_ALNUM = re.compile(r'[^a-z0-9#+]')
+SEGMENT_SPLIT = re.compile(r'\s*(?:\+|/|&|\band\b|\bwith\b)\s*')
+
+
+def _normalize(name):
+    return NON_ALNUM.sub('', VERSION_SUFFIX.sub('', name.lower().strip()))
+
+
+def _category_index():
+    index = {}
+
+    def add(name, category):
+        key = _normalize(name)
+        if not key:
+            return
+        index.setdefault(key, category)
+        if key.endswith('js') and len(key) > 4:
+            index.setdefault(key[:-2], category)
+        elif not key.endswith('js'):
+            index.setdefault(key + 'js', category)
+
+    for category, technologies in CATEGORIES.items():
+        for tech in technologies:
+            add(tech, category)
+    for key, (name, aliases, category) in CANONICAL_TECHNOLOGIES.items():
+        for alias in [key, name] + aliases:
+            add(alias, category)
+    return index
+
+
+def _categorize(key, index):
+    """Category by exact or per-segment lookup; names the snapshot doesn't know are 'tools'."""
+    for name in [key] + [segment for segment in SEGMENT_SPLIT.split(key) if segment]:
+        category = index.get(_normalize(name))
+        if category:
+            return category
+    return 'tools'
+
+
+def _split(technologies):
+    """{canonical key: display name} for a comma-separated technologies string."""
+    result = {}
+    for tech in (technologies or '').split(','):
+        name = tech.strip()[:100]
+        if not name:
+            continue
+        key = name.lower()
+        key = ALIASES.get(key, key)
+        canonical = CANONICAL_TECHNOLOGIES.get(key)
+        result.setdefault(key, canonical[0] if canonical else name)
+    return result
+
+
+def upgrade():
+    # Databases created from the interim revision of 4b7e2c91d5a3, which built
+    # this schema directly, are already normalized
+    if sa.inspect(op.get_bind()).has_table('technology'):
+        return
+
+    # The key/name inverted index is superseded by links to canonical technologies
+    op.drop_table('project_technology')
+
+    op.create_table('technology',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+    op.create_table('technology_alias',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('alias', sa.String(length=100), nullable=False),
+        sa.Column('technology_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['technology_id'], ['technology.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('alias')
+    )
+    op.create_table('project_technology',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('technology_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['technology_id'], ['technology.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('project_id', 'technology_id', name='uq_project_technology')
+    )
+    op.create_table('experience_technology',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('experience_id', sa.Integer(), nullable=False),
+        sa.Column('technology_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['experience_id'], ['experience.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['technology_id'], ['technology.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('experience_id', 'technology_id', name='uq_experience_technology')
+    )
+    with op.batch_alter_table('technology_alias', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_technology_alias_technology_id'), ['technology_id'], unique=False)
+    with op.batch_alter_table('project_technology', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_project_technology_project_id'), ['project_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_project_technology_technology_id'), ['technology_id'], unique=False)
+    with op.batch_alter_table('experience_technology', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_experience_technology_experience_id'), ['experience_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_experience_technology_technology_id'), ['technology_id'], unique=False)
+
+    # Backfill from the existing comma-separated strings
+    bind = op.get_bind()
+    technology = sa.table('technology',
+        sa.column('id', sa.Integer), sa.column('key', sa.String),
+        sa.column('name', sa.String), sa.column('category', sa.String)
+    )
+    technology_alias = sa.table('technology_alias',
+        sa.column('alias', sa.String), sa.column('technology_id', sa.Integer)
+    )
+
+    names = {key: name for key, (name, _, _) in CANONICAL_TECHNOLOGIES.items()}
+    owners = []
+    for table_name, link_table, owner_column in (
+        ('project', 'project_technology', 'project_id'),
+        ('experience', 'experience_technology', 'experience_id')
+    ):
+        owner = sa.table(table_name, sa.column('id', sa.Integer), sa.column('technologies', sa.String))
+        for owner_id, technologies in bind.execute(sa.select(owner.c.id, owner.c.technologies)):
+            techs = _split(technologies)
+            for key, name in techs.items():
+                names.setdefault(key, name)
+            owners.append((link_table, owner_column, owner_id, techs))
+
+    index = _category_index()
+    op.bulk_insert(technology, [
+        {'key': key, 'name': name, 'category': _categorize(key, index)}
+        for key, name in names.items()
+    ])
+    ids = dict(bind.execute(sa.select(technology.c.key, technology.c.id)).all())
+
+    op.bulk_insert(technology_alias, [
+        {'alias': alias, 'technology_id': ids[key]}
+        for key, (_, aliases, _) in CANONICAL_TECHNOLOGIES.items()
+        for alias in aliases
+    ])
+
+    for link_table, owner_column, owner_id, techs in owners:
+        if techs:
+            link = sa.table(link_table, sa.column(owner_column, sa.Integer), sa.column('technology_id', sa.Integer))
+            op.bulk_insert(link, [{owner_column: owner_id, 'technology_id': ids[key]} for key in techs])
+
+
+def downgrade():
+    op.drop_table('experience_technology')
+    op.drop_table('project_technology')
+    op.drop_table('technology_alias')
+    op.drop_table('technology')
+
+    op.create_table('project_technology',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('project_id', 'key', name='uq_project_technology_project_key')
+    )
+    with op.batch_alter_table('project_technology', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_project_technology_key'), ['key'], unique=False)
+        batch_op.create_index(batch_op.f('ix_project_technology_project_id'), ['project_id'], unique=False)
+    # The index is rebuilt from the project strings by POST /api/skills/calculate
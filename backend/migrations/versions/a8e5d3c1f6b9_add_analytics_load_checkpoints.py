@@ -0,0 +1,30 @@
+"""Add analytics load checkpoints
+
+Revision ID: a8e5d3c1f6b9
+Revises: f4c9a2e7d185
+Create Date: 2026-10-19 20:47:33.118094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e5d3c1f6b9'
+down_revision = 'f4c9a2e7d185'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_load_checkpoints',
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('table_name', sa.String(length=50), nullable=False),
+        sa.Column('offset', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('analytics_load_checkpoints')
@@ -0,0 +1,38 @@
+"""Add analytics hourly rollups
+
+Revision ID: b6e0c3d8f412
+Revises: 7a2d95c1e0b8
+Create Date: 2026-10-19 17:02:41.530214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e0c3d8f412'
+down_revision = '7a2d95c1e0b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_hourly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('sessions', sa.Integer(), nullable=True),
+        sa.Column('page_views', sa.Integer(), nullable=True),
+        sa.Column('events', sa.Integer(), nullable=True),
+        sa.Column('event_counts', sa.JSON(), nullable=True),
+        sa.Column('visitors_sketch', sa.LargeBinary(), nullable=True),
+        sa.Column('top_projects_sketch', sa.JSON(), nullable=True),
+        sa.Column('top_skills_sketch', sa.JSON(), nullable=True),
+        sa.Column('top_pages_sketch', sa.JSON(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hour')
+    )
+
+
+def downgrade():
+    op.drop_table('analytics_hourly_rollups')
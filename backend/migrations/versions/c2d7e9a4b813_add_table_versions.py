@@ -0,0 +1,28 @@
+"""Add table versions
+
+Revision ID: c2d7e9a4b813
+Revises: a8e5d3c1f6b9
+Create Date: 2026-10-19 21:34:08.512730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d7e9a4b813'
+down_revision = 'a8e5d3c1f6b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('table_versions',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_versions')
@@ -0,0 +1,46 @@
+"""Add unique lower(name) index on skill
+
+Revision ID: c5a19e4f7b20
+Revises: 8d3f6a0c27e9
+Create Date: 2026-10-19 11:48:05.274611
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a19e4f7b20'
+down_revision = '8d3f6a0c27e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Collapse case-insensitive duplicates first, keeping manual overrides over
+    # auto-calculated rows and the oldest row otherwise
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        'SELECT id, lower(name), manual_override FROM skill ORDER BY id'
+    )).all()
+
+    keep = {}
+    duplicates = []
+    for skill_id, name_key, manual_override in rows:
+        if name_key not in keep:
+            keep[name_key] = (skill_id, manual_override)
+        elif manual_override and not keep[name_key][1]:
+            duplicates.append(keep[name_key][0])
+            keep[name_key] = (skill_id, manual_override)
+        else:
+            duplicates.append(skill_id)
+
+    if duplicates:
+        skill = sa.table('skill', sa.column('id', sa.Integer))
+        bind.execute(skill.delete().where(skill.c.id.in_(duplicates)))
+
+    op.create_index('uq_skill_name_lower', 'skill', [sa.text('lower(name)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_skill_name_lower', table_name='skill')
@@ -0,0 +1,26 @@
+"""Add github_languages to project
+
+Revision ID: e3f81b6d2a47
+Revises: c5a19e4f7b20
+Create Date: 2026-10-19 12:41:17.502394
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f81b6d2a47'
+down_revision = 'c5a19e4f7b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('github_languages', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_column('github_languages')
@@ -0,0 +1,47 @@
+"""Make pagination sort keys NOT NULL
+
+Revision ID: e9b4c7d2a615
+Revises: c2d7e9a4b813
+Create Date: 2026-10-19 22:05:41.273906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4c7d2a615'
+down_revision = 'c2d7e9a4b813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination compares these columns, so NULLs would drop rows from every page
+    op.execute('UPDATE project SET "order" = 0 WHERE "order" IS NULL')
+    op.execute('UPDATE analytics_sessions SET last_activity = COALESCE(started_at, CURRENT_TIMESTAMP) '
+               'WHERE last_activity IS NULL')
+    op.execute('UPDATE analytics_events SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL')
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.alter_column('order', existing_type=sa.Integer(), nullable=False)
+
+    with op.batch_alter_table('analytics_sessions', schema=None) as batch_op:
+        batch_op.alter_column('last_activity', existing_type=sa.DateTime(), nullable=False)
+
+    # On Postgres the partitioned table already has timestamp in its primary key
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('analytics_events', schema=None) as batch_op:
+            batch_op.alter_column('timestamp', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('analytics_events', schema=None) as batch_op:
+            batch_op.alter_column('timestamp', existing_type=sa.DateTime(), nullable=True)
+
+    with op.batch_alter_table('analytics_sessions', schema=None) as batch_op:
+        batch_op.alter_column('last_activity', existing_type=sa.DateTime(), nullable=True)
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.alter_column('order', existing_type=sa.Integer(), nullable=True)
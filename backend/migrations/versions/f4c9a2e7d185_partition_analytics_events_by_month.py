@@ -0,0 +1,103 @@
+"""Partition analytics events by month
+
+Revision ID: f4c9a2e7d185
+Revises: b6e0c3d8f412
+Create Date: 2026-10-19 19:12:08.604317
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c9a2e7d185'
+down_revision = 'b6e0c3d8f412'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+COLUMNS = ('id, session_id, event_type, event_category, event_label, page_path, element_id, '
+           'event_metadata, timestamp, page_load_time, time_on_page')
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _relkind(bind):
+    return bind.execute(sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass('analytics_events')")).scalar()
+
+
+def _create_events_table(partitioned):
+    primary_key = ('id', 'timestamp') if partitioned else ('id',)
+    op.create_table('analytics_events',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('analytics_events_id_seq'::regclass)"), nullable=False),
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('event_category', sa.String(length=50), nullable=False),
+        sa.Column('event_label', sa.String(length=200), nullable=True),
+        sa.Column('page_path', sa.String(length=200), nullable=True),
+        sa.Column('element_id', sa.String(length=100), nullable=True),
+        sa.Column('event_metadata', sa.JSON(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=not partitioned),
+        sa.Column('page_load_time', sa.Integer(), nullable=True),
+        sa.Column('time_on_page', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['analytics_sessions.id'], ),
+        sa.PrimaryKeyConstraint(*primary_key),
+        **({'postgresql_partition_by': 'RANGE (timestamp)'} if partitioned else {})
+    )
+    op.create_index('ix_analytics_events_timestamp_id', 'analytics_events', ['timestamp', 'id'], unique=False)
+
+
+def _swap_out(old_name):
+    """Rename the current table and its index-backed names out of the way."""
+    op.execute(f'ALTER TABLE analytics_events RENAME TO {old_name}')
+    op.execute(f'ALTER TABLE {old_name} RENAME CONSTRAINT analytics_events_pkey TO {old_name}_pkey')
+    op.execute(f'ALTER INDEX IF EXISTS ix_analytics_events_timestamp_id RENAME TO ix_{old_name}_timestamp_id')
+    op.execute('ALTER SEQUENCE analytics_events_id_seq OWNED BY NONE')
+
+
+def _swap_in(old_name):
+    op.execute(f'INSERT INTO analytics_events ({COLUMNS}) SELECT {COLUMNS} FROM {old_name}')
+    op.drop_table(old_name)
+    op.execute('ALTER SEQUENCE analytics_events_id_seq OWNED BY analytics_events.id')
+
+
+def upgrade():
+    bind = op.get_bind()
+    # SQLite stays unpartitioned; a missing table is created partitioned by
+    # the model (app.partitions), and an already partitioned one is done
+    if bind.dialect.name != 'postgresql' or _relkind(bind) != 'r':
+        return
+
+    op.execute("UPDATE analytics_events SET timestamp = now() AT TIME ZONE 'utc' WHERE timestamp IS NULL")
+    oldest = bind.execute(sa.text('SELECT min(timestamp) FROM analytics_events')).scalar()
+    _swap_out('analytics_events_unpartitioned')
+    _create_events_table(partitioned=True)
+
+    # Monthly partitions from the oldest event to MONTHS_AHEAD months ahead
+    # (the same layout app.partitions.MonthlyPartitions maintains)
+    op.execute('CREATE TABLE analytics_events_default PARTITION OF analytics_events DEFAULT')
+    now = datetime.utcnow()
+    month = date((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(f"CREATE TABLE analytics_events_p{month:%Y%m} PARTITION OF analytics_events "
+                   f"FOR VALUES FROM ('{month}') TO ('{upper}')")
+        month = upper
+
+    _swap_in('analytics_events_unpartitioned')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or _relkind(bind) != 'p':
+        return
+
+    _swap_out('analytics_events_partitioned')
+    _create_events_table(partitioned=False)
+    _swap_in('analytics_events_partitioned')  # drops the partitions with their parent
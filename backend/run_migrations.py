@@ -6,6 +6,7 @@ This runs database migrations and populates initial data
 
 from app import create_app, db
 from app.models import Project, Skill, Certificate
+from app.services.technology_index import TechnologyIndex
 from datetime import date
 from flask_migrate import upgrade
 import os
@@ -122,6 +123,10 @@ def populate_sample_data():
         )
         db.session.add(sample_certificate)
 
+        # Link the sample projects to the technology tables
+        db.session.flush()
+        TechnologyIndex.rebuild()
+
         db.session.commit()
         print(f"✅ Added {len(sample_projects)} sample projects and 1 sample certificate")
         return True
@@ -6,6 +6,7 @@ Run this script to populate the production database with your development data.
 
 from app import create_app, db
 from app.models import PersonalInfo, Experience, Education, Certificate, Project, Skill
+from app.services.technology_index import TechnologyIndex
 from datetime import datetime, date
 import sys
 
@@ -187,6 +188,10 @@ def seed_database():
                 skill = Skill(**skill_data)
                 db.session.add(skill)
             
+            # Link the seeded projects and experience to the technology tables
+            db.session.flush()
+            TechnologyIndex.rebuild()
+            
             # Commit all changes
             db.session.commit()
             print("✅ Database seeded successfully!")
@@ -0,0 +1,29 @@
+"""
+Shared fixtures.
+
+Every test gets a fresh app on an in-memory SQLite database, with query
+budgets enforced (QUERY_BUDGET_STRICT) so an endpoint that goes over its
+budget fails the test.
+"""
+
+import os
+
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+import pytest
+
+from app import create_app, db
+# Socket.IO handlers imported before the first init_app are kept by the
+# extension and registered on every test app's server, not just the first
+from app.routes import analytics  # noqa: F401
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, QUERY_BUDGET_STRICT=True)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,63 @@
+"""Coalesced analytics broadcasts: one batched frame per channel per interval."""
+
+import pytest
+
+from app import socketio
+from app.services import broadcast
+from app.services.broadcast import BroadcastScheduler
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Record background task starts instead of running the flush loop."""
+    tasks = []
+    monkeypatch.setattr(broadcast.socketio, 'start_background_task', lambda target, *args: tasks.append(target))
+    return tasks
+
+
+@pytest.fixture
+def dashboard(app, started):
+    client = socketio.test_client(app, namespace='/analytics')
+    client.get_received('/analytics')  # the connect snapshot
+    yield client
+    client.disconnect(namespace='/analytics')
+
+
+def frames(client, name):
+    return [message['args'][0] for message in client.get_received('/analytics') if message['name'] == name]
+
+
+def test_updates_coalesce_into_one_frame(dashboard):
+    scheduler = BroadcastScheduler(interval_ms=250, sample_size=2)
+    for i, device in enumerate(['mobile', 'desktop', 'mobile']):
+        scheduler.schedule('session_batch', {'id': i}, group=device)
+
+    assert scheduler.flush() == 1
+    assert frames(dashboard, 'session_batch') == [{
+        'count': 3,
+        'counts': {'mobile': 2, 'desktop': 1},
+        'sample': [{'id': 1}, {'id': 2}],
+        'dropped': 1,
+        'interval_ms': 250
+    }]
+
+
+def test_each_frame_and_room_is_its_own_channel(dashboard):
+    scheduler = BroadcastScheduler(interval_ms=250, sample_size=5)
+    scheduler.schedule('session_batch', {'id': 1})
+    scheduler.schedule('event_batch', {'id': 2})
+    scheduler.schedule('event_batch', {'id': 3}, room='elsewhere')
+
+    assert scheduler.flush() == 3
+    assert [frame['count'] for frame in frames(dashboard, 'event_batch')] == [1]
+    assert scheduler.flush() == 0
+    assert scheduler.get_stats()['frames_sent'] == 3
+
+
+def test_flush_loop_starts_once_per_burst(started):
+    scheduler = BroadcastScheduler(interval_ms=250)
+    for i in range(100):
+        scheduler.schedule('event_batch', {'id': i})
+
+    assert started == [scheduler._run]
+    assert scheduler.get_stats()['pending'] == 100
@@ -0,0 +1,35 @@
+"""Bulk loading: chunked inserts, checkpoints and loads that keep their ids."""
+
+from datetime import datetime
+
+from app import db
+from app.models import AnalyticsEvent, AnalyticsSession
+from app.services.bulk_loader import BulkLoader
+
+
+def event_rows(count, first_id=None):
+    return [
+        {'id': first_id + i if first_id else None, 'session_id': 's1', 'event_type': 'page_view',
+         'event_category': 'navigation', 'timestamp': datetime(2026, 10, 1, 12, i).isoformat()}
+        for i in range(count)
+    ]
+
+
+def test_chunks_and_checkpoint(app):
+    BulkLoader(AnalyticsSession).load([{'id': 's1'}])
+    loader = BulkLoader(AnalyticsEvent, chunk_size=2)
+    result = loader.load(event_rows(5), name='events')
+    assert (result['rows'], result['chunks'], result['offset']) == (5, 3, 5)
+    assert loader.checkpoint('events') == 5
+    assert AnalyticsEvent.query.count() == 5
+
+
+def test_kept_ids_do_not_collide_with_later_inserts(app):
+    BulkLoader(AnalyticsSession).load([{'id': 's1'}])
+    BulkLoader(AnalyticsEvent, keep_ids=True).load(event_rows(3, first_id=100))
+
+    event = AnalyticsEvent(session_id='s1', event_type='click', event_category='navigation',
+                           timestamp=datetime.utcnow())
+    db.session.add(event)
+    db.session.commit()
+    assert event.id > 102
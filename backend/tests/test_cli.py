@@ -0,0 +1,41 @@
+"""Maintenance commands: GitHub language refresh and technology index rebuild."""
+
+from app import db
+from app.models import Project, Skill
+from app.services.github_rate_limiter import PRIORITY_BACKGROUND
+from app.services.github_service import GitHubService
+from app.services.technology_index import TechnologyIndex
+
+
+def test_refresh_languages_runs_in_the_background_and_recalculates(app, monkeypatch):
+    project = Project(title='Demo', description='d', technologies='Python',
+                      github_url='https://github.com/octo/demo', github_languages={'Python': 10})
+    db.session.add_all([project, Project(title='Offline', description='d', technologies='Go')])
+    db.session.flush()
+    TechnologyIndex.index_project(project)
+    db.session.commit()
+
+    priorities = []
+
+    def fetch_languages(self, github_url):
+        priorities.append(self.priority)
+        return {'Python': 90, 'Shell': 10}
+
+    monkeypatch.setattr(GitHubService, 'fetch_languages', fetch_languages)
+    result = app.test_cli_runner().invoke(args=['github', 'refresh-languages'])
+
+    assert result.exit_code == 0, result.output
+    assert priorities == [PRIORITY_BACKGROUND]
+    assert db.session.get(Project, project.id).github_languages == {'Python': 90, 'Shell': 10}
+    assert Skill.query.filter_by(name='Python').count() == 1
+
+
+def test_rebuild_index_links_projects_written_outside_the_api(app):
+    db.session.add(Project(title='Seeded', description='d', technologies='Python, Flask'))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['skills', 'rebuild-index'])
+
+    assert result.exit_code == 0, result.output
+    assert TechnologyIndex.project_keys(Project.query.one().id) == {'python', 'flask'}
+    assert {skill.name for skill in Skill.query} == {'Python', 'Flask'}
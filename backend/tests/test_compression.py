@@ -0,0 +1,83 @@
+"""Response compression: encoding negotiation, the size threshold and the variant cache."""
+
+import gzip
+
+import pytest
+from flask import Flask, Response, jsonify
+
+from app import compression
+from app.compression import ResponseCompressor
+
+BODY = {'items': ['portfolio'] * 500}
+
+
+@pytest.fixture
+def compressor():
+    return ResponseCompressor(min_size=1024, cache_entries=16)
+
+
+@pytest.fixture
+def client(compressor):
+    app = Flask(__name__)
+    app.after_request(compressor)
+
+    @app.route('/large')
+    def large():
+        return jsonify(BODY)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/versioned')
+    def versioned():
+        response = jsonify(BODY)
+        response.set_etag('v1')
+        return response
+
+    @app.route('/image')
+    def image():
+        return Response(b'\x89PNG' * 1000, mimetype='image/png')
+
+    return app.test_client()
+
+
+@pytest.mark.parametrize('accept, encoding', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0.5, gzip;q=1.0', 'gzip'),
+    ('identity', None),
+])
+def test_negotiates_the_best_accepted_encoding(client, accept, encoding):
+    response = client.get('/large', headers={'Accept-Encoding': accept})
+    assert response.headers.get('Content-Encoding') == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_gzip_body_round_trips(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert gzip.decompress(response.data) == client.get('/large').data
+
+
+def test_gzip_only_without_brotli(client, monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert client.get('/large', headers={'Accept-Encoding': 'br, gzip'}).headers['Content-Encoding'] == 'gzip'
+
+
+def test_small_and_binary_responses_are_left_alone(client):
+    for path in ('/small', '/image'):
+        assert 'Content-Encoding' not in client.get(path, headers={'Accept-Encoding': 'gzip'}).headers
+
+
+def test_compressed_variants_are_cached_per_version(client, compressor):
+    for _ in range(3):
+        client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    client.get('/large', headers={'Accept-Encoding': 'br'})
+    assert (compressor.misses, compressor.hits) == (2, 2)
+
+
+def test_strong_etags_become_weak_when_compressed(client):
+    response = client.get('/versioned', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['ETag'] == 'W/"v1"'
+    assert client.get('/versioned').headers['ETag'] == '"v1"'
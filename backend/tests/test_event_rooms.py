@@ -0,0 +1,81 @@
+"""Event subscriptions: one Socket.IO room per event type, plus '*' for all types."""
+
+import pytest
+
+from app import socketio
+from app.services import broadcast
+from app.services.analytics_service import AnalyticsService
+from app.services.broadcast import analytics_broadcaster
+
+NAMESPACE = '/analytics'
+
+
+@pytest.fixture(autouse=True)
+def broadcaster(monkeypatch):
+    """Flush by hand instead of from the background task."""
+    monkeypatch.setattr(broadcast.socketio, 'start_background_task', lambda target, *args: None)
+    analytics_broadcaster.flush()
+    yield analytics_broadcaster
+    analytics_broadcaster.flush()
+    analytics_broadcaster._running = False
+
+
+def subscriber(app, *event_types):
+    client = socketio.test_client(app, namespace=NAMESPACE)
+    client.emit('subscribe_to_events', {'event_types': list(event_types)}, namespace=NAMESPACE)
+    client.get_received(NAMESPACE)
+    return client
+
+
+def batches(client):
+    return [message['args'][0] for message in client.get_received(NAMESPACE) if message['name'] == 'event_batch']
+
+
+def publish(*event_types):
+    for event_type in event_types:
+        AnalyticsService.publish_event({'event_type': event_type})
+    analytics_broadcaster.flush()
+
+
+def test_subscribers_only_receive_their_event_types(app):
+    views = subscriber(app, 'page_view')
+    everything = subscriber(app, '*')
+
+    publish('page_view', 'project_click', 'page_view')
+
+    assert [batch['counts'] for batch in batches(views)] == [{'page_view': 2}]
+    assert [batch['counts'] for batch in batches(everything)] == [{'page_view': 2, 'project_click': 1}]
+
+
+def test_each_event_is_routed_to_two_rooms(app, broadcaster):
+    AnalyticsService.publish_event({'event_type': 'page_view'})
+    assert set(broadcaster._pending) == {('event_batch', 'events:page_view'), ('event_batch', 'events:*')}
+
+
+def test_subscribing_again_replaces_the_previous_rooms(app):
+    client = subscriber(app, 'page_view')
+    client.emit('subscribe_to_events', {'event_types': ['project_click']}, namespace=NAMESPACE)
+    client.get_received(NAMESPACE)
+
+    publish('page_view', 'project_click')
+    assert [batch['counts'] for batch in batches(client)] == [{'project_click': 1}]
+
+    client.emit('unsubscribe_from_events', namespace=NAMESPACE)
+    client.get_received(NAMESPACE)
+    publish('project_click')
+    assert batches(client) == []
+
+
+def test_wildcard_subsumes_named_types(app):
+    client = socketio.test_client(app, namespace=NAMESPACE)
+    client.emit('subscribe_to_events', {'event_types': ['page_view', '*']}, namespace=NAMESPACE)
+    confirmed = [m['args'][0] for m in client.get_received(NAMESPACE) if m['name'] == 'subscription_confirmed']
+    assert confirmed[0]['event_types'] == ['*']
+
+
+@pytest.mark.parametrize('data', [{}, {'event_types': 'page_view'}, {'event_types': ['']},
+                                  {'event_types': [f'type_{i}' for i in range(21)]}])
+def test_invalid_subscriptions_are_rejected(app, data):
+    client = socketio.test_client(app, namespace=NAMESPACE)
+    client.emit('subscribe_to_events', data, namespace=NAMESPACE)
+    assert [m['name'] for m in client.get_received(NAMESPACE)][-1] == 'error'
@@ -0,0 +1,101 @@
+"""GitHub quota scheduling: refill on reset, header tracking and interactive priority."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.github_rate_limiter import (
+    GitHubRateLimiter, GitHubRateLimitError, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+)
+
+KEY = GitHubRateLimiter.token_key('test-token')
+
+
+def github_response(remaining, reset_at, limit=10, status_code=200, **headers):
+    return SimpleNamespace(status_code=status_code, headers={
+        'X-RateLimit-Limit': str(limit),
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Reset': str(reset_at),
+        **headers
+    })
+
+
+def spend(limiter, remaining, reset_at, limit=10):
+    """Make one call that leaves the token with remaining calls until reset_at."""
+    limiter.acquire(KEY)
+    limiter.release(KEY, github_response(remaining, reset_at, limit))
+
+
+def test_token_key_hides_the_token():
+    assert GitHubRateLimiter.token_key(None) == 'anonymous'
+    assert 'test-token' not in KEY
+    assert KEY == GitHubRateLimiter.token_key('test-token')
+
+
+def test_exhausted_quota_refills_at_reset():
+    limiter = GitHubRateLimiter(max_wait=0)
+    spend(limiter, remaining=0, reset_at=time.time() + 3600)
+    with pytest.raises(GitHubRateLimitError) as error:
+        limiter.acquire(KEY)
+    assert error.value.retry_after > 3000
+
+    limiter._buckets[KEY].reset_at = time.time() - 1  # the reset time passes
+    limiter.acquire(KEY)
+    assert limiter.get_state()[KEY]['remaining'] == 10
+
+
+def test_call_waits_for_a_reset_within_max_wait():
+    limiter = GitHubRateLimiter(max_wait=5)
+    spend(limiter, remaining=0, reset_at=time.time() + 0.3)
+    started = time.monotonic()
+    limiter.acquire(KEY)
+    assert 0.2 < time.monotonic() - started < 5
+    assert limiter.get_state()[KEY]['total_deferred'] == 1
+
+
+def test_retry_after_blocks_every_priority():
+    limiter = GitHubRateLimiter(max_wait=0)
+    limiter.acquire(KEY)
+    limiter.release(KEY, github_response(5, time.time() + 3600, status_code=403, **{'Retry-After': '60'}))
+    for priority in (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND):
+        with pytest.raises(GitHubRateLimitError):
+            limiter.acquire(KEY, priority)
+
+
+def test_background_calls_leave_a_reserve():
+    limiter = GitHubRateLimiter(max_wait=0, background_reserve=0.3)
+    spend(limiter, remaining=3, reset_at=time.time() + 3600)
+    with pytest.raises(GitHubRateLimitError):
+        limiter.acquire(KEY, PRIORITY_BACKGROUND)
+    limiter.acquire(KEY, PRIORITY_INTERACTIVE)
+
+
+def test_background_calls_yield_to_waiting_interactive_calls():
+    limiter = GitHubRateLimiter(max_wait=10, background_reserve=0)
+    limiter.acquire(KEY)
+    bucket = limiter._buckets[KEY]
+    bucket.remaining, bucket.reset_at = 1, time.time() + 5  # the one call left is in flight
+    order = []
+
+    def call(priority):
+        limiter.acquire(KEY, priority)
+        order.append(priority)
+
+    threads = []
+    for priority, waiting in ((PRIORITY_INTERACTIVE, 'waiting_interactive'),
+                              (PRIORITY_BACKGROUND, 'waiting_background')):
+        threads.append(threading.Thread(target=call, args=(priority,), daemon=True))
+        threads[-1].start()
+        while not limiter.get_state()[KEY][waiting]:
+            time.sleep(0.01)
+
+    # The call in flight finishes and frees one slot: the interactive call gets it
+    limiter.release(KEY)
+    threads[0].join(timeout=5)
+    assert order == [PRIORITY_INTERACTIVE]
+
+    limiter.release(KEY)
+    threads[1].join(timeout=5)
+    assert order == [PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND]
@@ -0,0 +1,29 @@
+"""Cover screenshot probing: deterministic choice and the probe cache."""
+
+import time
+
+from app.services import github_service
+from app.services.github_service import GitHubService
+
+
+def test_probe_prefers_candidate_order_over_speed(monkeypatch):
+    monkeypatch.setattr(github_service, '_cover_probe_cache', github_service.TTLCache())
+    probed = []
+
+    def head_exists(url):
+        probed.append(url)
+        # The preferred path exists but answers last
+        if url.endswith('/main/screenshot.png'):
+            time.sleep(0.2)
+            return url
+        return url if url.endswith('/main/preview.png') else ''
+
+    monkeypatch.setattr(GitHubService, '_head_exists', staticmethod(head_exists))
+    service = GitHubService()
+
+    found = service._probe_screenshot_paths('octo', 'demo', 'main')
+    assert found.endswith('/main/screenshot.png')
+
+    probed.clear()
+    assert service._probe_screenshot_paths('Octo', 'Demo', 'main') == found
+    assert probed == []
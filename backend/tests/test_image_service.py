@@ -0,0 +1,72 @@
+"""Source image fetching: host allowlist and connections pinned to the vetted address."""
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.services.image_service import ImageProcessingError, ImageService
+
+
+@pytest.fixture
+def server():
+    hosts = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hosts.append(self.headers['Host'])
+            if self.path == '/first.png':
+                self.send_response(302)
+                self.send_header('Location', f'http://next.example:{self.server.server_port}/second.png')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Length', '5')
+            self.end_headers()
+            self.wfile.write(b'image')
+
+        def log_message(self, *args):
+            pass
+
+    httpd = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_port, hosts
+    httpd.shutdown()
+
+
+def test_every_hop_is_checked_and_fetched_from_the_vetted_address(server, monkeypatch):
+    port, hosts = server
+    checked = []
+
+    def check_source(url):
+        checked.append(url)
+        return '127.0.0.1'
+
+    # Neither host resolves, so the fetch only works if it connects to the checked address
+    monkeypatch.setattr(ImageService, '_check_source', staticmethod(check_source))
+
+    assert ImageService._fetch(f'http://rebind.example:{port}/first.png') == b'image'
+    assert checked == [f'http://rebind.example:{port}/first.png', f'http://next.example:{port}/second.png']
+    assert hosts == [f'rebind.example:{port}', f'next.example:{port}']
+
+
+@pytest.mark.parametrize('address', ['127.0.0.1', '169.254.169.254', '10.0.0.5', '::1'])
+def test_non_public_addresses_are_refused(monkeypatch, address):
+    family = socket.AF_INET6 if ':' in address else socket.AF_INET
+    monkeypatch.setattr(socket, 'getaddrinfo', lambda *args, **kwargs: [(family, socket.SOCK_STREAM, 6, '', (address, 443))])
+    with pytest.raises(ImageProcessingError):
+        ImageService._check_source('https://raw.githubusercontent.com/octo/demo/main/screenshot.png')
+
+
+def test_check_returns_a_public_address(monkeypatch):
+    monkeypatch.setattr(socket, 'getaddrinfo', lambda *args, **kwargs: [
+        (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2606:50c0:8000::154', 443, 0, 0)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('185.199.108.133', 443))
+    ])
+    assert ImageService._check_source('https://raw.githubusercontent.com/a.png') == '185.199.108.133'
+
+
+def test_hosts_outside_the_allowlist_are_refused():
+    with pytest.raises(ImageProcessingError):
+        ImageService._check_source('https://example.com/a.png')
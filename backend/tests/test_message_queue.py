@@ -0,0 +1,111 @@
+"""Socket.IO message queue: backend selection, NOTIFY chunking and Redis delivery."""
+
+import os
+import shutil
+import socket
+import subprocess
+import time
+
+import pytest
+
+from app import create_app
+from app.message_queue import (
+    NOTIFY_PAYLOAD_LIMIT, NotifyAssembler, PostgresNotifyManager, encode_notify_payloads, message_queue_options
+)
+
+
+def test_no_queue_by_default(monkeypatch):
+    monkeypatch.delenv('SOCKETIO_MESSAGE_QUEUE', raising=False)
+    assert message_queue_options('sqlite:///portfolio.db') == {}
+
+
+def test_redis_url_is_passed_through(monkeypatch):
+    monkeypatch.setenv('SOCKETIO_MESSAGE_QUEUE', 'redis://localhost:6379/0')
+    monkeypatch.setenv('SOCKETIO_CHANNEL', 'portfolio-test')
+    assert message_queue_options('sqlite:///portfolio.db') == {
+        'message_queue': 'redis://localhost:6379/0', 'channel': 'portfolio-test'
+    }
+
+
+def test_postgres_shorthand_uses_the_database(monkeypatch):
+    monkeypatch.setenv('SOCKETIO_MESSAGE_QUEUE', 'postgres')
+    options = message_queue_options('postgresql://localhost/portfolio')
+    assert isinstance(options['client_manager'], PostgresNotifyManager)
+    assert options['client_manager'].url == 'postgresql://localhost/portfolio'
+
+    with pytest.raises(ValueError):
+        message_queue_options('sqlite:///portfolio.db')
+
+
+def test_invalid_queue_config_fails_app_startup(monkeypatch):
+    monkeypatch.setenv('SOCKETIO_MESSAGE_QUEUE', 'postgres')
+    with pytest.raises(ValueError):
+        create_app()
+
+
+@pytest.mark.parametrize('message', [
+    '{"method": "emit", "event": "new_event"}',
+    '~starts like a chunk',
+    '{"data": "%s"}' % ('x' * 50000),
+])
+def test_notify_payloads_reassemble(message):
+    payloads = encode_notify_payloads(message)
+    assert all(len(payload.encode('utf-8')) < NOTIFY_PAYLOAD_LIMIT for payload in payloads)
+
+    assembler = NotifyAssembler()
+    results = [assembler.feed(payload) for payload in reversed(payloads)]
+    assert results[-1] == message
+    assert all(result is None for result in results[:-1])
+
+
+def test_incomplete_messages_expire():
+    assembler = NotifyAssembler(max_age=0.01)
+    stale, fresh = (encode_notify_payloads(os.urandom(4000).hex(), limit=1000) for _ in range(2))
+    assert assembler.feed(stale[0]) is None
+    time.sleep(0.05)
+    assert assembler.feed(fresh[0]) is None
+    assert len(assembler._pending) == 1  # the stale message's lost chunks are given up on
+
+
+@pytest.fixture
+def redis_url():
+    server = shutil.which('redis-server')
+    if not server:
+        pytest.skip('redis-server is not installed')
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen([server, '--port', str(port), '--save', '', '--appendonly', 'no'],
+                               stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    pytest.fail('redis-server did not start')
+                time.sleep(0.05)
+        yield f'redis://127.0.0.1:{port}/0'
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+
+def test_emits_are_published_to_redis(redis_url, monkeypatch):
+    import redis
+    import socketio
+
+    monkeypatch.setenv('SOCKETIO_MESSAGE_QUEUE', redis_url)
+    options = message_queue_options('sqlite:///portfolio.db')
+
+    subscriber = redis.Redis.from_url(redis_url).pubsub(ignore_subscribe_messages=True)
+    subscriber.subscribe(options['channel'])
+
+    manager = socketio.RedisManager(options['message_queue'], channel=options['channel'], write_only=True)
+    manager.emit('new_event', {'event_type': 'page_view'}, namespace='/analytics', room='analytics_room')
+
+    message = subscriber.get_message(timeout=5)
+    assert message is not None
+    assert b'new_event' in message['data'] and b'analytics_room' in message['data']
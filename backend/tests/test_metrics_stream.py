@@ -0,0 +1,34 @@
+"""Metrics deltas: removals, float rounding and snapshot round-trips."""
+
+from app.services.metrics_stream import REMOVED_KEY, MetricsStream, apply, diff, rounded
+
+HEALTHY = {'active_visitors': 2, 'system_health': {'cpu': 7.0, 'memory': 41.0, 'disk': 63.0, 'status': 'healthy'}}
+
+
+def test_removed_keys_are_marked_and_applied():
+    failed = {'active_visitors': 2, 'system_health': {'status': 'error'}}
+    changes = diff(HEALTHY, failed)
+    assert changes == {'system_health': {'status': 'error', REMOVED_KEY: ['cpu', 'disk', 'memory']}}
+    assert apply(HEALTHY, changes) == failed
+    assert apply(failed, diff(failed, HEALTHY)) == HEALTHY
+
+
+def test_top_level_removals_round_trip():
+    old = {'active_visitors': 2, 'popular_projects': []}
+    new = {'active_visitors': 3}
+    assert apply(old, diff(old, new)) == new
+
+
+def test_rounding_reaches_nested_floats():
+    assert rounded({'a': [1.26, {'b': 2.71}], 'c': 3, 'd': 'x'}, 1) == {'a': [1.3, {'b': 2.7}], 'c': 3, 'd': 'x'}
+
+
+def test_jitter_below_precision_sends_nothing(app):
+    stream = MetricsStream()
+    stream.publish({'timestamp': 't1', **HEALTHY})
+    jittered = {'timestamp': 't2', **HEALTHY, 'system_health': {**HEALTHY['system_health'], 'cpu': 7.2}}
+    assert stream.publish(jittered) is None
+
+    frame = stream.publish({'timestamp': 't3', 'active_visitors': 2, 'system_health': {'status': 'error'}})
+    assert frame['changes']['system_health'][REMOVED_KEY] == ['cpu', 'disk', 'memory']
+    assert stream.snapshot['system_health'] == {'status': 'error'}
@@ -0,0 +1,75 @@
+"""Monthly partitions: names, month arithmetic, ranges and the Postgres DDL."""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app import db, partitions
+from app.models import AnalyticsEvent
+from app.partitions import MonthlyPartitions, add_months, day_range, month_start
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return cls(2026, 10, 19, 12, 0)
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Partitions of analytics_events, with 'existing' standing in for the catalog."""
+    monkeypatch.setattr(partitions, 'datetime', FrozenDatetime)
+    table = MonthlyPartitions('analytics_events')
+    table.existing = []
+    monkeypatch.setattr(table, 'months', lambda connection: sorted(table.existing))
+    return table
+
+
+def test_month_start_and_add_months():
+    assert month_start(datetime(2026, 10, 19, 23, 59)) == date(2026, 10, 1)
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 10, 1), 0) == date(2026, 10, 1)
+
+
+def test_day_range_is_half_open():
+    assert day_range(date(2026, 12, 31)) == (datetime(2026, 12, 31), datetime(2027, 1, 1))
+    assert day_range(date(2026, 10, 1), date(2026, 10, 7)) == (datetime(2026, 10, 1), datetime(2026, 10, 8))
+
+
+def test_partition_names_round_trip(events):
+    name = events.partition_name(date(2026, 3, 1))
+    assert name == 'analytics_events_p202603'
+    assert MonthlyPartitions.NAME_PATTERN.search(name).groups() == ('2026', '03')
+    assert MonthlyPartitions.NAME_PATTERN.search(events.default_name) is None
+
+
+def test_missing_months_run_through_the_lookahead(events):
+    events.existing = [date(2026, 11, 1)]
+    assert events.missing(None) == [date(2026, 10, 1), date(2026, 12, 1), date(2027, 1, 1)]
+    assert events.missing(None, start=date(2026, 8, 15), months_ahead=1) == [
+        date(2026, 8, 1), date(2026, 9, 1), date(2026, 10, 1)
+    ]
+
+
+def test_only_months_entirely_before_the_cutoff_expire(events):
+    events.existing = [date(2026, 6, 1), date(2026, 7, 1), date(2026, 8, 1)]
+    assert events.expired(None, datetime(2026, 8, 1)) == [
+        ('analytics_events_p202606', date(2026, 6, 1), date(2026, 7, 1)),
+        ('analytics_events_p202607', date(2026, 7, 1), date(2026, 8, 1)),
+    ]
+    assert [name for name, _, _ in events.expired(None, datetime(2026, 7, 31, 23, 59))] == [
+        'analytics_events_p202606'
+    ]
+
+
+def test_postgres_ddl_widens_the_primary_key():
+    ddl = str(CreateTable(AnalyticsEvent.__table__).compile(dialect=postgresql.dialect()))
+    assert 'PARTITION BY RANGE (timestamp)' in ddl
+    assert 'PRIMARY KEY (id, timestamp)' in ddl
+
+
+def test_sqlite_is_never_partitioned(app):
+    assert not MonthlyPartitions.is_partitioned(db.session.connection(), 'analytics_events')
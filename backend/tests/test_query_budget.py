@@ -0,0 +1,75 @@
+"""Every @query_budget endpoint stays within its budget, however many rows it lists."""
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.query_budget import QueryBudgetExceeded, query_budget
+
+PROJECTS = 12
+EVENTS = 30
+
+
+@pytest.fixture
+def seeded(client):
+    for i in range(PROJECTS):
+        response = client.post('/api/projects/', json={
+            'title': f'Project {i}',
+            'description': 'A project used by the query budget tests',
+            'technologies': 'Python, Flask, React' if i % 2 else 'Node.js, PostgreSQL',
+            'featured': i % 3 == 0,
+            'order': i % 4
+        })
+        assert response.status_code == 201
+
+    session_id = client.post('/api/analytics/session', json={}).get_json()['session_id']
+    for i in range(EVENTS):
+        response = client.post('/api/analytics/event', json={
+            'session_id': session_id,
+            'event_type': ('page_view', 'project_click', 'skill_hover')[i % 3],
+            'event_label': f'Project {i % 5}',
+            'page_path': '/projects'
+        })
+        assert response.status_code == 200
+    return session_id
+
+
+@pytest.mark.parametrize('method, url, body', [
+    ('GET', '/api/projects/', None),
+    ('GET', '/api/projects/?limit=5', None),
+    ('GET', '/api/projects/?technology=flask&fields=id,title', None),
+    ('GET', '/api/projects/featured', None),
+    ('GET', '/api/analytics/metrics/realtime', None),
+    ('GET', '/api/analytics/metrics/historical?days=7', None),
+    ('GET', '/api/analytics/metrics/summary?days=7', None),
+    ('POST', '/api/analytics/export', {'format': 'json', 'days': 7}),
+    ('GET', '/api/analytics/sessions/active', None),
+    ('GET', '/api/analytics/events/recent?limit=10', None),
+])
+def test_endpoint_within_budget(client, seeded, method, url, body):
+    response = client.open(url, method=method, json=body)
+    assert response.status_code == 200, response.get_json()
+
+
+def test_paginated_projects_stay_within_budget(client, seeded):
+    cursor, seen = None, 0
+    while True:
+        response = client.get('/api/projects/?limit=5' + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        seen += len(response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen == PROJECTS
+
+
+def test_strict_mode_fails_requests_over_budget(app, client):
+    @app.route('/over-budget')
+    @query_budget(1)
+    def over_budget():
+        db.session.execute(text('SELECT 1'))
+        db.session.execute(text('SELECT 2'))
+        return 'ok'
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get('/over-budget')
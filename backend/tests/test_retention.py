@@ -0,0 +1,104 @@
+"""Retention: batched deletes, archives, downsampling and dry runs."""
+
+import gzip
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+
+from app import db
+from app.models import AnalyticsEvent, AnalyticsMetrics, AnalyticsSession, SystemHealth
+from app.services import retention
+from app.services.retention import RetentionPolicy, RetentionService
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+@pytest.fixture
+def policy():
+    policy = RetentionPolicy()
+    policy.event_days, policy.session_days = 90, 180
+    policy.health_raw_days, policy.health_days = 2, 365
+    policy.batch_size = 2
+    policy.archive_dir = None
+    return policy
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Record the pause taken after each batch instead of sleeping."""
+    pauses = []
+    monkeypatch.setattr(retention.time, 'sleep', pauses.append)
+    return pauses
+
+
+@pytest.fixture
+def events(app):
+    old = NOW - timedelta(days=100)
+    db.session.add(AnalyticsSession(id='old', started_at=old, last_activity=NOW - timedelta(days=200), page_views=5))
+    db.session.add(AnalyticsSession(id='new', started_at=NOW, last_activity=NOW))
+    for i in range(5):
+        db.session.add(AnalyticsEvent(session_id='old', event_type='page_view', event_category='navigation',
+                                      timestamp=old + timedelta(hours=i)))
+    db.session.add(AnalyticsEvent(session_id='new', event_type='page_view', event_category='navigation',
+                                  timestamp=NOW))
+    db.session.commit()
+
+
+def test_deletes_run_in_primary_key_batches(events, policy, batches):
+    service = RetentionService(policy, log=lambda message: None)
+    deleted = service._delete_batches(AnalyticsEvent, AnalyticsEvent.timestamp < NOW - timedelta(days=90))
+
+    assert deleted == 5
+    assert len(batches) == 3  # 2 + 2 + 1
+    assert [event.session_id for event in AnalyticsEvent.query] == ['new']
+
+
+def test_batches_are_archived_before_they_are_deleted(events, policy, batches, tmp_path):
+    policy.archive_dir = str(tmp_path)
+    service = RetentionService(policy, log=lambda message: None)
+    service._delete_batches(AnalyticsEvent, AnalyticsEvent.timestamp < NOW - timedelta(days=90))
+
+    [archive] = tmp_path.glob('analytics_events-*.jsonl.gz')
+    with gzip.open(archive) as lines:
+        rows = [orjson.loads(line) for line in lines]
+    assert [row['id'] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]['session_id'] == 'old' and rows[0]['event_type'] == 'page_view'
+
+
+def test_run_rolls_up_before_pruning(events, policy, batches):
+    report = RetentionService(policy, log=lambda message: None).run(now=NOW)
+
+    assert report['days_rolled_up'] == 10
+    assert report['events_deleted'] == 5
+    assert report['sessions_deleted'] == 1  # 'old' once its events are gone
+    old_day = (NOW - timedelta(days=100)).date()
+    assert AnalyticsMetrics.query.filter_by(date=old_day).one().total_page_views == 5
+    assert {session.id for session in AnalyticsSession.query} == {'new'}
+
+
+def test_dry_run_counts_without_changing_anything(events, policy, batches):
+    report = RetentionService(policy, dry_run=True, log=lambda message: None).run(now=NOW)
+
+    assert report['events_deleted'] == 5
+    assert report['sessions_deleted'] == 0  # its events still exist
+    assert AnalyticsEvent.query.count() == 6
+    assert AnalyticsMetrics.query.count() == 0
+    assert batches == []
+
+
+def test_health_is_downsampled_to_one_row_per_hour(app, policy, batches):
+    hour = (NOW - timedelta(days=3)).replace(minute=0)
+    for minute, cpu, status, errors in [(0, 10.0, 'healthy', 1), (20, 20.0, 'critical', 2), (40, 30.0, 'warning', 3)]:
+        db.session.add(SystemHealth(timestamp=hour + timedelta(minutes=minute), cpu_usage=cpu,
+                                    status=status, error_count=errors))
+    db.session.add(SystemHealth(timestamp=hour + timedelta(hours=2), cpu_usage=50.0))
+    db.session.commit()
+
+    service = RetentionService(policy, log=lambda message: None)
+    assert service.downsample_health(NOW - timedelta(days=2)) == 3
+    assert service.downsample_health(NOW - timedelta(days=2)) == 0
+
+    merged = SystemHealth.query.filter_by(timestamp=hour).one()
+    assert (merged.cpu_usage, merged.status, merged.error_count) == (20.0, 'critical', 6)
+    assert SystemHealth.query.count() == 2
@@ -0,0 +1,58 @@
+"""Hourly rollups: bounded refresh on reads and atomic daily metrics."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import AnalyticsEvent, AnalyticsHourlyRollup, AnalyticsMetrics, AnalyticsSession
+from app.services.analytics_rollups import AnalyticsRollupService
+from app.services.analytics_service import AnalyticsService
+
+
+def add_activity(moment):
+    session_id = f's-{moment.isoformat()}'
+    db.session.add(AnalyticsSession(id=session_id, ip_address='203.0.113.7', started_at=moment,
+                                    last_activity=moment, page_views=1))
+    db.session.add(AnalyticsEvent(session_id=session_id, event_type='page_view', event_category='navigation',
+                                  page_path='/', timestamp=moment))
+    db.session.commit()
+
+
+def test_refresh_only_recomputes_today(app):
+    now = datetime.utcnow()
+    add_activity(now - timedelta(days=3))
+    add_activity(now)
+
+    summary = AnalyticsRollupService.summarize_days(7)
+
+    hours = [row.hour for row in AnalyticsHourlyRollup.query]
+    assert hours and all(hour.date() == now.date() for hour in hours)
+    assert summary['events'] == 1
+
+
+def test_daily_metrics_roll_back_with_their_rollups(app, monkeypatch):
+    day = date.today() - timedelta(days=1)
+    add_activity(datetime.combine(day, datetime.min.time()) + timedelta(hours=9))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('summary failed')
+
+    monkeypatch.setattr(AnalyticsRollupService, 'summarize', fail)
+    with pytest.raises(RuntimeError):
+        AnalyticsService.calculate_daily_metrics(day)
+    db.session.rollback()
+
+    assert AnalyticsHourlyRollup.query.count() == 0
+    assert AnalyticsMetrics.query.count() == 0
+
+
+def test_daily_metrics_commit_rollups_and_metrics_together(app):
+    day = date.today() - timedelta(days=1)
+    add_activity(datetime.combine(day, datetime.min.time()) + timedelta(hours=9))
+
+    metrics = AnalyticsService.calculate_daily_metrics(day)
+    db.session.rollback()
+
+    assert AnalyticsHourlyRollup.query.count() == 1
+    assert db.session.get(AnalyticsMetrics, metrics.id).total_sessions == 1
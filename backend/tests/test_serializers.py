@@ -0,0 +1,71 @@
+"""Serializers: orjson encoding, sparse fieldsets and single-statement loads."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from app import db
+from app.models import AnalyticsEvent, AnalyticsSession, Project, Skill
+from app.serializers import dumps, serialize, serializer_for
+
+
+def test_dumps_encodes_dates_decimals_and_sets():
+    encoded = orjson.loads(dumps({'at': datetime(2026, 10, 19, 12, 0), 'gpa': Decimal('3.5'), 'tags': {'a'}}))
+    assert encoded == {'at': '2026-10-19T12:00:00', 'gpa': 3.5, 'tags': ['a']}
+
+
+def test_renamed_fields(app):
+    session = AnalyticsSession(id='s1', total_time_seconds=42)
+    assert serialize(session, 'active')['total_time'] == 42
+
+
+def test_only_restricts_columns_and_computed_fields():
+    serializer = serializer_for(Project).only(['id', 'image_srcset'])
+    assert serializer.fields == ('id',)
+    assert serializer.extra_fields == ('image_srcset',)
+    # The computed field needs image_url, so it is selected but not dumped
+    assert [column.key for column in serializer.columns()] == ['id', 'image_url']
+
+
+def test_only_rejects_unknown_fields():
+    with pytest.raises(ValueError, match='password'):
+        serializer_for(Skill).only(['name', 'password'])
+
+
+def test_load_selects_only_the_view_columns(app):
+    db.session.add(Skill(name='Python', category='backend', level=4))
+    db.session.commit()
+
+    serializer = serializer_for(Skill, 'summary')
+    rows = serializer.load(Skill.query).all()
+    assert serializer.dump_many(rows) == [{'name': 'Python', 'level': 4, 'category': 'backend'}]
+
+
+def test_joined_fields_load_in_one_statement(app):
+    db.session.add(AnalyticsSession(id='s1', device_type='mobile'))
+    db.session.add(AnalyticsEvent(session_id='s1', event_type='page_view', event_category='navigation',
+                                  timestamp=datetime.utcnow()))
+    db.session.commit()
+
+    serializer = serializer_for(AnalyticsEvent, 'recent').only(['id', 'session_device'])
+    rows = serializer.load(AnalyticsEvent.query).all()
+    assert serializer.dump_many(rows) == [{'id': 1, 'session_device': 'mobile'}]
+
+
+@pytest.mark.parametrize('url', [
+    '/api/projects/?fields=id,secret',
+    '/api/analytics/events/recent?fields=nope',
+    '/api/analytics/sessions/active?fields=ip_address',
+])
+def test_unknown_fields_are_a_400(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert 'Unknown fields' in response.get_json()['error']
+
+
+def test_sparse_fieldset_over_the_api(client):
+    db.session.add(Project(title='Demo', description='d', order=1))
+    db.session.commit()
+    assert client.get('/api/projects/?fields=title').get_json() == [{'title': 'Demo'}]
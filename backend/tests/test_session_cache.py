@@ -0,0 +1,127 @@
+"""Session cache: increment-only write-back, eviction and retries after a failed flush."""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import AnalyticsSession
+from app.services.session_cache import SessionCache
+
+
+@pytest.fixture
+def new_cache(app, monkeypatch):
+    def new_cache():
+        cache = SessionCache()
+        cache.maxsize = 2
+        # Flush explicitly instead of from the background task
+        monkeypatch.setattr(cache, '_ensure_flusher', lambda: None)
+        monkeypatch.setattr(cache, '_flush_in_background', lambda: None)
+        return cache
+    return new_cache
+
+
+@pytest.fixture
+def cache(new_cache):
+    return new_cache()
+
+
+def add_session(session_id, page_views=0, last_activity=None):
+    session = AnalyticsSession(id=session_id, page_views=page_views,
+                               last_activity=last_activity or datetime.utcnow())
+    db.session.add(session)
+    db.session.commit()
+    return session
+
+
+def stored(session_id):
+    db.session.expire_all()
+    return db.session.get(AnalyticsSession, session_id)
+
+
+def test_page_views_are_written_back_as_increments(cache, new_cache):
+    add_session('s1', page_views=1)
+    other_worker = new_cache()
+    cache.touch('s1', page_view=True)
+    other_worker.touch('s1', page_view=True)
+    cache.touch('s1', page_view=True)
+
+    assert stored('s1').page_views == 1  # nothing is written until the flush
+    assert cache.flush() == 1
+    assert other_worker.flush() == 1
+    assert stored('s1').page_views == 4
+    assert cache.flush() == 0
+
+
+def test_last_activity_only_moves_forward(cache):
+    future = datetime.utcnow() + timedelta(hours=1)
+    add_session('s1')
+    cache.touch('s1')
+    # Another worker already wrote a later activity
+    stored('s1').last_activity = future
+    db.session.commit()
+
+    cache.flush()
+    assert stored('s1').last_activity == future
+
+
+def test_failed_write_back_is_requeued(cache, monkeypatch):
+    add_session('s1')
+    cache.touch('s1', page_view=True)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('database unavailable')
+
+    with monkeypatch.context() as patched:
+        patched.setattr(db.session, 'execute', fail)
+        with pytest.raises(RuntimeError):
+            cache.flush()
+    assert cache.get_stats()['pending_writes'] == 1
+
+    cache.touch('s1', page_view=True)
+    cache.flush()
+    assert stored('s1').page_views == 2
+
+
+def test_lru_eviction_keeps_dirty_sessions_pending(cache):
+    for session_id in ('s1', 's2', 's3'):
+        add_session(session_id)
+    cache.touch('s1', page_view=True)
+    cache.touch('s2')
+    cache.touch('s3')
+
+    assert list(cache._entries) == ['s2', 's3']
+    assert cache.get_stats()['pending_writes'] == 3
+    cache.flush()
+    assert stored('s1').page_views == 1
+
+
+def test_expired_clean_entries_are_reloaded(cache):
+    add_session('s1', page_views=3)
+    cache.ttl = 0
+    cache.touch('s1')
+    cache.flush()
+    time.sleep(0.01)
+
+    misses = cache.get_stats()['misses']
+    assert cache.touch('s1').page_views == 3
+    assert cache.get_stats()['misses'] == misses + 1
+
+
+def test_reaching_the_batch_size_flushes_outside_the_request(cache, monkeypatch):
+    flushed = []
+    monkeypatch.setattr(cache, '_flush_in_background', lambda: flushed.append(True))
+    cache.flush_batch = 2
+    add_session('s1')
+    add_session('s2')
+    cache.touch('s1')
+    assert flushed == []
+    cache.touch('s2')
+    assert flushed == [True]
+    assert stored('s2').page_views == 0
+
+
+def test_unknown_sessions_are_not_cached(cache):
+    assert cache.touch('missing') is None
+    assert cache.get_stats()['pending_writes'] == 0
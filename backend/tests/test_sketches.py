@@ -0,0 +1,120 @@
+"""HyperLogLog and Space-Saving accuracy, merging and storage round-trips."""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.services.sketches import HyperLogLog, SpaceSaving
+
+
+def visitors(start, count):
+    return [f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}' for i in range(start, start + count)]
+
+
+@pytest.mark.parametrize('precision', [4, 8, 12, 16])
+@pytest.mark.parametrize('distinct', [50, 5000, 100000])
+def test_hyperloglog_error_within_bounds(precision, distinct):
+    sketch = HyperLogLog(precision)
+    sketch.add_many(visitors(0, distinct))
+    error = abs(sketch.count() - distinct) / distinct
+    # Four standard errors: 1.04 / sqrt(2^p)
+    assert error <= 4 * 1.04 / np.sqrt(1 << precision)
+
+
+def test_hyperloglog_ignores_duplicates():
+    sketch = HyperLogLog()
+    sketch.add_many(visitors(0, 1000) * 5)
+    assert abs(sketch.count() - 1000) <= 1000 * 4 * 1.04 / 64
+
+
+def test_hyperloglog_merge_equals_union():
+    # Hourly sketches overlap (returning visitors); merging must count each visitor once
+    hours = [HyperLogLog() for _ in range(24)]
+    for hour, sketch in enumerate(hours):
+        sketch.add_many(visitors(hour * 500, 2000))
+    merged = HyperLogLog()
+    for sketch in hours:
+        merged.merge(sketch)
+
+    union = HyperLogLog()
+    union.add_many(visitors(0, 23 * 500 + 2000))
+    assert np.array_equal(merged.registers, union.registers)
+    assert abs(merged.count() - 13500) / 13500 <= 4 * 1.04 / 64
+
+
+def test_hyperloglog_rejects_mixed_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(14))
+    with pytest.raises(ValueError):
+        HyperLogLog(3)
+
+
+@pytest.mark.parametrize('precision', [4, 8, 12, 16])
+def test_hyperloglog_ranks_are_exact(precision):
+    # Values just below a power of two round up to it in float64 above 2^53
+    bits = 64 - precision
+    rests = [0, 1, 2, 3] + [(1 << k) - 1 for k in range(2, bits + 1)] + [1 << k for k in range(bits)]
+    hashes = np.array([(5 << bits) | rest for rest in rests], dtype=np.uint64)
+    expected = [bits - rest.bit_length() + 1 for rest in rests]
+    assert HyperLogLog(precision)._ranks(hashes).tolist() == expected
+
+
+def test_hyperloglog_storage_round_trip():
+    sketch = HyperLogLog(10)
+    sketch.add_many(visitors(0, 3000))
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.precision == 10
+    assert np.array_equal(restored.registers, sketch.registers)
+    assert HyperLogLog.from_bytes(None).count() == 0
+
+
+def zipf_stream(items, count, seed=1):
+    rng = random.Random(seed)
+    weights = [1 / rank ** 1.2 for rank in range(1, items + 1)]
+    return rng.choices([f'item-{i}' for i in range(items)], weights, k=count)
+
+
+def test_space_saving_finds_heavy_hitters_within_error():
+    stream = zipf_stream(2000, 50000)
+    sketch = SpaceSaving(capacity=100)
+    sketch.add_many(stream)
+
+    exact = {}
+    for item in stream:
+        exact[item] = exact.get(item, 0) + 1
+    true_top = sorted(exact, key=exact.get, reverse=True)[:10]
+
+    assert [item for item, _ in sketch.top(10)] == true_top
+    for item, (count, error) in sketch.counters.items():
+        # Counts never underestimate, and overestimate by at most the recorded error <= N / capacity
+        assert exact.get(item, 0) <= count <= exact.get(item, 0) + error
+        assert error <= len(stream) / sketch.capacity
+
+
+def test_space_saving_merge_keeps_heavy_hitters():
+    hours = [zipf_stream(2000, 5000, seed) for seed in range(10)]
+    merged = SpaceSaving(capacity=100)
+    for stream in hours:
+        sketch = SpaceSaving(capacity=100)
+        sketch.add_many(stream)
+        merged.merge(sketch)
+
+    exact = {}
+    for stream in hours:
+        for item in stream:
+            exact[item] = exact.get(item, 0) + 1
+    true_top = sorted(exact, key=exact.get, reverse=True)[:5]
+
+    assert len(merged.counters) <= merged.capacity
+    assert [item for item, _ in merged.top(5)] == true_top
+    for item, (count, error) in merged.counters.items():
+        assert exact[item] <= count <= exact[item] + error
+
+
+def test_space_saving_storage_round_trip():
+    sketch = SpaceSaving(capacity=5)
+    sketch.add_many(['a', 'b', 'a', '', None, 'c', 'a'])
+    restored = SpaceSaving.from_dict(sketch.to_dict())
+    assert restored.top(3) == sketch.top(3) == [('a', 3), ('b', 1), ('c', 1)]
+    assert SpaceSaving.from_dict(None).top() == []
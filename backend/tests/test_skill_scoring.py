@@ -0,0 +1,56 @@
+"""Vectorized skill scoring: saturation, weights and per-key scoring."""
+
+import math
+
+import numpy as np
+import pytest
+
+from app import db
+from app.models import Project
+from app.services.skill_scoring import SkillScoringEngine
+from app.services.technology_index import TechnologyIndex
+
+COUNT_ONLY = {'count': 1.0, 'recency': 0.0, 'featured': 0.0, 'language': 0.0, 'experience': 0.0}
+
+
+@pytest.fixture
+def projects(app):
+    # Python in 6 projects (past saturation), Go in 1
+    for i in range(6):
+        project = Project(title=f'Project {i}', description='d', technologies='Python, Go' if i == 0 else 'Python')
+        db.session.add(project)
+        db.session.flush()
+        TechnologyIndex.index_project(project)
+    db.session.commit()
+
+
+def test_saturate_is_log_scaled_and_capped():
+    values = np.array([0.0, 1.0, 5.0, 50.0, -1.0])
+    assert SkillScoringEngine._saturate(values, 5.0).tolist() == pytest.approx(
+        [0.0, math.log(2) / math.log(6), 1.0, 1.0, 0.0]
+    )
+    assert SkillScoringEngine._saturate(values, 0.0).tolist() == [0.0] * 5
+
+
+def test_quantize_maps_onto_the_skill_scale():
+    assert SkillScoringEngine.quantize(np.array([0.0, 0.5, 1.0, 1.5])).tolist() == [1, 3, 5, 5]
+
+
+def test_scores_are_absolute_against_saturation(projects):
+    scores = SkillScoringEngine.score_technologies(weights=COUNT_ONLY)
+    assert scores['python'] == {'score': 1.0, 'level': 5}
+    assert scores['go']['score'] == pytest.approx(math.log(2) / math.log(6), abs=1e-4)
+
+
+def test_scoring_a_subset_matches_a_full_run(projects):
+    full = SkillScoringEngine.score_technologies()
+    subset = SkillScoringEngine.score_technologies(['go'])
+    assert subset == {'go': full['go']}
+
+
+def test_weights_and_saturation_come_from_the_environment(projects, monkeypatch):
+    for name in COUNT_ONLY:
+        monkeypatch.setenv(f'SKILL_WEIGHT_{name.upper()}', str(COUNT_ONLY[name]))
+    monkeypatch.setenv('SKILL_SATURATION_COUNT', '1')
+    scores = SkillScoringEngine.score_technologies()
+    assert scores['go'] == {'score': 1.0, 'level': 5}
@@ -0,0 +1,45 @@
+"""Skill writes: name normalization and the generic upsert fallback."""
+
+from datetime import datetime
+
+from app import db
+from app.models import Skill
+from app.services.skill_calculator import SkillCalculator
+
+
+def calculated(name, level):
+    now = datetime.utcnow()
+    return {
+        'name': name, 'category': 'Languages', 'level': level, 'order': 0,
+        'auto_calculated_level': level, 'project_count': 1, 'manual_override': False,
+        'last_calculated': now, 'created_at': now
+    }
+
+
+def test_names_are_stored_stripped_and_compared_case_insensitively(client):
+    response = client.post('/api/skills/add', json={'name': '  Python ', 'category': 'Languages'})
+    assert response.status_code == 201
+    assert response.get_json()['name'] == 'Python'
+
+    assert client.post('/api/skills/add', json={'name': 'python', 'category': 'Languages'}).status_code == 409
+
+    other = client.post('/api/skills/add', json={'name': 'Go', 'category': 'Languages'}).get_json()
+    assert client.put(f"/api/skills/{other['id']}", json={'name': ' PYTHON'}).status_code == 409
+    assert client.put(f"/api/skills/{other['id']}", json={'name': ' Golang  '}).get_json()['name'] == 'Golang'
+    assert client.put(f"/api/skills/{other['id']}", json={'name': '   '}).status_code == 400
+
+
+def test_upsert_fallback_updates_inserts_and_preserves_overrides(app):
+    db.session.add_all([
+        Skill(name='Python', category='Languages', level=2, manual_override=False),
+        Skill(name='Rust', category='Languages', level=5, manual_override=True)
+    ])
+    db.session.commit()
+
+    SkillCalculator._upsert_skills_without_on_conflict(
+        [calculated('python', 4), calculated('rust', 1), calculated('Go', 3)]
+    )
+    db.session.commit()
+
+    levels = {skill.name: skill.level for skill in Skill.query}
+    assert levels == {'Python': 4, 'Rust': 5, 'Go': 3}
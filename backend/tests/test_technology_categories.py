@@ -0,0 +1,44 @@
+"""Technology categorization: the alias index and the fuzzy fallback."""
+
+import pytest
+
+from app.services.skill_calculator import SkillCalculator
+
+
+@pytest.mark.parametrize('name, category', [
+    ('Vue.js', 'frontend'),
+    ('VueJS', 'frontend'),
+    ('Node', 'backend'),
+    ('Postgres 15', 'database'),
+    ('Tensorflow 2.x', 'data'),
+    ('Java', 'backend'),  # the first category list wins overlaps
+])
+def test_index_normalizes_versions_punctuation_and_js_suffixes(name, category):
+    assert SkillCalculator.categorize_technology(name) == category
+
+
+def test_compound_names_use_their_first_known_part():
+    assert SkillCalculator.categorize_technology('React Native + Expo') == 'mobile'
+    assert SkillCalculator.categorize_technology('Expo + Typescrpt') == 'frontend'
+
+
+@pytest.mark.parametrize('name, category', [
+    ('Typescrpt', 'frontend'),
+    ('Postgress', 'database'),
+    ('Tensorflw', 'data'),
+    ('Pythn', 'backend'),
+])
+def test_misspellings_fall_back_to_the_closest_alias(name, category):
+    assert SkillCalculator.categorize_technology(name) == category
+
+
+@pytest.mark.parametrize('name', ['FooBarBaz', 'zz', 'Gooo'])
+def test_unknown_and_short_names_default_to_tools(name):
+    assert SkillCalculator.categorize_technology(name) == 'tools'
+
+
+def test_fallback_is_memoized():
+    SkillCalculator._resolve_category.cache_clear()
+    SkillCalculator.categorize_technology('Typescrpt')
+    SkillCalculator.categorize_technology('Typescrpt')
+    assert SkillCalculator._resolve_category.cache_info().hits == 1
@@ -0,0 +1,65 @@
+"""User-agent classification: rule ordering, device types and bots."""
+
+import pytest
+
+from app.services.user_agent import ParsedUserAgent, UserAgentParser
+
+WINDOWS = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko)'
+MAC = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko)'
+
+
+@pytest.mark.parametrize('user_agent, browser', [
+    (f'{WINDOWS} Chrome/120.0.0.0 Safari/537.36 Edg/120.0.2210.91', 'Edge'),
+    (f'{WINDOWS} Chrome/120.0.0.0 Safari/537.36 OPR/106.0.0.0', 'Opera'),
+    (f'{WINDOWS} Chrome/120.0.0.0 Safari/537.36', 'Chrome'),
+    (f'{MAC} Version/17.2 Safari/605.1.15', 'Safari'),
+    ('Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0', 'Firefox'),
+    ('Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 '
+     '(KHTML, like Gecko) CriOS/120.0.6099.119 Mobile/15E148 Safari/604.1', 'Chrome'),
+    ('Mozilla/5.0 (Linux; Android 14; SM-S911B) AppleWebKit/537.36 (KHTML, like Gecko) '
+     'SamsungBrowser/23.0 Chrome/115.0.0.0 Mobile Safari/537.36', 'Samsung Internet'),
+    ('Mozilla/5.0 (Windows NT 10.0; Trident/7.0; rv:11.0) like Gecko', 'Internet Explorer'),
+])
+def test_more_specific_browsers_win_over_compatibility_tokens(user_agent, browser):
+    assert UserAgentParser.parse(user_agent).browser == browser
+
+
+@pytest.mark.parametrize('user_agent, expected', [
+    ('Mozilla/5.0 (iPad; CPU OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) '
+     'Version/17.2 Mobile/15E148 Safari/604.1', ('tablet', 'Safari', 'iOS')),
+    ('Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) '
+     'Version/17.2 Mobile/15E148 Safari/604.1', ('mobile', 'Safari', 'iOS')),
+    ('Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) '
+     'Chrome/120.0.0.0 Mobile Safari/537.36', ('mobile', 'Chrome', 'Android')),
+    ('Mozilla/5.0 (Linux; Android 13; SM-X700) AppleWebKit/537.36 (KHTML, like Gecko) '
+     'Chrome/120.0.0.0 Safari/537.36', ('tablet', 'Chrome', 'Android')),
+    (f'{MAC} Version/17.2 Safari/605.1.15', ('desktop', 'Safari', 'macOS')),
+    ('Mozilla/5.0 (X11; CrOS x86_64 14541.0.0) AppleWebKit/537.36 (KHTML, like Gecko) '
+     'Chrome/120.0.0.0 Safari/537.36', ('desktop', 'Chrome', 'ChromeOS')),
+])
+def test_tablets_are_told_apart_from_phones(user_agent, expected):
+    assert UserAgentParser.parse(user_agent) == ParsedUserAgent(*expected)
+
+
+@pytest.mark.parametrize('user_agent', [
+    'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+    'Mozilla/5.0 (Linux; Android 6.0.1; Nexus 5X Build/MMB29P) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/120.0.6099.129 Mobile Safari/537.36 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+    f'{WINDOWS} HeadlessChrome/120.0.0.0 Safari/537.36',
+    'facebookexternalhit/1.1 (+http://www.facebook.com/externalhit_uatext.php)',
+])
+def test_bots_are_classified_before_device_rules(user_agent):
+    assert UserAgentParser.parse(user_agent).device_type == 'bot'
+
+
+def test_empty_and_unknown_agents():
+    assert UserAgentParser.parse(None) == ParsedUserAgent('desktop', 'Other', 'Other')
+    assert UserAgentParser.parse('curl/8.4.0') == ParsedUserAgent('desktop', 'Other', 'Other')
+
+
+def test_results_are_memoized_on_the_truncated_string():
+    UserAgentParser._parse.cache_clear()
+    long_agent = f'{WINDOWS} Chrome/120.0.0.0 Safari/537.36 ' + 'x' * 1000
+    UserAgentParser.parse(long_agent)
+    UserAgentParser.parse(long_agent + 'different tail')
+    assert UserAgentParser.cache_info().hits == 1
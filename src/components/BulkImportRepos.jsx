@@ -122,6 +122,7 @@ const BulkImportRepos = ({ onProjectsImported, onClose }) => {
             github_account: repo.github_account,
             live_url: detailedInfo.live_url || repo.live_url,
             image_url: detailedInfo.image_url || '',
+            github_languages: detailedInfo.github_languages || null,
             featured: false, // Let user decide later
             order: 0 // Let user decide later
           });
@@ -8,7 +8,10 @@ const CertificateCard = ({ certificate, onEdit, onDelete }) => {
             {certificate.photo_url && (
                 <div style={{ marginBottom: '1rem' }}>
                     <img 
-                        src={certificate.photo_url} 
+                        src={certificate.photo_url_optimized || certificate.photo_url} 
+                        srcSet={certificate.photo_srcset || undefined}
+                        sizes="(max-width: 640px) 100vw, 400px"
+                        loading="lazy"
                         alt={`${certificate.course} certificate`}
                         style={{
                             width: '100%',
@@ -157,7 +157,7 @@ const Projects = forwardRef((props, ref) => {
               {project.image_url ? (
                 <div style={{ 
                   height: '12rem', 
-                  backgroundImage: `url(${project.image_url})`,
+                  backgroundImage: `url(${project.image_url_optimized || project.image_url})`,
                   backgroundSize: 'cover',
                   backgroundPosition: 'center',
                   position: 'relative'
@@ -11,6 +11,25 @@
 import axios from 'axios';
 import { io } from 'socket.io-client';
 
+// Lists the keys a delta removed at that level (mirrors REMOVED_KEY in metrics_stream.py)
+const REMOVED_KEY = '$removed';
+
+/**
+ * Merge a metrics delta into the previous metrics (nested objects are merged, removed keys dropped, everything else replaced)
+ */
+function applyChanges(base, changes) {
+    const merged = { ...base };
+    const isObject = (v) => v && typeof v === 'object' && !Array.isArray(v);
+    Object.entries(changes).forEach(([key, value]) => {
+        if (key === REMOVED_KEY) {
+            value.forEach(removed => delete merged[removed]);
+        } else {
+            merged[key] = isObject(value) && isObject(merged[key]) ? applyChanges(merged[key], value) : value;
+        }
+    });
+    return merged;
+}
+
 class AnalyticsService {
     constructor() {
         this.apiBaseUrl = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5001/api';
@@ -19,6 +38,9 @@ class AnalyticsService {
         this.eventQueue = [];
         this.isInitialized = false;
         this.listeners = {};
+        this.eventTypes = null;
+        this.metrics = null;
+        this.metricsSeq = 0;
         
         // Initialize analytics
         this.init();
@@ -72,6 +94,10 @@ class AnalyticsService {
 
             this.socket.on('connect', () => {
                 console.log('Analytics WebSocket connected');
+                // Rooms don't survive a reconnect; restore the event subscription
+                if (this.eventTypes) {
+                    this.socket.emit('subscribe_to_events', { event_types: this.eventTypes });
+                }
             });
 
             this.socket.on('disconnect', () => {
@@ -83,8 +109,22 @@ class AnalyticsService {
             });
 
             // Listen for real-time updates
-            this.socket.on('metrics_update', (data) => {
-                this.emit('metricsUpdate', data);
+            // Metrics arrive as one snapshot, then sequence-numbered deltas
+            this.socket.on('metrics_snapshot', ({ seq, metrics }) => {
+                this.metrics = metrics;
+                this.metricsSeq = seq;
+                this.emit('metricsUpdate', metrics);
+            });
+
+            this.socket.on('metrics_delta', ({ seq, changes }) => {
+                if (!this.metrics || seq !== this.metricsSeq + 1) {
+                    // Missed a delta: fetch a fresh snapshot
+                    this.socket.emit('metrics_resync');
+                    return;
+                }
+                this.metrics = applyChanges(this.metrics, changes);
+                this.metricsSeq = seq;
+                this.emit('metricsUpdate', this.metrics);
             });
 
             this.socket.on('health_update', (data) => {
@@ -95,6 +135,16 @@ class AnalyticsService {
                 this.emit('eventUpdate', data);
             });
 
+            // Events arrive coalesced: a count plus a sample of the most recent, oldest first
+            this.socket.on('event_batch', (batch) => {
+                batch.sample.forEach(event => this.emit('eventUpdate', event));
+                this.emit('eventBatch', batch);
+            });
+
+            this.socket.on('session_batch', (batch) => {
+                this.emit('sessionBatch', batch);
+            });
+
         } catch (error) {
             console.error('WebSocket setup failed:', error);
         }
@@ -357,7 +407,8 @@ class AnalyticsService {
      * Subscribe to WebSocket events
      */
     subscribeToEvents(eventTypes) {
-        if (this.socket) {
+        this.eventTypes = eventTypes;
+        if (this.socket && this.socket.connected) {
             this.socket.emit('subscribe_to_events', { event_types: eventTypes });
         }
     }